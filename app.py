@@ -1,15 +1,31 @@
+import asyncio
+import copy
+import hashlib
+import json
 import os
-import shutil
+import tempfile
+import time
 import traceback
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
+import uuid
+import zipfile
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, NamedTuple, Optional
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
-from schemas.fra_schema import build_schema, pretty_print
+from schemas.fra_schema import pretty_print
+from schemas.export import CHUNK_ROWS, FORMATS, document_rows, export_rows
 
-from ocr.ocr_engine import extract_text
-from extractors.entities import extract_entities
-from schemas.fra_schema import build_schema
+from ocr.ocr_engine import DOC_EXTS, IMAGE_EXTS, OCR_CONFIG_VERSION, image_hashes, source_format
+from ocr.worker_pool import OCRWorkerPool, PoolSaturated
+from extractors.entities import extract_entities, EXTRACTOR_VERSION
+from extractors.ner_fallback import NER_BATCH_SIZE, NER_FALLBACK
+from pipeline import fill_from_ner, ner_missing, process_document, process_image, process_job
+from utils import metrics
+from utils.job_store import JobStore, DONE, FAILED
+from utils.near_duplicates import NearDuplicateIndex
+from utils.result_cache import ResultCache, cache_key
 
 app = FastAPI(
     title="FRA Digitization API",
@@ -22,15 +38,196 @@ app.add_middleware(
     allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"],
 )
 
+# Stage timings per request (see /metrics); FRA_SERVER_TIMING=1 also returns
+# them to the client in a Server-Timing header
+SERVER_TIMING = os.environ.get("FRA_SERVER_TIMING", "0") == "1"
+_http_in_flight = 0
+
+
+@app.middleware("http")
+async def record_timings(request, call_next):
+    global _http_in_flight
+    _http_in_flight += 1
+    t0 = time.perf_counter()
+    with metrics.collect() as trace:
+        try:
+            response = await call_next(request)
+        finally:
+            _http_in_flight -= 1
+    metrics.merge(trace)
+    if SERVER_TIMING and trace["spans"]:
+        total = (time.perf_counter() - t0) * 1e3
+        response.headers["Server-Timing"] = f"{metrics.server_timing(trace)}, total;dur={total:.1f}"
+    return response
+
+
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
+# Uploads up to this size stay in memory; larger ones spool to a temp file
+UPLOAD_SPOOL_BYTES = int(os.environ.get("FRA_UPLOAD_SPOOL_MB", "16")) * 1024 * 1024
+
+
+async def spool_upload(file: UploadFile):
+    """
+    Read an upload once, hashing as we go. Returns (source, sha256, temp_path):
+    source is the bytes for small files, or the path of a uniquely named temp
+    file in UPLOAD_DIR once the upload outgrows UPLOAD_SPOOL_BYTES.
+    """
+    digest = hashlib.sha256()
+    buf = bytearray()
+    spill = None
+    try:
+        while True:
+            chunk = await file.read(1 << 20)
+            if not chunk:
+                break
+            digest.update(chunk)
+            if spill is None and len(buf) + len(chunk) <= UPLOAD_SPOOL_BYTES:
+                buf += chunk
+                continue
+            if spill is None:
+                ext = os.path.splitext(file.filename or "")[1].lower()
+                spill = tempfile.NamedTemporaryFile(dir=UPLOAD_DIR, suffix=ext, delete=False)
+                spill.write(buf)
+                buf = bytearray()
+            spill.write(chunk)
+    finally:
+        if spill is not None:
+            spill.close()
+    if spill is not None:
+        return spill.name, digest.hexdigest(), spill.name
+    return bytes(buf), digest.hexdigest(), None
+
+# Result cache: in-memory LRU, plus a JSON-file tier when FRA_CACHE_DIR is set
+result_cache = ResultCache(
+    max_items=int(os.environ.get("FRA_CACHE_MEM_ITEMS", "256")),
+    disk_dir=os.environ.get("FRA_CACHE_DIR") or None,
+    disk_max_bytes=int(os.environ.get("FRA_CACHE_DISK_MB", "512")) * 1024 * 1024,
+)
+
+# Near-duplicate images (rescans, re-photographed forms) by perceptual hash.
+# FRA_NEAR_DUP: "variant" replays the whole-page variant the earlier copy's
+# result came from (see replay_schedule) instead of the usual schedule;
+# "result" returns the earlier copy's cached result outright, which is only
+# safe where distinct claims never look alike at 8x8; "off" disables it.
+NEAR_DUP_MODE = os.environ.get("FRA_NEAR_DUP", "variant")
+near_dups = NearDuplicateIndex(
+    max_items=int(os.environ.get("FRA_NEAR_DUP_ITEMS", "4096")),
+    max_distance=int(os.environ.get("FRA_NEAR_DUP_BITS", "4")),
+)
+
+
+WARMUP_ON_STARTUP = os.environ.get("FRA_WARMUP", "1") != "0"
+
+# OCR runs in worker processes (FRA_OCR_WORKERS, FRA_OCR_QUEUE, FRA_OCR_TIMEOUT)
+ocr_pool = OCRWorkerPool()
+
+
+# Async jobs: uploads and a SQLite job store under FRA_JOB_DIR
+JOB_DIR = os.environ.get("FRA_JOB_DIR", "jobs")
+JOB_FILES_DIR = os.path.join(JOB_DIR, "files")
+os.makedirs(JOB_FILES_DIR, exist_ok=True)
+JOB_TTL_SECONDS = float(os.environ.get("FRA_JOB_TTL_HOURS", "24")) * 3600
+JOB_TIMEOUT = float(os.environ.get("FRA_JOB_TIMEOUT", "3600"))
+# jobs never take more than this many OCR workers, leaving room for /extract
+JOB_CONCURRENCY = int(os.environ.get("FRA_JOB_CONCURRENCY", str(max(1, ocr_pool.workers // 2))))
+JOB_POLL_SECONDS = 2.0
+JOB_PURGE_SECONDS = 600.0
+
+job_store = JobStore(os.path.join(JOB_DIR, "jobs.sqlite3"))
+_job_wakeup = None
+_job_dispatcher = None
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+async def _run_job(job, slots):
+    loop = asyncio.get_running_loop()
+    settled = asyncio.Event()
+    try:
+        trace = await ocr_pool.run(process_job, job_store.db_path, job["id"], job["file_path"],
+                                   timeout=JOB_TIMEOUT, on_settled=lambda: loop.call_soon_threadsafe(settled.set))
+        metrics.merge(trace)
+    except PoolSaturated as e:
+        # back in the queue; hold the slot while backing off
+        job_store.release(job["id"])
+        await asyncio.sleep(e.retry_after)
+    except asyncio.TimeoutError:
+        job_store.fail(job["id"], "Job timed out.")
+    except Exception as e:
+        job_store.fail(job["id"], f"{e.__class__.__name__}: {e}")
+    finally:
+        # a timed-out worker may still be reading the upload: keep the slot and
+        # the file until it has actually stopped
+        try:
+            await settled.wait()
+        finally:
+            slots.release()
+        current = job_store.get(job["id"])
+        if current and current["status"] in (DONE, FAILED):
+            _remove_quietly(job["file_path"])
+
+
+async def _dispatch_jobs():
+    slots = asyncio.Semaphore(JOB_CONCURRENCY)
+    last_purge = 0.0
+    while True:
+        if time.monotonic() - last_purge > JOB_PURGE_SECONDS:
+            for path in job_store.purge_expired(JOB_TTL_SECONDS):
+                _remove_quietly(path)
+            last_purge = time.monotonic()
+
+        await slots.acquire()
+        job = job_store.claim_next()
+        if job is None:
+            slots.release()
+            _job_wakeup.clear()
+            try:
+                await asyncio.wait_for(_job_wakeup.wait(), JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        asyncio.create_task(_run_job(job, slots))
+
+
+@app.on_event("startup")
+async def start_workers():
+    global _job_wakeup, _job_dispatcher
+    # workers warm up in the background, so liveness answers while models load
+    ocr_pool.start(warm=WARMUP_ON_STARTUP)
+    requeued = job_store.requeue_interrupted()
+    if requeued:
+        print(f"🔹 Re-queued {requeued} interrupted job(s)")
+    _job_wakeup = asyncio.Event()
+    _job_dispatcher = asyncio.create_task(_dispatch_jobs())
+
+
+@app.on_event("shutdown")
+def stop_workers():
+    if _job_dispatcher is not None:
+        _job_dispatcher.cancel()
+    ocr_pool.shutdown()
 
 
 @app.get("/health")
+@app.get("/health/live")
 def health():
     return {"status": "ok"}
 
 
+@app.get("/health/ready")
+def ready():
+    if ocr_pool.ready:
+        return {"status": "ready", "ocr_pool": ocr_pool.stats()}
+    status = "error" if ocr_pool.error else "loading"
+    return JSONResponse({"status": status, "detail": ocr_pool.error}, status_code=503)
+
+
 @app.post(
     "/extract",
     summary="Extract FRA Claim Data",
@@ -85,32 +282,98 @@ def health():
 # inside your existing app.py definitions
 
 @app.post("/extract")
-async def extract(file: UploadFile = File(...)):
-    dst_path = os.path.join(UPLOAD_DIR, file.filename)
+async def extract(
+    file: UploadFile = File(...),
+    debug: bool = Query(False, description="Write OCR box overlays and a text dump to the debug directory."),
+):
+    tmp_path = None
+    handed_off = False  # the OCR call owns tmp_path from here on
     try:
-        with open(dst_path, "wb") as f:
-            shutil.copyfileobj(file.file, f)
+        with metrics.span("upload"):
+            source, digest, tmp_path = await spool_upload(file)
 
-        raw_text = extract_text(dst_path)
-        if not raw_text:
-            raise HTTPException(status_code=422, detail="No text detected in file.")
+        key = cache_key(digest, OCR_CONFIG_VERSION, EXTRACTOR_VERSION)
+        # debug requests always run OCR so their artifacts get written
+        cached = None if debug else await asyncio.to_thread(result_cache.get, key)
+        if cached is not None:
+            return JSONResponse({
+                "json": cached["schema"],
+                "pretty_text": pretty_print(cached["entities"]),
+                "records": cached.get("records", []),
+                "cache": {"status": "hit", "key": key},
+            })
 
-        entities = extract_entities(raw_text)
+        hashes = near = None
+        if NEAR_DUP_MODE != "off" and not debug and source_format(source, file.filename) in IMAGE_EXTS:
+            try:
+                hashes = await asyncio.to_thread(image_hashes, source)
+            except Exception:
+                pass  # undecodable: OCR reports it below
+            near = near_dups.lookup(*hashes) if hashes else None
+        shortcut = {}
+        if near is not None:
+            shortcut = {"near_duplicate": {"key": near.key, "distance": near.distance}}
+            cached = await asyncio.to_thread(result_cache.get, near.key) if NEAR_DUP_MODE == "result" else None
+            if cached is not None:
+                metrics.count("near_duplicate_lookups", result="result")
+                shortcut["near_duplicate"]["shortcut"] = "result"
+                return JSONResponse({
+                    "json": cached["schema"],
+                    "pretty_text": pretty_print(cached["entities"]),
+                    "records": cached.get("records", []),
+                    "cache": {"status": "near_hit", "key": key, **shortcut},
+                })
 
-        # for Annexure-II area conversion, try to convert if raw bigha present
-        # (we assume you have utils.area_converter.parse_bigha_string installed)
+        # a timed-out task keeps running (or waiting in the queue) with the
+        # spilled upload, so it is removed once the task has settled
+        settled = (lambda: _remove_quietly(tmp_path)) if tmp_path else None
+        handed_off = True
         try:
-            from utils.area_converter import parse_bigha_string
-            if entities.get("area_claimed_raw") and not entities.get("area_claimed_ha"):
-                ha = parse_bigha_string(entities.get("area_claimed_raw"))
-                if ha:
-                    entities["area_claimed_ha"] = ha
-        except Exception:
-            pass
-
-        schema = build_schema(entities)
+            if hashes:
+                result = await ocr_pool.run(process_image, source, debug, near.variant if near else None,
+                                            on_settled=settled)
+            else:
+                result = await ocr_pool.run(process_document, source, debug, file.filename, on_settled=settled)
+        except PoolSaturated as e:
+            raise HTTPException(
+                status_code=503,
+                detail="All OCR workers are busy, please retry.",
+                headers={"Retry-After": str(e.retry_after)},
+            )
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="OCR timed out for this file.")
+        except BrokenProcessPool:
+            raise HTTPException(
+                status_code=503,
+                detail="An OCR worker crashed on this file; the pool is restarting.",
+                headers={"Retry-After": "30"},
+            )
+        metrics.merge(result.pop("timings", None))
+        # a match that leaves the usual variant schedule unchanged is a plain OCR run
+        replayed = bool(result.get("replayed"))
+        if hashes:
+            metrics.count("near_duplicate_lookups", result="variant" if replayed else "match" if near else "none")
+
+        raw_text, entities, schema = result["raw_text"], result["entities"], result["schema"]
+        if not raw_text:
+            raise HTTPException(status_code=422, detail="No text detected in file.")
+
         pretty = pretty_print(entities)
-        return JSONResponse({"json": schema, "pretty_text": pretty})
+        await asyncio.to_thread(result_cache.put, key, {"raw_text": raw_text, "entities": entities,
+                                                        "schema": schema, "records": result["records"]})
+        if hashes and near is None:
+            near_dups.add(*hashes, key, result.get("base_variant"))
+        if replayed:
+            shortcut["near_duplicate"].update(shortcut="variant", variant=near.variant,
+                                              variant_used=result.get("variant"))
+        else:
+            shortcut = {}
+        return JSONResponse({
+            "json": schema,
+            "pretty_text": pretty,
+            "records": result["records"],
+            "cache": {"status": "miss", "key": key, **shortcut},
+        })
 
     except HTTPException:
         raise
@@ -121,12 +384,327 @@ async def extract(file: UploadFile = File(...)):
             detail=f"Processing failed: {e.__class__.__name__}: {e}\n{tb}"
         )
     finally:
-        try:
-            os.remove(dst_path)
-        except Exception:
-            pass
+        if tmp_path and not handed_off:
+            _remove_quietly(tmp_path)
+
+
+# ---- Batch uploads ----
+# Many files, or ZIP archives read entry by entry (never unpacked to disk);
+# results stream back as NDJSON in completion order
+BATCH_CONCURRENCY = int(os.environ.get("FRA_BATCH_CONCURRENCY", str(max(1, ocr_pool.workers))))
+BATCH_MAX_FILES = int(os.environ.get("FRA_BATCH_MAX_FILES", "500"))
+BATCH_MAX_ENTRY_BYTES = int(os.environ.get("FRA_BATCH_MAX_ENTRY_MB", "64")) * 1024 * 1024
+
+
+class BatchItem(NamedTuple):
+    name: str
+    path: Optional[str] = None                # a plain upload, saved to UPLOAD_DIR
+    digest: Optional[str] = None
+    archive: Optional[zipfile.ZipFile] = None  # or an entry of an uploaded ZIP
+    info: Optional[zipfile.ZipInfo] = None
 
 
+def _save_upload(file: UploadFile, path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "wb") as f:
+        for chunk in iter(lambda: file.file.read(1 << 20), b""):
+            digest.update(chunk)
+            f.write(chunk)
+    return digest.hexdigest()
+
+
+def _zip_items(name: str, archive: zipfile.ZipFile) -> List[BatchItem]:
+    items = []
+    for info in archive.infolist():
+        base = os.path.basename(info.filename)
+        if info.is_dir() or not base or base.startswith(".") or info.filename.startswith("__MACOSX/"):
+            continue
+        items.append(BatchItem(f"{name}/{info.filename}", archive=archive, info=info))
+    return items
+
+
+def _load_item(item: BatchItem):
+    """(source, sha256) for one batch document; ZIP entries are read into memory."""
+    if item.archive is None:
+        return item.path, item.digest
+    if item.info.file_size > BATCH_MAX_ENTRY_BYTES:
+        raise ValueError(f"Entry larger than {BATCH_MAX_ENTRY_BYTES // (1024 * 1024)} MB")
+    data = item.archive.read(item.info)
+    return data, hashlib.sha256(data).hexdigest()
+
+
+async def _batch_document(index: int, name: str, source, digest: str):
+    """(NDJSON line, result to run the NER fallback on, or None)."""
+    line = {"index": index, "filename": name}
+    try:
+        key = cache_key(digest, OCR_CONFIG_VERSION, EXTRACTOR_VERSION)
+        cached = await asyncio.to_thread(result_cache.get, key)
+        status = "hit" if cached is not None else "miss"
+        if cached is None:
+            while True:
+                try:
+                    result = await ocr_pool.run(process_document, source, False, name)
+                    break
+                except PoolSaturated as e:
+                    # leave /extract its share; wait for a slot instead of failing the document
+                    await asyncio.sleep(e.retry_after)
+            with metrics.detached():
+                metrics.merge(result.pop("timings", None))
+            if not result["raw_text"]:
+                line.update(status="empty", error="No text detected in file.")
+                return line, None
+            cached = {"raw_text": result["raw_text"], "entities": result["entities"],
+                      "schema": result["schema"], "records": result["records"]}
+            await asyncio.to_thread(result_cache.put, key, cached)
+        line.update(status="ok", form_type=cached["entities"]["form_type"], json=cached["schema"],
+                    records=cached.get("records", []), cache={"status": status, "key": key})
+        if NER_FALLBACK and ner_missing(cached):
+            # patched by the NER fallback: copies, so the cached result stays as extracted
+            doc = {"raw_text": cached["raw_text"], "schema": copy.deepcopy(line["json"]),
+                   "records": copy.deepcopy(line["records"])}
+            line.update(json=doc["schema"], records=doc["records"])
+            return line, doc
+    except asyncio.TimeoutError:
+        line.update(status="error", error="OCR timed out for this file.")
+    except Exception as e:
+        line.update(status="error", error=f"{e.__class__.__name__}: {e}")
+    return line, None
+
+
+def _ner_lines(held):
+    with metrics.detached():
+        fill_from_ner([doc for _, doc in held])
+    for line, doc in held:
+        if doc.get("ner_fields"):
+            line["ner_fields"] = doc["ner_fields"]
+    return [line for line, _ in held]
+
+
+async def _finished(done, held, flush: bool) -> List[bytes]:
+    # lines still missing a key field wait for one batched NER run
+    out = []
+    for task in done:
+        line, doc = task.result()
+        if doc is None:
+            out.append(_ndjson(line))
+        else:
+            held.append((line, doc))
+    if held and (flush or len(held) >= NER_BATCH_SIZE):
+        out += [_ndjson(line) for line in await asyncio.to_thread(_ner_lines, held)]
+        held.clear()
+    return out
+
+
+def _ndjson(line) -> bytes:
+    with metrics.detached():
+        metrics.count("batch_documents", status=line["status"])
+    return (json.dumps(line, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+async def _stream_batch(items: List[BatchItem], saved: List[str], archives: List[zipfile.ZipFile]):
+    # at most BATCH_CONCURRENCY documents (and so ZIP entries) are in memory at once
+    pending = set()
+    held = []
+    try:
+        for index, item in enumerate(items):
+            if len(pending) >= BATCH_CONCURRENCY:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for chunk in await _finished(done, held, flush=False):
+                    yield chunk
+            if source_format(item.name) not in DOC_EXTS:
+                yield _ndjson({"index": index, "filename": item.name, "status": "error",
+                               "error": f"Unsupported file format: {source_format(item.name)}"})
+                continue
+            try:
+                source, digest = await asyncio.to_thread(_load_item, item)
+            except Exception as e:
+                yield _ndjson({"index": index, "filename": item.name, "status": "error",
+                               "error": f"{e.__class__.__name__}: {e}"})
+                continue
+            pending.add(asyncio.ensure_future(_batch_document(index, item.name, source, digest)))
+        while pending or held:
+            done = set()
+            if pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for chunk in await _finished(done, held, flush=not pending):
+                yield chunk
+    finally:
+        for task in pending:
+            task.cancel()
+        _cleanup_batch(saved, archives)
+
+
+def _cleanup_batch(saved: List[str], archives: List[zipfile.ZipFile]) -> None:
+    for archive in archives:
+        archive.close()
+    for path in saved:
+        _remove_quietly(path)
+
+
+@app.post("/extract/batch")
+async def extract_batch(files: List[UploadFile] = File(...)):
+    """
+    Extract many documents in one request: any number of files, and/or ZIP
+    archives of them. One NDJSON line per document ("json" and "records" as in
+    /extract, or "error") is streamed back as each one finishes; "index" is its
+    position in the upload (archive entries in archive order).
+    """
+    saved: List[str] = []
+    archives: List[zipfile.ZipFile] = []
+    items: List[BatchItem] = []
+    try:
+        for file in files:
+            ext = os.path.splitext(file.filename or "")[1].lower()
+            path = os.path.join(UPLOAD_DIR, f"batch_{uuid.uuid4().hex}{ext}")
+            saved.append(path)
+            digest = await asyncio.to_thread(_save_upload, file, path)
+            if ext != ".zip":
+                items.append(BatchItem(file.filename or os.path.basename(path), path=path, digest=digest))
+                continue
+            try:
+                archive = zipfile.ZipFile(path)
+            except zipfile.BadZipFile:
+                raise HTTPException(status_code=400, detail=f"Not a valid ZIP archive: {file.filename}")
+            archives.append(archive)
+            items += _zip_items(file.filename, archive)
+        if not items:
+            raise HTTPException(status_code=400, detail="No documents in the upload.")
+        if len(items) > BATCH_MAX_FILES:
+            raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_FILES} documents per batch.")
+    except BaseException:
+        _cleanup_batch(saved, archives)
+        raise
+    return StreamingResponse(_stream_batch(items, saved, archives), media_type="application/x-ndjson")
+
+
+@app.get("/cache")
+def cache_stats():
+    return result_cache.stats()
+
+
+@app.delete("/cache")
+def cache_clear():
+    return {"removed": result_cache.clear(), "near_duplicates_removed": near_dups.clear()}
+
+
+@app.delete("/cache/{key}")
+def cache_invalidate(key: str):
+    if not result_cache.invalidate(key):
+        raise HTTPException(status_code=404, detail="No cached result for this key.")
+    return {"removed": 1}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    pool = ocr_pool.stats()
+    cache = result_cache.stats()
+    extra = []
+    extra += metrics.metric_lines("fra_http_requests_in_flight", "gauge",
+                                  "HTTP requests being handled.", [((), _http_in_flight)])
+    extra += metrics.metric_lines("fra_ocr_in_flight", "gauge",
+                                  "Documents running or queued on the OCR pool.", [((), pool["in_flight"])])
+    extra += metrics.metric_lines("fra_ocr_capacity", "gauge",
+                                  "OCR pool workers plus queue slots.", [((), pool["capacity"])])
+    extra += metrics.metric_lines("fra_ocr_ready", "gauge",
+                                  "1 once the OCR workers have loaded their models.", [((), int(pool["ready"]))])
+    extra += metrics.metric_lines("fra_cache_requests_total", "counter", "Result cache lookups.",
+                                  [((("result", "hit"),), cache["hits"]), ((("result", "miss"),), cache["misses"])])
+    extra += metrics.metric_lines("fra_cache_hit_ratio", "gauge",
+                                  "Result cache hits / lookups since start.", [((), round(cache["hit_rate"], 4))])
+    extra += metrics.metric_lines("fra_cache_memory_items", "gauge",
+                                  "Results held in the in-memory cache.", [((), cache["memory_items"])])
+    extra += metrics.metric_lines("fra_near_duplicate_items", "gauge",
+                                  "Images in the near-duplicate index.", [((), len(near_dups))])
+    return PlainTextResponse(metrics.render(extra), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(file: UploadFile = File(...)):
+    ext = os.path.splitext(file.filename or "")[1].lower()
+    dst_path = os.path.join(JOB_FILES_DIR, f"{uuid.uuid4().hex}{ext}")
+    await asyncio.to_thread(_save_upload, file, dst_path)
+    job_id = job_store.create(file.filename, dst_path)
+    if _job_wakeup is not None:  # before startup the dispatcher's first poll picks it up
+        _job_wakeup.set()
+    return {"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"}
+
+
+def _job_status(job):
+    return {
+        "job_id": job["id"],
+        "filename": job["filename"],
+        "status": job["status"],
+        "pages_done": job["pages_done"],
+        "pages_total": job["pages_total"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = job_store.get(job_id, with_pages=True)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job.")
+    body = _job_status(job)
+    if job["status"] == DONE:
+        body["result_url"] = f"/jobs/{job_id}/result"
+    else:
+        # entities over the pages read so far; regex extraction is cheap
+        partial_text = "\n".join(t for t in job["pages"] if t).strip()
+        body["partial"] = {
+            "pages": job["pages"],
+            "entities": extract_entities(partial_text) if partial_text else None,
+        }
+    return body
+
+
+@app.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job.")
+    if job["status"] == FAILED:
+        code = 422 if (job["error"] or "").startswith("No text detected") else 500
+        raise HTTPException(status_code=code, detail=job["error"])
+    if job["status"] != DONE:
+        return JSONResponse(_job_status(job), status_code=202)
+    result = job["result"]
+    return {"json": result["schema"], "pretty_text": pretty_print(result["entities"]),
+            "records": result.get("records", [])}
+
+
+def _job_rows(job_ids: List[str]):
+    # one job result in memory at a time; failed jobs contribute no rows
+    for job_id in job_ids:
+        job = job_store.get(job_id)
+        if job is not None and job["result"]:
+            yield from document_rows(job_id, job["result"])
+
+
+@app.get("/export")
+def export_jobs(
+    job_id: List[str] = Query(..., description="Job id; repeat it to export a batch of jobs."),
+    format: str = Query("csv", description="jsonl, csv, parquet or arrow."),
+    chunk_rows: int = Query(CHUNK_ROWS, ge=1, le=100_000, description="Rows per chunk / row group."),
+):
+    """Flattened records of finished jobs (one row per form), streamed in chunks."""
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(FORMATS)}")
+    statuses = job_store.statuses(job_id)
+    missing = [j for j in job_id if j not in statuses]
+    if missing:
+        raise HTTPException(status_code=404, detail={"unknown_jobs": missing})
+    unfinished = [j for j in job_id if statuses[j] not in (DONE, FAILED)]
+    if unfinished:
+        raise HTTPException(status_code=409, detail={"unfinished_jobs": unfinished})
+    try:
+        body = export_rows(_job_rows(job_id), format, chunk_rows)
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    return StreamingResponse(body, media_type=FORMATS[format],
+                             headers={"Content-Disposition": f'attachment; filename="fra_export.{format}"'})
+
 
 if __name__ == "__main__":
     uvicorn.run("app:app", host="127.0.0.1", port=8000, reload=True)
@@ -0,0 +1,255 @@
+# batch.py
+"""
+Batch extraction for backlog digitisation.
+
+    python batch.py scans/ more/file.pdf --list files.txt -o results.jsonl -w 4
+
+Documents are spread over worker processes that each load PaddleOCR once. One
+JSONL record is written per document as soon as it finishes (in completion
+order), and every finished path is appended to a manifest next to the output,
+so re-running the same command skips what is already done.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from ocr import debug_writer
+from ocr.ocr_engine import DOC_EXTS
+from ocr.worker_pool import OCR_WORKERS, _init_worker, threads_per_worker
+from extractors.ner_fallback import NER_BATCH_SIZE, NER_FALLBACK
+from pipeline import fill_from_ner, ner_missing, process_document
+
+PROGRESS_EVERY = float(os.environ.get("FRA_BATCH_PROGRESS_SECS", "10"))
+
+
+# ---- Inputs ----
+
+def iter_documents(inputs: Iterable[str]) -> Iterator[str]:
+    """Files given directly, plus supported documents found under directories."""
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, dirs, files in os.walk(item):
+                dirs.sort()
+                for name in sorted(files):
+                    if os.path.splitext(name)[1].lower() in DOC_EXTS:
+                        yield os.path.join(root, name)
+        elif os.path.isfile(item):
+            yield item
+        else:
+            print(f"⚠️ Skipping missing input: {item}", file=sys.stderr)
+
+
+def read_list(list_path: str) -> List[str]:
+    with open(list_path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+# ---- Manifest ----
+
+def manifest_path(output: str) -> str:
+    return output + ".manifest"
+
+
+def load_manifest(path: str, retry_failed: bool = False) -> Set[str]:
+    """Paths already processed (failed ones excluded when retry_failed)."""
+    done: Set[str] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn last line from an interrupted run
+            if retry_failed and entry.get("status") == "error":
+                done.discard(entry["path"])
+            else:
+                done.add(entry["path"])
+    return done
+
+
+# ---- Work ----
+
+def process_file(path: str, include_text: bool = False) -> Dict[str, Any]:
+    """Worker-side: one JSONL record for one document; never raises."""
+    start = time.perf_counter()
+    record: Dict[str, Any] = {"path": path}
+    try:
+        result = process_document(path)
+        if not result["raw_text"]:
+            record.update(status="empty", error="No text detected in file.")
+        else:
+            record.update(
+                status="ok",
+                form_type=result["entities"]["form_type"],
+                schema=result["schema"],
+                records=result["records"],
+            )
+            if include_text:
+                record["raw_text"] = result["raw_text"]
+    except Exception as e:
+        record.update(status="error", error=f"{e.__class__.__name__}: {e}")
+    # worker processes exit without waiting for the debug writer's daemon thread
+    debug_writer.flush()
+    record["seconds"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def batch_extract_entities(paths: Iterable[str], workers: int = OCR_WORKERS,
+                           include_text: bool = False, ner: bool = NER_FALLBACK) -> Iterator[Dict[str, Any]]:
+    """
+    Yield one record per document, in completion order. workers == 0 runs
+    everything in this process. At most 2 * workers documents are queued at
+    once, so a huge file list is never submitted up front. With ner, records
+    missing a key field are held back and go through the NER fallback in
+    batches of NER_BATCH_SIZE (see with_ner_fallback).
+    """
+    records = _extract_all(paths, workers, include_text or ner)
+    if ner:
+        records = with_ner_fallback(records, include_text)
+    yield from records
+
+
+def with_ner_fallback(records: Iterable[Dict[str, Any]], include_text: bool = False,
+                      batch_size: int = NER_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Pass records through, holding the ones with ner_missing() fields until
+    batch_size of them are waiting; the NER model runs once per batch, in this
+    process. Records need "raw_text", which is dropped unless include_text.
+    """
+    held: List[Dict[str, Any]] = []
+
+    def flush() -> Iterator[Dict[str, Any]]:
+        fill_from_ner(held)
+        for rec in held:
+            if not include_text:
+                rec.pop("raw_text", None)
+            yield rec
+        held.clear()
+
+    for rec in records:
+        if rec["status"] == "ok" and ner_missing(rec):
+            held.append(rec)
+            if len(held) >= batch_size:
+                yield from flush()
+            continue
+        if not include_text:
+            rec.pop("raw_text", None)
+        yield rec
+    yield from flush()
+
+
+def _extract_all(paths: Iterable[str], workers: int, include_text: bool) -> Iterator[Dict[str, Any]]:
+    if workers <= 0:
+        for path in paths:
+            yield process_file(path, include_text)
+        return
+
+    pool = ProcessPoolExecutor(
+        workers, mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker, initargs=(threads_per_worker(workers), True),
+    )
+    pending: Set[Future] = set()
+    try:
+        for path in paths:
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    yield fut.result()
+            pending.add(pool.submit(process_file, path, include_text))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                yield fut.result()
+    finally:
+        for fut in pending:
+            fut.cancel()
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+# ---- Progress ----
+
+class Progress:
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.start = time.perf_counter()
+        self._last = self.start
+
+    def update(self, record: Dict[str, Any]) -> None:
+        self.done += 1
+        if record["status"] != "ok":
+            self.failed += 1
+        now = time.perf_counter()
+        if now - self._last >= PROGRESS_EVERY or self.done == self.total:
+            self._last = now
+            print(self.line(), file=sys.stderr, flush=True)
+
+    def line(self) -> str:
+        elapsed = time.perf_counter() - self.start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        left = self.total - self.done
+        eta = _fmt_secs(left / rate) if rate > 0 else "?"
+        return (f"🔹 {self.done}/{self.total} docs ({self.failed} failed) | "
+                f"{rate * 60:.1f} docs/min | elapsed {_fmt_secs(elapsed)} | ETA {eta}")
+
+
+def _fmt_secs(secs: float) -> str:
+    secs = int(secs)
+    return f"{secs // 3600}:{secs % 3600 // 60:02d}:{secs % 60:02d}"
+
+
+# ---- CLI ----
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Extract FRA entities from many documents.")
+    ap.add_argument("inputs", nargs="*", help="files and/or directories (walked recursively)")
+    ap.add_argument("--list", dest="list_file", help="text file with one document path per line")
+    ap.add_argument("-o", "--output", default="results.jsonl", help="JSONL output (appended to)")
+    ap.add_argument("-w", "--workers", type=int, default=OCR_WORKERS,
+                    help="OCR worker processes (0 = run in this process)")
+    ap.add_argument("--retry-failed", action="store_true",
+                    help="reprocess documents that errored in a previous run")
+    ap.add_argument("--include-text", action="store_true", help="include raw OCR text in records")
+    ap.add_argument("--ner", action=argparse.BooleanOptionalAction, default=NER_FALLBACK,
+                    help="spaCy NER fallback for missing claimant/village/district (FRA_NER_FALLBACK)")
+    args = ap.parse_args(argv)
+
+    inputs = list(args.inputs)
+    if args.list_file:
+        inputs += read_list(args.list_file)
+    if not inputs:
+        ap.error("no inputs given")
+
+    manifest = manifest_path(args.output)
+    done = load_manifest(manifest, args.retry_failed)
+    todo = [p for p in dict.fromkeys(os.path.abspath(p) for p in iter_documents(inputs))
+            if p not in done]
+    print(f"🔹 {len(todo)} documents to process ({len(done)} already in {manifest})",
+          file=sys.stderr)
+    if not todo:
+        return 0
+
+    progress = Progress(len(todo))
+    with open(args.output, "a", encoding="utf-8") as out, \
+            open(manifest, "a", encoding="utf-8") as man:
+        for record in batch_extract_entities(todo, args.workers, args.include_text, args.ner):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            # manifest last: a crash in between reprocesses the file rather than losing it
+            man.write(json.dumps({"path": record["path"], "status": record["status"]}) + "\n")
+            man.flush()
+            progress.update(record)
+
+    debug_writer.flush()
+    return 1 if progress.failed == progress.total else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
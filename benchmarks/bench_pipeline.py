@@ -0,0 +1,211 @@
+# benchmarks/bench_pipeline.py
+"""
+End-to-end benchmark on the synthetic FRA corpus from pdf_sample_gen.py.
+
+Per document it times each stage separately: decode (image decode or PDF
+rasterisation), preprocess and OCR for every variant, the production
+run_ocr_on_image path, extraction and schema building. It reports p50/p95 per
+stage, docs/sec for the production path, peak RSS and how many expected
+fields were extracted. Results are JSON; pass --baseline to compare against a
+stored run and exit non-zero on a regression.
+
+    python -m benchmarks.bench_pipeline --corpus bench_docs --out bench.json
+    python -m benchmarks.bench_pipeline --corpus bench_docs --baseline bench_baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+try:
+    import resource  # not available on Windows
+except ImportError:
+    resource = None
+
+from ocr import ocr_engine
+from ocr.ocr_engine import (OCR_CONFIG_VERSION, PDF_DPI, VARIANT_SPECS, PreprocessGraph, ocr_once,
+                            rasterize_pdf_page, run_ocr_on_image, to_numpy, warm_up)
+from extractors.entities import EXTRACTOR_VERSION, extract_entities
+from schemas.fra_schema import build_schema
+from pdf_sample_gen import DEFAULT_DPIS, DEGRADATIONS, generate_corpus
+
+# metrics where larger is better; everything else is a latency/size
+HIGHER_IS_BETTER = {"docs_per_sec", "fields_matched_ratio"}
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    s = sorted(samples)
+    pick = lambda q: s[min(len(s) - 1, int(q * len(s)))]
+    return {
+        "n": len(s),
+        "mean_ms": round(sum(s) / len(s) * 1e3, 3),
+        "p50_ms": round(pick(0.5) * 1e3, 3),
+        "p95_ms": round(pick(0.95) * 1e3, 3),
+        "max_ms": round(s[-1] * 1e3, 3),
+    }
+
+
+def decode(path: str):
+    if path.lower().endswith(".pdf"):
+        with open(path, "rb") as f:
+            return to_numpy(rasterize_pdf_page(f.read(), 1, PDF_DPI))
+    with open(path, "rb") as f:
+        return to_numpy(f.read())
+
+
+def run(corpus_dir: str, entries: List[Dict], per_variant: bool, variants: Optional[List[str]]) -> Dict:
+    timings: Dict[str, List[float]] = defaultdict(list)
+    matched = expected_total = 0
+
+    t0 = time.perf_counter()
+    warm_up()
+    model_load = time.perf_counter() - t0
+
+    specs = [s for s in VARIANT_SPECS if not variants or s[0] in variants]
+    pipeline_secs = 0.0
+    for entry in entries:
+        path = os.path.join(corpus_dir, entry["file"])
+
+        t0 = time.perf_counter()
+        img = decode(path)
+        t_decode = time.perf_counter() - t0
+        timings["decode"].append(t_decode)
+
+        if per_variant:
+            # preprocess.<tag> is the incremental cost given the shared intermediates
+            graph = PreprocessGraph(img, [spec[0] for spec in specs])
+            for step, (tag, _, _, _) in enumerate(specs):
+                t0 = time.perf_counter()
+                v = graph.variant(tag)
+                timings[f"preprocess.{tag}"].append(time.perf_counter() - t0)
+                t0 = time.perf_counter()
+                ocr_once(v, tag=tag)
+                timings[f"ocr.{tag}"].append(time.perf_counter() - t0)
+                del v
+                graph.release(step)
+            del graph
+
+        t0 = time.perf_counter()
+        text = run_ocr_on_image(img)
+        t_ocr = time.perf_counter() - t0
+        timings["run_ocr_on_image"].append(t_ocr)
+
+        t0 = time.perf_counter()
+        entities = extract_entities(text)
+        t_extract = time.perf_counter() - t0
+        timings["extract_entities"].append(t_extract)
+
+        t0 = time.perf_counter()
+        build_schema(entities)
+        t_schema = time.perf_counter() - t0
+        timings["build_schema"].append(t_schema)
+
+        pipeline_secs += t_decode + t_ocr + t_extract + t_schema
+        for key, want in entry["expected"].items():
+            expected_total += 1
+            matched += entities.get(key) == want
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "ocr_config": OCR_CONFIG_VERSION,
+            "extractor_version": EXTRACTOR_VERSION,
+            "ocr_cpu_threads": ocr_engine.OCR_CPU_THREADS,
+            "docs": len(entries),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "model_load_s": round(model_load, 3),
+        "stages": {name: summarize(samples) for name, samples in timings.items()},
+        "docs_per_sec": round(len(entries) / pipeline_secs, 4) if pipeline_secs else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "fields_matched_ratio": round(matched / expected_total, 4) if expected_total else None,
+    }
+
+
+def flatten(result: Dict) -> Dict[str, float]:
+    flat = {f"stages.{name}.p50_ms": s["p50_ms"] for name, s in result["stages"].items()}
+    for key in ("docs_per_sec", "peak_rss_mb", "fields_matched_ratio"):
+        if result.get(key) is not None:
+            flat[key] = result[key]
+    return flat
+
+
+def compare(result: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Print a side-by-side table; return the metrics that regressed beyond tolerance."""
+    cur, base = flatten(result), flatten(baseline)
+    regressions = []
+    print(f"\n{'metric':<42}{'baseline':>12}{'current':>12}{'change':>10}", file=sys.stderr)
+    for key in sorted(cur.keys() & base.keys()):
+        b, c = base[key], cur[key]
+        change = (c - b) / b if b else 0.0
+        worse = -change if key in HIGHER_IS_BETTER else change
+        flag = ""
+        if worse > tolerance:
+            regressions.append(key)
+            flag = "  ⚠️"
+        print(f"{key:<42}{b:>12.3f}{c:>12.3f}{change:>+10.1%}{flag}", file=sys.stderr)
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--corpus", help="directory with manifest.json (generated there if missing; "
+                                     "a temporary directory when omitted)")
+    ap.add_argument("--dpis", default=",".join(str(d) for d in DEFAULT_DPIS))
+    ap.add_argument("--levels", default=",".join(DEGRADATIONS))
+    ap.add_argument("--limit", type=int, help="only the first N documents")
+    ap.add_argument("--variants", help="comma-separated variant tags to time individually (default all)")
+    ap.add_argument("--no-per-variant", action="store_true", help="skip per-variant preprocess/OCR timing")
+    ap.add_argument("--out", help="write the JSON result here (stdout otherwise)")
+    ap.add_argument("--baseline", help="JSON result of an earlier run to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression (0.2 = 20%%)")
+    args = ap.parse_args()
+
+    corpus = args.corpus or tempfile.mkdtemp(prefix="fra_bench_")
+    manifest = os.path.join(corpus, "manifest.json")
+    if os.path.exists(manifest):
+        with open(manifest, encoding="utf-8") as f:
+            entries = json.load(f)
+    else:
+        print(f"🔹 Generating synthetic corpus in {corpus} ...", file=sys.stderr)
+        entries = generate_corpus(corpus, dpis=[int(d) for d in args.dpis.split(",")],
+                                  levels=args.levels.split(","))
+    entries = entries[:args.limit] if args.limit else entries
+
+    result = run(corpus, entries, not args.no_per_variant,
+                 args.variants.split(",") if args.variants else None)
+
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"✅ Results written to {args.out}", file=sys.stderr)
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n⚠️ {len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}: "
+                  + ", ".join(regressions), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
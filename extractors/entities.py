@@ -1,106 +1,80 @@
 # extractors/entities.py
 import re
-import spacy
-from typing import Optional, Dict, Callable
+from typing import Optional, Dict, Callable, List
 
-nlp = spacy.load("en_core_web_trf")
-FLAGS = re.I | re.M
+from extractors.field_scanner import scan_fields
+from extractors.form_classifier import PAGE_BREAK, detect_form, segment_pages
+from extractors.layout_fields import layout_fields
+from ocr.lines import OcrLine
 
-# Helper regex utils
-def _find(pattern: str, text: str) -> Optional[str]:
-    m = re.search(pattern, text, flags=FLAGS)
-    return m.group(1).strip() if m else None
+# Bump when extraction output changes, so cached /extract results are not reused
+EXTRACTOR_VERSION = "5"
 
-def _find_all(pattern: str, text: str):
-    return re.findall(pattern, text, flags=FLAGS)
+def _to_float(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
 
 # Form detection (broad)
 def detect_form_type(text: str) -> str:
-    t = text.upper()
-    if "ANNEXURE-II" in t or "TITLE FOR FOREST LAND UNDER OCCUPATION" in t:
-        return "Annexure-II"
-    if "ANNEXURE-III" in t:
-        return "Annexure-III"
-    if "ANNEXURE-IV" in t:
-        return "Annexure-IV"
-    if "FORM – A" in t or re.search(r"CLAIM FORM FOR RIGHTS TO FOREST LAND", t):
-        return "Form A"
-    if "FORM – B" in t or "CLAIM FORM FOR COMMUNITY RIGHTS" in t:
-        return "Form B"
-    if "FORM – C" in t or "CLAIM FORM FOR RIGHTS TO COMMUNITY FOREST RESOURCE" in t:
-        return "Form C"
-    return "Unknown"
-
-# Generic fallback extraction used across forms
-def extract_common(text: str) -> Dict:
-    claimant = _find(r"Name of the claimant(?:\(s\))?:\s*([A-Za-z0-9 ,.'/-]+)", text)
-    spouse = _find(r"Name of the spouse:\s*([A-Za-z0-9 ,.'/-]+)", text)
-    parent = _find(r"Name of father/mother:\s*([A-Za-z0-9 ,.'/-]+)", text)
-    tribe = _find(r"Tribe name:\s*([A-Za-z0-9 ,.'/-]+)", text)
-    patta = _find(r"Patta\s*No\.?:\s*([A-Za-z0-9/_-]+)", text)
-    dlc = _find(r"Date of DLC decision:\s*(\d{1,2}[/\-]\d{1,2}[/\-]\d{4})", text)
-
+    # one keyword-automaton pass; the longest keyword wins where several start
+    # together, so "ANNEXURE-III" is no longer read as Annexure-II
+    return detect_form(text)
+
+# Generic fallback extraction used across forms.
+# Every extractor takes the text plus, optionally, the scan_fields() result for
+# it, so extract_entities scans each document once however many extractors run.
+def extract_common(text: str, fields: Optional[Dict] = None) -> Dict:
+    f = fields if fields is not None else scan_fields(text)
     return {
-        "claimant_name": claimant,
-        "spouse_name": spouse,
-        "father_mother_name": parent,
-        "tribe_name": tribe,
-        "patta_number": patta,
-        "dlc_decision_date": dlc
+        "claimant_name": f["claimant_name"],
+        "spouse_name": f["spouse_name"],
+        "father_mother_name": f["father_mother_name"],
+        "tribe_name": f["tribe_name"],
+        "patta_number": f["patta_number"],
+        "dlc_decision_date": f["dlc_decision_date"]
     }
 
 # Form-specific extractors
 
-def extract_form_a(text: str) -> Dict:
-    base = extract_common(text)
-    village = _find(r"Village:\s*([A-Za-z0-9 \-.,()]+)", text)
-    gp = _find(r"Gram\s*Panchayat:\s*([A-Za-z0-9 \-.,()]+)", text)
-    tehsil = _find(r"Tehsil/Taluka:\s*([A-Za-z0-9 \-.,()]+)", text)
-    district = _find(r"District:\s*([A-Za-z0-9 \-.,()]+)", text)
-    area = _find(r"Area of land claimed:\s*([\d.]+)\s*(?:ha|hectare|hectares)?", text)
-    status = _find(r"Claim status:\s*(Approved|Rejected|Pending)", text)
-    livelihood = _find(r"Livelihood type:\s*([A-Za-z0-9 ,.-]+)", text)
-    water = _find(r"Water source type:\s*([A-Za-z0-9 ,.-]+)", text)
+def extract_form_a(text: str, fields: Optional[Dict] = None) -> Dict:
+    f = fields if fields is not None else scan_fields(text)
+    area = _to_float(f["area_of_land"])
 
     ent = {
-        **base,
+        **extract_common(text, f),
         "form_type": "Form A",
-        "village": village,
-        "gram_panchayat": gp,
-        "tehsil": tehsil,
-        "district": district,
-        "area_claimed": float(area) if area else None,
-        "area_unit": "hectares" if area else None,
-        "fra_claim_status": status,
-        "livelihood_type": livelihood,
-        "water_source_type": water
+        "village": f["village"],
+        "gram_panchayat": f["gram_panchayat"],
+        "tehsil": f["tehsil"],
+        "district": f["district"],
+        "area_claimed": area,
+        "area_unit": "hectares" if area is not None else None,
+        "fra_claim_status": f["fra_claim_status"],
+        "livelihood_type": f["livelihood_type"],
+        "water_source_type": f["water_source_type"]
     }
     return ent
 
-def extract_form_b_or_c(text: str) -> Dict:
-    base = extract_common(text)
-    village = _find(r"Village:\s*([A-Za-z0-9 \-.,()]+)", text) or _find(r"Village/Gram Sabha:\s*([A-Za-z0-9 \-.,()]+)", text)
-    gp = _find(r"Gram\s*Panchayat:\s*([A-Za-z0-9 \-.,()]+)", text)
-    district = _find(r"District:\s*([A-Za-z0-9 \-.,()]+)", text)
-    community_rights = _find(r"Nature of community rights(?:.*):\s*([\s\S]+?)(?:\n\d|\n$)", text)
-    area = _find(r"Extent of land .*?(\d+[\d., ]*ha|\d+[\d., ]*hectares)?", text)
-
+def extract_form_b_or_c(text: str, fields: Optional[Dict] = None) -> Dict:
+    f = fields if fields is not None else scan_fields(text)
     ent = {
-        **base,
+        **extract_common(text, f),
         "form_type": "Form B/C",
-        "village": village,
-        "gram_panchayat": gp,
-        "district": district,
-        "community_rights_description": community_rights,
-        "area_claimed_raw": area,
+        "village": f["village"],
+        "gram_panchayat": f["gram_panchayat"],
+        "district": f["district"],
+        "community_rights_description": f["community_rights_description"],
+        "area_claimed_raw": f["extent_of_land"],
         "area_claimed_ha": None
     }
     return ent
 
-def extract_annexure_ii(text: str) -> Dict:
-    base = extract_common(text)
+def extract_annexure_ii(text: str, fields: Optional[Dict] = None) -> Dict:
+    f = fields if fields is not None else scan_fields(text)
     # Name(s) of holders: often in numbered column — collect by capturing the block
-    holders_block = _find(r"Name\(s\) of Holder\(s\)[\s\S]*?:\s*([\s\S]+?)\n\d", text) or _find(r"Name\(s\) of Holder\(s\).*?\n([\s\S]+?)\n\d", text)
+    holders_block = f["holders_block"]
     holders = None
     if holders_block:
         # split on newline/semicolon/numbering
@@ -108,55 +82,39 @@ def extract_annexure_ii(text: str) -> Dict:
         parts = [p.strip().strip(".,") for p in parts if p and len(p.strip())>1]
         holders = parts
 
-    dependents = _find(r"Name of Dependents:\s*([\s\S]+?)\n\d") or _find(r"Name of Dependents:\s*([\s\S]+?)\n", text)
-    address = _find(r"Address:\s*([A-Za-z0-9 ,.\-()/]+)", text)
-    village = _find(r"Village(?:/Gram Sabha)?:\s*([A-Za-z0-9 ,.\-()]+)", text)
-    gram_panchayat = _find(r"Gram Panchayat:\s*([A-Za-z0-9 ,.\-()]+)", text)
-    tehsil = _find(r"Tehsil/Taluka:\s*([A-Za-z0-9 ,.\-()]+)", text)
-    district = _find(r"District:\s*([A-Za-z0-9 ,.\-()]+)", text)
-    st_status = _find(r"Whether Scheduled Tribe.*?:\s*([A-Za-z ,]+)", text)
-    area_raw = _find(r"Area:\s*([0-9\-\s:]+ *Bighas)", text) or _find(r"Area:\s*([0-9. ]+ *Bigha|[0-9. ]+ *Bighas)", text)
-    khasra = _find(r"Khasra No\.?:\s*([0-9/]+)", text) or _find(r"Khasra No\.?:\s*([A-Za-z0-9/\- ]+)", text)
-    boundaries = _find(r"Description of boundaries[\s\S]*?:\s*([\s\S]+?)(?:\n\n|\n\d|$)", text)
-
     ent = {
-        **base,
+        **extract_common(text, f),
         "form_type": "Annexure-II",
         "holders": holders,
-        "dependents": dependents,
-        "address": address,
-        "village": village,
-        "gram_panchayat": gram_panchayat,
-        "tehsil": tehsil,
-        "district": district,
-        "scheduled_tribe_status": st_status,
-        "area_claimed_raw": area_raw,
+        "dependents": f["dependents"],
+        "address": f["address"],
+        "village": f["village"],
+        "gram_panchayat": f["gram_panchayat"],
+        "tehsil": f["tehsil"],
+        "district": f["district"],
+        "scheduled_tribe_status": f["scheduled_tribe_status"],
+        "area_claimed_raw": f["area_bighas"],
         "area_claimed_ha": None,
-        "khasra_number": khasra,
-        "boundaries": boundaries
+        "khasra_number": f["khasra_number"],
+        "boundaries": f["boundaries"]
     }
     return ent
 
-def extract_annexure_others(text: str) -> Dict:
+def extract_annexure_others(text: str, fields: Optional[Dict] = None) -> Dict:
     # Generic extractor for Annexure-III/IV (community resources)
-    base = extract_common(text)
-    village = _find(r"Village(?:/Gram Sabha)?:\s*([A-Za-z0-9 ,.\-()]+)", text)
-    gram_panchayat = _find(r"Gram Panchayat:\s*([A-Za-z0-9 ,.\-()]+)", text)
-    nature = _find(r"Nature of community rights:\s*([\s\S]+?)(?:\n\d|$)", text)
-    boundaries = _find(r"Description of boundaries[\s\S]*?:\s*([\s\S]+?)(?:\n\n|\n\d|$)", text)
-
+    f = fields if fields is not None else scan_fields(text)
     ent = {
-        **base,
+        **extract_common(text, f),
         "form_type": "Annexure-Other",
-        "village": village,
-        "gram_panchayat": gram_panchayat,
-        "community_rights_description": nature,
-        "boundaries": boundaries
+        "village": f["village"],
+        "gram_panchayat": f["gram_panchayat"],
+        "community_rights_description": f["community_rights_description"],
+        "boundaries": f["boundaries"]
     }
     return ent
 
 # Registry of extractors
-EXTRACTOR_REGISTRY: Dict[str, Callable[[str], Dict]] = {
+EXTRACTOR_REGISTRY: Dict[str, Callable[..., Dict]] = {
     "Form A": extract_form_a,
     "Form B": extract_form_b_or_c,
     "Form C": extract_form_b_or_c,
@@ -165,19 +123,47 @@ EXTRACTOR_REGISTRY: Dict[str, Callable[[str], Dict]] = {
     "Annexure-IV": extract_annexure_others
 }
 
-def extract_entities(text: str) -> Dict:
-    form = detect_form_type(text)
+COMMON_KEYS = [
+    "form_type", "claimant_name", "spouse_name", "father_mother_name", "tribe_name",
+    "patta_number", "dlc_decision_date",
+    "village", "gram_panchayat", "tehsil", "district",
+    "area_claimed", "area_unit", "area_claimed_raw", "area_claimed_ha",
+    "fra_claim_status", "khasra_number", "boundaries", "dependents", "holders",
+    "address", "community_rights_description", "scheduled_tribe_status"
+]
+
+
+def extract_as(form: str, text: str, lines: Optional[List[OcrLine]] = None) -> Dict:
+    fields = scan_fields(text)
+    if lines:
+        # a value found next to its label on the page beats one cut from the
+        # flattened text, where a neighbouring column can run into it
+        for name, value in layout_fields(lines).items():
+            if value is not None:
+                fields[name] = value
     extractor = EXTRACTOR_REGISTRY.get(form, extract_form_a)  # default to Form A-like
-    entities = extractor(text)
+    entities = extractor(text, fields)
     # ensure consistent keys exist — add common keys if missing
-    common_keys = [
-        "form_type", "claimant_name", "spouse_name", "father_mother_name", "tribe_name",
-        "patta_number", "dlc_decision_date",
-        "village", "gram_panchayat", "tehsil", "district",
-        "area_claimed", "area_unit", "area_claimed_raw", "area_claimed_ha",
-        "fra_claim_status", "khasra_number", "boundaries", "dependents", "holders",
-        "address", "community_rights_description", "scheduled_tribe_status"
-    ]
-    for k in common_keys:
+    for k in COMMON_KEYS:
         entities.setdefault(k, None)
     return entities
+
+
+def extract_entities(text: str, lines: Optional[List[OcrLine]] = None) -> Dict:
+    return extract_as(detect_form_type(text), text, lines)
+
+
+def extract_records(text: str, lines: Optional[List[OcrLine]] = None) -> List[Dict]:
+    """
+    One entity dict per form in the document. Pages (separated by form feeds)
+    are classified individually, so a bundle such as a Form A followed by its
+    Annexure-II gives two records, each extracted from its own pages (and the
+    OCR lines on them) only.
+    """
+    pages = text.split(PAGE_BREAK)
+    records = []
+    for form, idx in segment_pages(text):
+        keep = set(idx)
+        records.append(extract_as(form, PAGE_BREAK.join(pages[i] for i in idx),
+                                  [l for l in lines if l.page in keep] if lines else None))
+    return records
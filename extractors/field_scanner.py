@@ -0,0 +1,139 @@
+# extractors/field_scanner.py
+"""
+Single-pass label scanner for FRA form fields.
+
+All field labels are compiled once into one alternation. A single finditer
+over the OCR text yields every label occurrence, and each field's value is the
+slice between its label and the next label of any field. Value patterns are
+then matched at the start of that slice only.
+
+Every label pattern is a literal phrase with bounded gaps, and each value
+pattern is anchored to its own slice. Because slices never overlap, the work
+is linear in the text length, even on adversarial input.
+"""
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+FLAGS = re.I | re.M
+
+
+class FieldSpec(NamedTuple):
+    name: str
+    label: str                  # regex for the label, including its colon
+    values: List[str]           # tried in order; group 1 is the value
+    stop: Optional[str] = None  # block fields: cut the slice at the first match
+
+
+_NAME = r"([A-Za-z0-9 ,.'/-]+)"
+_PLACE = r"([A-Za-z0-9 ,.\-()]+)"
+_BLOCK = r"([\s\S]+)"
+
+# Order matters only for labels that can start at the same position (longest first).
+# state / scheduled_tribe / other_forest_dweller / survey_number are not mapped to
+# entities yet, but as labels they stop the preceding value from running on.
+FIELD_SPECS: List[FieldSpec] = [
+    FieldSpec("claimant_name", r"Name of the claimant(?:\(s\))?\s*:", [_NAME]),
+    FieldSpec("spouse_name", r"Name of the spouse\s*:", [_NAME]),
+    FieldSpec("father_mother_name", r"Name of father/mother\s*:", [_NAME]),
+    FieldSpec("tribe_name", r"Tribe name\s*:", [_NAME]),
+    FieldSpec("patta_number", r"Patta\s*No\.?\s*:", [r"([A-Za-z0-9/_-]+)"]),
+    FieldSpec("dlc_decision_date", r"Date of DLC decision\s*:", [r"(\d{1,2}[/\-]\d{1,2}[/\-]\d{4})"]),
+    FieldSpec("village", r"Village(?:/Gram Sabha)?\s*:", [_PLACE]),
+    FieldSpec("gram_panchayat", r"Gram\s*Panchayat\s*:", [_PLACE]),
+    FieldSpec("tehsil", r"Tehsil/Taluka\s*:", [_PLACE]),
+    FieldSpec("district", r"District\s*:", [_PLACE]),
+    FieldSpec("state", r"State\s*:", [_PLACE]),
+    FieldSpec("area_of_land", r"Area of land claimed\s*:", [r"([\d.]+)"]),
+    FieldSpec("fra_claim_status", r"Claim status\s*:", [r"(Approved|Rejected|Pending)"]),
+    FieldSpec("livelihood_type", r"Livelihood type\s*:", [r"([A-Za-z0-9 ,.-]+)"]),
+    FieldSpec("water_source_type", r"Water source type\s*:", [r"([A-Za-z0-9 ,.-]+)"]),
+    FieldSpec("community_rights_description", r"Nature of community rights[^:\n]{0,80}:",
+              [_BLOCK], stop=r"\n\d|\n[^\S\n]*$"),
+    FieldSpec("extent_of_land", r"Extent of land\b[^:\n\d]{0,80}:?",
+              [r"(\d[\d.,]*(?: +[\d.,]+)*\s*(?:hectares|ha)\b)"]),
+    FieldSpec("holders_block", r"Name\(s\) of Holder\(s\)[^:\n]{0,120}(?::|\n)", [_BLOCK], stop=r"\n\d"),
+    FieldSpec("dependents", r"Name of Dependents\s*:", [_BLOCK], stop=r"\n"),
+    FieldSpec("address", r"Address\s*:", [r"([A-Za-z0-9 ,.\-()/]+)"]),
+    FieldSpec("scheduled_tribe_status", r"Whether Scheduled Tribe[^:\n]{0,80}:", [r"([A-Za-z ,]+)"]),
+    FieldSpec("area_bighas", r"Area\s*:", [r"([0-9\-:]+(?:\s+[0-9\-:]+)*\s*Bighas)",
+                                              r"([0-9.]+(?: +[0-9.]+)* *Bighas?)"]),
+    FieldSpec("scheduled_tribe", r"Scheduled Tribe\s*:", [r"([A-Za-z ,]+)"]),
+    FieldSpec("other_forest_dweller", r"Other Traditional Forest Dweller\s*:", [r"([A-Za-z ,]+)"]),
+    FieldSpec("survey_number", r"Survey No\.?\s*:", [r"([A-Za-z0-9/\- ]+)"]),
+    FieldSpec("khasra_number", r"Khasra No\.?\s*:", [r"([0-9/]+)", r"([A-Za-z0-9/\- ]+)"]),
+    FieldSpec("boundaries", r"Description of boundaries[^:\n]{0,120}:", [_BLOCK], stop=r"\n\n|\n\d"),
+]
+
+# an item number such as "3." or "9(a)." left at the end of a value by the next label.
+# Matched against the last few characters of the rstripped value only: anchored
+# at the end after a run of whitespace, the regex would rescan that run from
+# every position in it (quadratic on OCR whitespace floods).
+_TRAILING_ENUM = re.compile(r"(\d{1,2}(?:\([a-z]\))?\.)$", re.I)
+_ENUM_MAX_LEN = len("12(a).")
+
+
+class CompiledSpecs(NamedTuple):
+    index: "re.Pattern"
+    specs: Dict[str, FieldSpec]
+    values: Dict[str, List["re.Pattern"]]
+    stops: Dict[str, Optional["re.Pattern"]]
+
+
+def compile_specs(specs: List[FieldSpec]) -> CompiledSpecs:
+    # group names f0, f1, ... map back to spec order. Labels start at a word
+    # boundary, and the lookahead on their first letters lets the regex engine
+    # skip most positions without trying every alternative.
+    firsts = "".join(sorted({s.label[0].lower() for s in specs}))
+    alternation = "|".join(f"(?P<f{i}>{s.label})" for i, s in enumerate(specs))
+    index = re.compile(rf"\b(?=[{firsts}])(?:{alternation})", FLAGS)
+    return CompiledSpecs(
+        index=index,
+        specs={f"f{i}": s for i, s in enumerate(specs)},
+        values={s.name: [re.compile(v, FLAGS) for v in s.values] for s in specs},
+        stops={s.name: re.compile(s.stop, FLAGS) if s.stop else None for s in specs},
+    )
+
+
+_COMPILED = compile_specs(FIELD_SPECS)
+
+
+def label_index(text: str, compiled: CompiledSpecs = _COMPILED) -> List[Tuple[str, int, int]]:
+    """(field name, label start, label end) for every label, in text order."""
+    return [(compiled.specs[m.lastgroup].name, m.start(), m.end()) for m in compiled.index.finditer(text)]
+
+
+def _strip_enum(value: str) -> str:
+    value = value.rstrip()
+    m = _TRAILING_ENUM.search(value, max(0, len(value) - _ENUM_MAX_LEN))
+    if m and m.start() > 0 and value[m.start() - 1].isspace():
+        return value[:m.start()]
+    return value
+
+
+def _value(name: str, chunk: str, compiled: CompiledSpecs) -> Optional[str]:
+    chunk = chunk.lstrip()
+    stop = compiled.stops[name]
+    if stop is not None:
+        m = stop.search(chunk)
+        if m:
+            chunk = chunk[:m.start()]
+    for pattern in compiled.values[name]:
+        m = pattern.match(chunk)
+        if m and m.group(1).strip():
+            return _strip_enum(m.group(1)).strip()
+    return None
+
+
+def scan_fields(text: str, compiled: CompiledSpecs = _COMPILED) -> Dict[str, Optional[str]]:
+    """
+    Value of every field in FIELD_SPECS (None when missing). Like the old
+    per-field regexes, the first label occurrence with a valid value wins.
+    """
+    found: Dict[str, Optional[str]] = {s.name: None for s in compiled.specs.values()}
+    labels = label_index(text, compiled)
+    for i, (name, _, end) in enumerate(labels):
+        if found[name] is not None:
+            continue
+        next_start = labels[i + 1][1] if i + 1 < len(labels) else len(text)
+        found[name] = _value(name, text[end:next_start], compiled)
+    return found
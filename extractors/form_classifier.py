@@ -0,0 +1,126 @@
+# extractors/form_classifier.py
+"""
+Form-type detection with a keyword automaton.
+
+All form keywords are compiled into one Aho–Corasick automaton, so a single
+pass over the text finds every keyword hit for every form. Hits are then
+bucketed by page (pages are separated by PAGE_BREAK), which lets a bundle
+such as Form A followed by an Annexure-II be split into per-form segments.
+"""
+from bisect import bisect_right
+from collections import deque
+from typing import Dict, Iterator, List, Tuple
+
+# the separator extract_text puts between pages
+PAGE_BREAK = "\f"
+
+# Earlier forms win when one page has keywords for several forms
+FORM_KEYWORDS: List[Tuple[str, List[str]]] = [
+    ("Annexure-II", ["ANNEXURE-II", "TITLE FOR FOREST LAND UNDER OCCUPATION"]),
+    ("Annexure-III", ["ANNEXURE-III"]),
+    ("Annexure-IV", ["ANNEXURE-IV"]),
+    ("Form A", ["FORM – A", "FORM - A", "CLAIM FORM FOR RIGHTS TO FOREST LAND"]),
+    ("Form B", ["FORM – B", "FORM - B", "CLAIM FORM FOR COMMUNITY RIGHTS"]),
+    ("Form C", ["FORM – C", "FORM - C", "CLAIM FORM FOR RIGHTS TO COMMUNITY FOREST RESOURCE"]),
+]
+FORM_PRIORITY: Dict[str, int] = {form: i for i, (form, _) in enumerate(FORM_KEYWORDS)}
+
+
+class KeywordAutomaton:
+    """Aho–Corasick automaton over keyword -> label."""
+
+    def __init__(self, keywords: Dict[str, str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[Tuple[str, int]]] = [[]]  # (label, keyword length)
+
+        for kw, label in keywords.items():
+            s = 0
+            for ch in kw:
+                nxt = self.goto[s].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                    self.goto[s][ch] = nxt
+                s = nxt
+            self.out[s].append((label, len(kw)))
+
+        # breadth-first failure links; outputs inherit those of their fail state
+        queue = deque(self.goto[0].values())
+        while queue:
+            s = queue.popleft()
+            for ch, nxt in self.goto[s].items():
+                queue.append(nxt)
+                f = self.fail[s]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """(start, end, label) for every keyword occurrence, overlapping ones included."""
+        goto, fail, out = self.goto, self.fail, self.out
+        s = 0
+        for i, ch in enumerate(text):
+            while s and ch not in goto[s]:
+                s = fail[s]
+            s = goto[s].get(ch, 0)
+            for label, n in out[s]:
+                yield i - n + 1, i + 1, label
+
+
+AUTOMATON = KeywordAutomaton({kw: form for form, kws in FORM_KEYWORDS for kw in kws})
+
+
+def keyword_hits(upper: str) -> List[Tuple[int, str]]:
+    """
+    (start, form) for each keyword hit in already upper-cased text. Where two
+    keywords start at the same place only the longest counts, so
+    "ANNEXURE-III" is not also read as "ANNEXURE-II".
+    """
+    longest: Dict[int, Tuple[int, str]] = {}
+    for start, end, form in AUTOMATON.iter_matches(upper):
+        if start not in longest or end > longest[start][0]:
+            longest[start] = (end, form)
+    return [(start, form) for start, (_, form) in sorted(longest.items())]
+
+
+def _best(forms) -> str:
+    return min(forms, key=FORM_PRIORITY.__getitem__, default="Unknown")
+
+
+def detect_form(text: str) -> str:
+    return _best(form for _, form in keyword_hits(text.upper()))
+
+
+def classify_pages(text: str) -> List[str]:
+    """Form label per page, in one automaton pass over the whole document."""
+    # positions come from the upper-cased text, whose length can differ
+    upper = text.upper()
+    pages = upper.split(PAGE_BREAK)
+    starts, pos = [], 0
+    for p in pages:
+        starts.append(pos)
+        pos += len(p) + len(PAGE_BREAK)
+    per_page: List[List[str]] = [[] for _ in pages]
+    for start, form in keyword_hits(upper):
+        per_page[bisect_right(starts, start) - 1].append(form)
+    return [_best(forms) for forms in per_page]
+
+
+def segment_pages(text: str) -> List[Tuple[str, List[int]]]:
+    """
+    Split a bundle into (form, page indices) segments. A page without keywords
+    is a continuation of the segment before it; consecutive pages of the same
+    form stay together.
+    """
+    segments: List[Tuple[str, List[int]]] = []
+    for i, form in enumerate(classify_pages(text)):
+        if segments and form in ("Unknown", segments[-1][0]):
+            segments[-1][1].append(i)
+        else:
+            segments.append((form, [i]))
+    return segments
+
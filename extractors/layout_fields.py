@@ -0,0 +1,127 @@
+# extractors/layout_fields.py
+"""
+Layout-aware field lookup over structured OCR lines.
+
+Each line's text is scanned for field labels. A label's value is the rest of
+its own line, up to the next label; when that is empty, it is the nearest
+line to the right on the same row, then the nearest line below. Neighbours come
+from a uniform grid over the line boxes, so each lookup only touches the few
+cells next to the label, and a value can never run on into another field's
+line.
+"""
+from collections import defaultdict
+from statistics import median
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from extractors.field_scanner import _COMPILED, _TRAILING_ENUM, CompiledSpecs, _value, label_index
+from ocr.lines import OcrLine
+
+# multi-line values are left to the text scanner
+BLOCK_FIELDS = {"holders_block", "boundaries", "community_rights_description"}
+
+# how far to look, in median line heights
+RIGHT_REACH = 30.0
+BELOW_REACH = 2.5
+
+
+class LineIndex:
+    """
+    Uniform grid over line boxes, per page; a cell is about two of that page's
+    median line heights (pages of one document can differ in scan DPI, and
+    text-layer pages are in PDF points).
+    """
+
+    def __init__(self, lines: List[OcrLine]):
+        self.lines = lines
+        heights: Dict[int, List[float]] = defaultdict(list)
+        for l in lines:
+            if l.box[3] > l.box[1]:
+                heights[l.page].append(l.box[3] - l.box[1])
+        self.line_h: Dict[int, float] = {page: median(h) for page, h in heights.items()}
+        self.grid: Dict[Tuple[int, int, int], List[int]] = defaultdict(list)
+        for i, l in enumerate(lines):
+            for key in self._cells(l.page, l.box):
+                self.grid[key].append(i)
+
+    def page_line_h(self, page: int) -> float:
+        return self.line_h.get(page, 1.0)
+
+    def _cells(self, page: int, box: Tuple[float, float, float, float]) -> Iterator[Tuple[int, int, int]]:
+        c = max(2.0 * self.page_line_h(page), 1.0)
+        for cx in range(int(box[0] // c), int(box[2] // c) + 1):
+            for cy in range(int(box[1] // c), int(box[3] // c) + 1):
+                yield page, cx, cy
+
+    def query(self, page: int, box: Tuple[float, float, float, float]) -> List[OcrLine]:
+        """Lines whose box intersects `box` on `page`."""
+        seen = set()
+        out = []
+        for key in self._cells(page, box):
+            for i in self.grid.get(key, ()):
+                if i in seen:
+                    continue
+                seen.add(i)
+                b = self.lines[i].box
+                if b[0] <= box[2] and b[2] >= box[0] and b[1] <= box[3] and b[3] >= box[1]:
+                    out.append(self.lines[i])
+        return out
+
+    def right_of(self, line: OcrLine) -> Optional[OcrLine]:
+        """Nearest line starting right of `line` that shares most of its height."""
+        x0, y0, x1, y1 = line.box
+        h = y1 - y0
+        reach = RIGHT_REACH * self.page_line_h(line.page)
+        cands = []
+        for l in self.query(line.page, (x1 - 0.5 * h, y0, x1 + reach, y1)):
+            if l is line or l.box[0] < x1 - 0.5 * h:
+                continue
+            overlap = min(y1, l.box[3]) - max(y0, l.box[1])
+            if overlap >= 0.5 * min(h, l.box[3] - l.box[1]):
+                cands.append(l)
+        return min(cands, key=lambda l: l.box[0], default=None)
+
+    def below(self, line: OcrLine) -> Optional[OcrLine]:
+        """Nearest line under `line` that overlaps it horizontally."""
+        x0, y0, x1, y1 = line.box
+        reach = BELOW_REACH * self.page_line_h(line.page)
+        cands = [l for l in self.query(line.page, (x0, y1, x1, y1 + reach))
+                 if l is not line and l.box[1] >= y1 - 0.25 * (y1 - y0)]
+        return min(cands, key=lambda l: (l.box[1], l.box[0]), default=None)
+
+
+def _leading_value(name: str, text: str, compiled: CompiledSpecs) -> Optional[str]:
+    # a neighbour's text up to its own first label, if it has one; when only
+    # that label's item number ("8. District:") precedes it, there is no value
+    labels = label_index(text, compiled)
+    head = text[:labels[0][1]] if labels else text
+    if labels and _TRAILING_ENUM.fullmatch(head.strip()):
+        return None
+    return _value(name, head, compiled)
+
+
+def layout_fields(lines: List[OcrLine], compiled: CompiledSpecs = _COMPILED) -> Dict[str, Optional[str]]:
+    """
+    Value per single-line field from label positions (None when not found).
+    As in scan_fields, the first label occurrence with a valid value wins.
+    """
+    found: Dict[str, Optional[str]] = {s.name: None for s in compiled.specs.values()
+                                       if s.name not in BLOCK_FIELDS}
+    if not lines:
+        return found
+    index = LineIndex(lines)
+    for line in sorted(lines, key=lambda l: (l.page, l.order)):
+        labels = label_index(line.text, compiled)
+        for i, (name, _, end) in enumerate(labels):
+            if name in BLOCK_FIELDS or found[name] is not None:
+                continue
+            next_start = labels[i + 1][1] if i + 1 < len(labels) else len(line.text)
+            value = _value(name, line.text[end:next_start], compiled)
+            if value is None and i + 1 == len(labels):
+                # label ends its line: the value is in the next box over or down
+                for neighbour in (index.right_of(line), index.below(line)):
+                    if neighbour is not None:
+                        value = _leading_value(name, neighbour.text, compiled)
+                        if value is not None:
+                            break
+            found[name] = value
+    return found
@@ -0,0 +1,94 @@
+# extractors/ner_fallback.py
+"""
+spaCy NER fallback for key fields the label scanner missed.
+
+Only documents with a missing claimant_name / village / district are
+looked at, and only the short text window after a loosely matched label
+("Name of the c1aimant", "Vilage", "Dist."), so OCR noise in the label
+itself no longer loses the value. The windows of many documents go through
+one nlp.pipe() call, and every pipeline component except NER (and the
+embedding layer it reads from) is disabled.
+
+FRA_NER_FALLBACK=1 turns it on; FRA_NER_MODEL picks the model (the small
+CNN by default; en_core_web_trf is far slower but also batched).
+"""
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from extractors.field_scanner import label_index
+
+NER_FALLBACK = os.environ.get("FRA_NER_FALLBACK", "0") == "1"
+NER_MODEL = os.environ.get("FRA_NER_MODEL", "en_core_web_sm")
+NER_BATCH_SIZE = int(os.environ.get("FRA_NER_BATCH_SIZE", "64"))
+# characters after the label searched for the value
+NER_WINDOW_CHARS = 120
+
+# field -> (loose label, entity labels accepted as its value)
+NER_FIELDS: Dict[str, Tuple["re.Pattern", Tuple[str, ...]]] = {
+    "claimant_name": (re.compile(r"name\s*of\s*(?:the\s*)?c\w{3,8}t|claimant", re.I),
+                      ("PERSON", "ORG")),
+    "village": (re.compile(r"\bvil+a?ge\b|\bgram\s*sabha\b", re.I), ("GPE", "LOC", "FAC")),
+    "district": (re.compile(r"\bdist(?:rict\b|\.)", re.I), ("GPE", "LOC")),
+}
+
+_nlp = None
+_nlp_lock = threading.Lock()
+
+
+def get_nlp():
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                import spacy
+                nlp = spacy.load(NER_MODEL)
+                # keep NER plus a shared tok2vec / transformer only if NER listens to it
+                keep = ["ner"] + [name for name in nlp.pipe_names
+                                  if "ner" in getattr(nlp.get_pipe(name), "listening_components", ())]
+                nlp.select_pipes(enable=keep)
+                _nlp = nlp
+    return _nlp
+
+
+def missing_fields(values: Dict[str, Optional[str]]) -> List[str]:
+    return [f for f in NER_FIELDS if not values.get(f)]
+
+
+def label_window(text: str, field: str) -> Optional[Tuple[str, int]]:
+    """(window, label length): the first loose label match and the text after it."""
+    m = NER_FIELDS[field][0].search(text)
+    if m is None:
+        return None
+    window = text[m.start():m.end() + NER_WINDOW_CHARS]
+    # stop at the next field's label, so its value is not taken for this one
+    labels = [start for _, start, _ in label_index(window) if start >= m.end() - m.start()]
+    return window[:labels[0]] if labels else window, m.end() - m.start()
+
+
+def ner_values(docs: Sequence[Tuple[str, Sequence[str]]]) -> List[Dict[str, str]]:
+    """
+    For each (text, missing fields) pair, the values NER found near the
+    fields' labels. All windows are processed in one batched nlp.pipe().
+    """
+    found: List[Dict[str, str]] = [{} for _ in docs]
+    jobs = []  # (doc index, field, label length)
+    windows = []
+    for i, (text, fields) in enumerate(docs):
+        for field in fields:
+            hit = label_window(text, field)
+            if hit is not None:
+                jobs.append((i, field, hit[1]))
+                windows.append(hit[0])
+    if not windows:
+        return found
+
+    for (i, field, label_len), doc in zip(jobs, get_nlp().pipe(windows, batch_size=NER_BATCH_SIZE)):
+        wanted = NER_FIELDS[field][1]
+        # the first entity after the label; entities inside the label are the label's own words
+        for ent in doc.ents:
+            if ent.start_char >= label_len and ent.label_ in wanted:
+                found[i][field] = ent.text.strip(" :,.-")
+                break
+    return found
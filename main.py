@@ -1,3 +1,4 @@
+from ocr import debug_writer
 from ocr.ocr_engine import extract_text
 from extractors.entities import extract_entities
 from schemas.fra_schema import build_schema
@@ -19,3 +20,5 @@ if __name__ == "__main__":
     print("\n🔹 Building schema...")
     schema = build_schema(entities)
     print(json.dumps(schema, indent=2))
+
+    debug_writer.flush()  # FRA_OCR_DEBUG=1: write the queued artifacts before exiting
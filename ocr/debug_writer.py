@@ -0,0 +1,97 @@
+# ocr/debug_writer.py
+"""
+Background writer for OCR debug artifacts (box overlays, text dumps).
+
+Rendering and encoding happen on a single daemon thread fed by a bounded
+queue, so a request never waits on disk. When the queue is full the artifact
+is dropped (counted as debug_artifacts_dropped in /metrics). The thread is a
+daemon: command-line entry points call flush() before exiting so queued
+artifacts are not lost. After each write the directory is trimmed, oldest first, to
+DEBUG_MAX_FILES / DEBUG_MAX_BYTES.
+"""
+import os
+import queue
+import threading
+from typing import Callable, Optional
+
+from utils import metrics
+
+DEBUG_DIR = os.environ.get("FRA_DEBUG_DIR", "debug")
+DEBUG_MAX_FILES = int(os.environ.get("FRA_DEBUG_MAX_FILES", "200"))
+DEBUG_MAX_BYTES = int(os.environ.get("FRA_DEBUG_MAX_MB", "100")) * 1024 * 1024
+DEBUG_QUEUE_SIZE = int(os.environ.get("FRA_DEBUG_QUEUE", "32"))
+
+_queue: "queue.Queue" = queue.Queue(maxsize=DEBUG_QUEUE_SIZE)
+_thread = None
+_start_lock = threading.Lock()
+
+
+def _prune() -> None:
+    entries = []
+    for name in os.listdir(DEBUG_DIR):
+        path = os.path.join(DEBUG_DIR, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+    entries.sort()
+    count = len(entries)
+    total = sum(e[1] for e in entries)
+    for _, size, path in entries:
+        if count <= DEBUG_MAX_FILES and total <= DEBUG_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        count -= 1
+        total -= size
+
+
+def _worker() -> None:
+    while True:
+        path, render = _queue.get()
+        try:
+            data = render()
+            if data:
+                with open(path, "wb") as f:
+                    f.write(data)
+                _prune()
+        except Exception as e:
+            print(f"⚠️ debug artifact {os.path.basename(path)} failed: {e}")
+        finally:
+            _queue.task_done()
+
+
+def _ensure_started() -> None:
+    global _thread
+    if _thread is not None:
+        return
+    with _start_lock:
+        if _thread is None:
+            os.makedirs(DEBUG_DIR, exist_ok=True)
+            _thread = threading.Thread(target=_worker, name="ocr-debug-writer", daemon=True)
+            _thread.start()
+
+
+def submit(name: str, render: Callable[[], bytes]) -> Optional[str]:
+    """
+    Queue render() to be written to DEBUG_DIR/name and return that path, or
+    None when the queue is full and the artifact was dropped. render runs on
+    the writer thread and returns the file's bytes.
+    """
+    _ensure_started()
+    path = os.path.join(DEBUG_DIR, name)
+    try:
+        _queue.put_nowait((path, render))
+    except queue.Full:
+        metrics.count("debug_artifacts_dropped")
+        return None
+    return path
+
+
+def flush() -> None:
+    """Block until every queued artifact has been written (before a CLI exits)."""
+    if _thread is not None:
+        _queue.join()
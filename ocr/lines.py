@@ -0,0 +1,59 @@
+# ocr/lines.py
+"""
+Structured OCR output: one OcrLine per recognized text line, with its box,
+confidence and reading order. Plain Python, so extractors can use it without
+pulling in the OCR stack.
+"""
+from statistics import median
+from typing import List, NamedTuple, Sequence, Tuple, TypeVar
+
+Rect = Tuple[float, float, float, float]  # x0, y0, x1, y1
+T = TypeVar("T")
+
+
+class OcrLine(NamedTuple):
+    box: Rect        # axis-aligned, in page pixels (PDF points for text-layer pages)
+    text: str
+    conf: float
+    order: int = 0   # reading order within the page
+    row: int = 0     # text row within the page (same row: same printed line)
+    page: int = 0    # index among the document's non-empty pages
+
+
+def reading_rows(items: Sequence[Tuple[Rect, T]]) -> List[List[T]]:
+    """
+    Group (rect, item) pairs into text rows, top to bottom: a row takes every
+    box whose centre lies within half a median line height of the row's first
+    box. Each row is sorted left to right.
+    """
+    if not items:
+        return []
+    tol = 0.5 * median(r[3] - r[1] for r, _ in items)
+    by_y = sorted(items, key=lambda it: (it[0][1] + it[0][3]) / 2)
+    rows: List[List[Tuple[Rect, T]]] = []
+    row_y = 0.0
+    for rect, item in by_y:
+        cy = (rect[1] + rect[3]) / 2
+        if not rows or cy - row_y > tol:
+            rows.append([])
+            row_y = cy
+        rows[-1].append((rect, item))
+    return [[item for _, item in sorted(row, key=lambda it: it[0][0])] for row in rows]
+
+
+def order_lines(lines: Sequence[OcrLine]) -> List[OcrLine]:
+    """Lines with order and row set from their boxes."""
+    out: List[OcrLine] = []
+    for r, row in enumerate(reading_rows([(l.box, l) for l in lines])):
+        out += [l._replace(order=len(out) + i, row=r) for i, l in enumerate(row)]
+    return out
+
+
+def lines_text(lines: Sequence[OcrLine]) -> str:
+    """Ordered lines as text: a space between lines in a row, a newline between rows."""
+    parts: List[str] = []
+    for i, l in enumerate(lines):
+        if i:
+            parts.append(" " if l.row == lines[i - 1].row else "\n")
+        parts.append(l.text)
+    return "".join(parts)
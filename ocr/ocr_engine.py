@@ -1,39 +1,184 @@
+import glob
+import io
+import math
 import os
+import shutil
+import tempfile
+import threading
 import uuid
-from typing import Any, List, Tuple
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import numpy as np
 import pdfplumber
-from pdf2image import convert_from_path
-from paddleocr import PaddleOCR
+from pdf2image import convert_from_bytes, convert_from_path
 from PIL import Image
 import cv2
 import docx
 
+from ocr import debug_writer
+from ocr.lines import OcrLine, lines_text, order_lines, reading_rows
+from utils import metrics
+
+# A document is a path on disk or its raw bytes (uploads stay in memory)
+Source = Union[str, bytes]
+
 # ---- Paths / setup ----
-POPPLER_PATH = r"C:\poppler\poppler-25.07.0\Library\bin"  # <- your confirmed path
-DEBUG_DIR = "debug"
-os.makedirs(DEBUG_DIR, exist_ok=True)
+# Poppler is found automatically (see find_poppler_path); FRA_POPPLER_PATH overrides
+POPPLER_PATH = os.environ.get("FRA_POPPLER_PATH") or os.environ.get("POPPLER_PATH")
+_POPPLER_GLOBS = [
+    r"C:\poppler*\**\bin",
+    r"C:\Program Files\poppler*\**\bin",
+    r"C:\Program Files (x86)\poppler*\**\bin",
+    os.path.join(os.path.expanduser("~"), "poppler*", "**", "bin"),
+]
+# Scanned PDF pages are rasterised at this DPI, one page at a time
+PDF_DPI = int(os.environ.get("FRA_PDF_DPI", "200"))
+# Pages whose text layer has fewer characters than this are OCR'd instead
+PDF_TEXT_MIN_CHARS = int(os.environ.get("FRA_PDF_TEXT_MIN_CHARS", "20"))
+# Debug artifacts are off unless FRA_OCR_DEBUG=1 or a caller passes debug=True
+DEBUG_OCR = os.environ.get("FRA_OCR_DEBUG", "0") == "1"
+
+# ---- Models (created lazily) ----
+# paddleocr is imported inside the accessors so importing this module stays cheap;
+# the first call pays the model load (see warm_up()).
+_ocr = None
+_ocr_line_cls = None
+_doc_orientation = None
+_text_detector = None
+_text_recognizer = None
+_model_lock = threading.Lock()
+# Paddle intra-op threads per model; 0 leaves Paddle's default. Worker pools set
+# this so workers x threads stays within the core count.
+OCR_CPU_THREADS = int(os.environ.get("FRA_OCR_CPU_THREADS", "0"))
+
+def _model_kwargs() -> Dict[str, Any]:
+    return {"cpu_threads": OCR_CPU_THREADS} if OCR_CPU_THREADS > 0 else {}
+
+# Page-level orientation: each page is rotated upright and deskewed once (see
+# normalize_page), so the full pipeline can skip per-line orientation. Pages the
+# classifier is unsure about (score < PAGE_ORIENT_MIN_CONF) fall back to it.
+# FRA_OCR_PAGE_ORIENT=0 restores per-line classification everywhere.
+PAGE_ORIENTATION = os.environ.get("FRA_OCR_PAGE_ORIENT", "1") != "0"
+PAGE_ORIENT_MIN_CONF = float(os.environ.get("FRA_OCR_PAGE_ORIENT_CONF", "0.8"))
+PAGE_ANALYSIS_SIDE = int(os.environ.get("FRA_OCR_PAGE_ANALYSIS_SIDE", "1024"))
+DESKEW_MAX_ANGLE = float(os.environ.get("FRA_OCR_DESKEW_MAX_ANGLE", "5"))
+DESKEW_MIN_ANGLE = float(os.environ.get("FRA_OCR_DESKEW_MIN_ANGLE", "0.2"))
+
+def get_ocr(textline_orientation: Optional[bool] = None):
+    """
+    Full PaddleOCR pipeline. By default the per-line orientation classifier is
+    on only when page-level orientation is off; textline_orientation=True gives
+    the fallback instance that has it.
+    """
+    global _ocr, _ocr_line_cls
+    if textline_orientation is None:
+        textline_orientation = not PAGE_ORIENTATION
+    if textline_orientation:
+        if _ocr_line_cls is None:
+            with _model_lock:
+                if _ocr_line_cls is None:
+                    from paddleocr import PaddleOCR
+                    # New flag name per deprecation
+                    _ocr_line_cls = PaddleOCR(use_textline_orientation=True, lang='en', **_model_kwargs())
+        return _ocr_line_cls
+    if _ocr is None:
+        with _model_lock:
+            if _ocr is None:
+                from paddleocr import PaddleOCR
+                # pages arrive upright and deskewed; skip every orientation step
+                _ocr = PaddleOCR(use_textline_orientation=False, use_doc_orientation_classify=False,
+                                 use_doc_unwarping=False, lang='en', **_model_kwargs())
+    return _ocr
+
+def get_doc_orientation_classifier():
+    global _doc_orientation
+    if _doc_orientation is None:
+        with _model_lock:
+            if _doc_orientation is None:
+                from paddleocr import DocImgOrientationClassification
+                _doc_orientation = DocImgOrientationClassification(
+                    model_name="PP-LCNet_x1_0_doc_ori", **_model_kwargs())
+    return _doc_orientation
 
-# New flag name per deprecation
-ocr = PaddleOCR(use_textline_orientation=True, lang='en')
+# Stand-alone detector / recognizer, only built when shared detection is used
+def get_text_detector():
+    global _text_detector
+    if _text_detector is None:
+        with _model_lock:
+            if _text_detector is None:
+                from paddleocr import TextDetection
+                _text_detector = TextDetection(**_model_kwargs())
+    return _text_detector
+
+def get_text_recognizer():
+    global _text_recognizer
+    if _text_recognizer is None:
+        with _model_lock:
+            if _text_recognizer is None:
+                from paddleocr import TextRecognition
+                _text_recognizer = TextRecognition(**_model_kwargs())
+    return _text_recognizer
+
+def warm_up(shared_det: Optional[bool] = None) -> None:
+    """Load the models this configuration uses and run one dummy inference each."""
+    shared_det = SHARED_DETECTION if shared_det is None else shared_det
+    blank = np.full((64, 256, 3), 255, dtype=np.uint8)
+    cv2.putText(blank, "FRA", (8, 48), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 0), 3)
+    get_ocr().ocr(blank)
+    if PAGE_ORIENTATION:
+        get_doc_orientation_classifier().predict(blank)
+    if shared_det:
+        get_text_detector().predict(blank)
+        get_text_recognizer().predict(input=[blank])
 
 # ---- PDF helpers ----
-def extract_text_from_pdf(pdf_path: str) -> str:
-    out = []
-    with pdfplumber.open(pdf_path) as pdf:
-        for p in pdf.pages:
-            t = p.extract_text() or ""
-            if t.strip():
-                out.append(t)
-    return "\n".join(out).strip()
-
-def pdf_to_images(pdf_path: str):
-    if not os.path.exists(POPPLER_PATH):
-        raise FileNotFoundError(f"Poppler path not found: {POPPLER_PATH}")
-    return convert_from_path(pdf_path, poppler_path=POPPLER_PATH)
+@lru_cache(maxsize=1)
+def find_poppler_path() -> Optional[str]:
+    """
+    Directory holding pdftoppm, or None when it is already on PATH (pdf2image
+    then finds it itself). POPPLER_PATH wins, then PATH, then common install spots.
+    """
+    if POPPLER_PATH:
+        if not os.path.isdir(POPPLER_PATH):
+            raise FileNotFoundError(f"Poppler path not found: {POPPLER_PATH}")
+        return POPPLER_PATH
+    if shutil.which("pdftoppm"):
+        return None
+    for pattern in _POPPLER_GLOBS:
+        for d in sorted(glob.glob(pattern, recursive=True), reverse=True):
+            if any(os.path.exists(os.path.join(d, exe)) for exe in ("pdftoppm", "pdftoppm.exe")):
+                return d
+    raise FileNotFoundError("Poppler (pdftoppm) not found: install it or set FRA_POPPLER_PATH")
+
+def rasterize_pdf_page(pdf: Source, page_number: int, dpi: int = PDF_DPI) -> Image.Image:
+    # page_number is 1-based, as in pdftoppm. convert_from_bytes writes the bytes
+    # to a temp file on every call, so multi-page readers pass a spilled_pdf() path.
+    convert = convert_from_path if isinstance(pdf, str) else convert_from_bytes
+    return convert(pdf, dpi=dpi, first_page=page_number, last_page=page_number,
+                   poppler_path=find_poppler_path())[0]
+
+@contextmanager
+def spilled_pdf(pdf: Source) -> Iterator[str]:
+    """A path to the PDF: its own, or a temp file holding in-memory bytes (removed on exit)."""
+    if isinstance(pdf, str):
+        yield pdf
+        return
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as spill:
+        spill.write(pdf)
+    try:
+        yield spill.name
+    finally:
+        try:
+            os.remove(spill.name)
+        except OSError:
+            pass
 
 # ---- Preprocess variants ----
+@metrics.timed("to_numpy")
 def to_numpy(img_or_path) -> np.ndarray:
     if isinstance(img_or_path, np.ndarray):
         return img_or_path
@@ -41,31 +186,194 @@ def to_numpy(img_or_path) -> np.ndarray:
         return np.array(img_or_path.convert("RGB"))
     if isinstance(img_or_path, str):
         return np.array(Image.open(img_or_path).convert("RGB"))
+    if isinstance(img_or_path, (bytes, bytearray, memoryview)):
+        # decode straight from the upload buffer; PIL covers what OpenCV can't
+        arr = cv2.imdecode(np.frombuffer(img_or_path, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if arr is not None:
+            return cv2.cvtColor(arr, cv2.COLOR_BGR2RGB)
+        return np.array(Image.open(io.BytesIO(img_or_path)).convert("RGB"))
     raise TypeError(f"Unsupported image type: {type(img_or_path)}")
 
+@metrics.timed("pp_none")
 def pp_none(img: np.ndarray) -> np.ndarray:
     return img
 
+# Grayscale ops return single-channel images; the OCR path converts to RGB only
+# at the model boundary (per crop, or once for full-page detection).
+@metrics.timed("pp_gray")
+def pp_gray(img: np.ndarray) -> np.ndarray:
+    return img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+
+@metrics.timed("pp_binary")
 def pp_binary(img: np.ndarray) -> np.ndarray:
-    g = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
-    _, th = cv2.threshold(g, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-    return cv2.cvtColor(th, cv2.COLOR_GRAY2RGB)
+    _, th = cv2.threshold(pp_gray(img), 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return th
 
+@metrics.timed("pp_adaptive")
 def pp_adaptive(img: np.ndarray) -> np.ndarray:
-    g = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
-    th = cv2.adaptiveThreshold(g, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                               cv2.THRESH_BINARY, 31, 9)
-    return cv2.cvtColor(th, cv2.COLOR_GRAY2RGB)
+    return cv2.adaptiveThreshold(pp_gray(img), 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                 cv2.THRESH_BINARY, 31, 9)
 
+@metrics.timed("pp_unsharp")
 def pp_unsharp(img: np.ndarray) -> np.ndarray:
     blur = cv2.GaussianBlur(img, (0, 0), 1.0)
     sharp = cv2.addWeighted(img, 1.6, blur, -0.6, 0)
     return sharp
 
+@metrics.timed("pp_upscale")
 def pp_upscale(img: np.ndarray, scale: float) -> np.ndarray:
     h, w = img.shape[:2]
     return cv2.resize(img, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_CUBIC)
 
+def as_rgb(img: np.ndarray) -> np.ndarray:
+    return img if img.ndim == 3 else cv2.cvtColor(np.ascontiguousarray(img), cv2.COLOR_GRAY2RGB)
+
+# ---- Page orientation / deskew ----
+def _downscale(img: np.ndarray, side: int) -> np.ndarray:
+    h, w = img.shape[:2]
+    f = side / max(h, w)
+    if f >= 1:
+        return img
+    return cv2.resize(img, (max(int(w * f), 1), max(int(h * f), 1)), interpolation=cv2.INTER_AREA)
+
+def page_orientation(small: np.ndarray) -> Tuple[int, float]:
+    """(angle, score): counter-clockwise rotation (0/90/180/270) that makes the page upright."""
+    res = get_doc_orientation_classifier().predict(as_rgb(small))
+    if not res:
+        return 0, 0.0
+    return int(res[0]["label_names"][0]), float(res[0]["scores"][0])
+
+def estimate_skew(gray: np.ndarray, max_angle: float = DESKEW_MAX_ANGLE) -> float:
+    """
+    Projection-profile deskew: the rotation (degrees) under which the ink's row
+    profile is sharpest, searched in 0.5 degree steps and refined to 0.1,
+    within +-max_angle. 0.0 when no angle beats leaving the page as it is
+    (blank pages, or ink without any line structure).
+    """
+    _, ink = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    if not ink.any() or ink.all():
+        return 0.0
+    h, w = ink.shape
+    centre = (w / 2, h / 2)
+
+    def sharpness(angle: float) -> float:
+        m = cv2.getRotationMatrix2D(centre, angle, 1.0)
+        rows = cv2.warpAffine(ink, m, (w, h), flags=cv2.INTER_NEAREST).sum(axis=1, dtype=np.float64)
+        return float(np.sum(np.diff(rows) ** 2))
+
+    best = max(np.arange(-max_angle, max_angle + 1e-6, 0.5), key=sharpness)
+    fine = np.arange(max(best - 0.4, -max_angle), min(best + 0.4, max_angle) + 1e-6, 0.1)
+    best = max(fine, key=sharpness)
+    return float(best) if sharpness(best) > sharpness(0.0) else 0.0
+
+@metrics.timed("normalize_page")
+def normalize_page(img: np.ndarray) -> Tuple[np.ndarray, bool]:
+    """
+    Rotate a page upright and deskew it, deciding both on a downscaled copy.
+    Returns (image, confident); when the orientation classifier is unsure the
+    page is left unrotated and the caller falls back to per-line orientation.
+    """
+    small = _downscale(img, PAGE_ANALYSIS_SIDE)
+    angle, score = page_orientation(small)
+    confident = score >= PAGE_ORIENT_MIN_CONF
+    if confident and angle % 360:
+        # same correction as PaddleOCR's own document preprocessor
+        k = (angle // 90) % 4
+        img = np.ascontiguousarray(np.rot90(img, k))
+        small = np.ascontiguousarray(np.rot90(small, k))
+    skew = estimate_skew(pp_gray(small))
+    if abs(skew) >= DESKEW_MIN_ANGLE:
+        h, w = img.shape[:2]
+        m = cv2.getRotationMatrix2D((w / 2, h / 2), skew, 1.0)
+        img = cv2.warpAffine(img, m, (w, h), flags=cv2.INTER_CUBIC,
+                             borderMode=cv2.BORDER_CONSTANT, borderValue=(255, 255, 255))
+    return img, confident
+
+# ---- Perceptual hashes (near-duplicate uploads) ----
+def _bits(mask: np.ndarray) -> int:
+    return int.from_bytes(np.packbits(mask.flatten()).tobytes(), "big")
+
+@metrics.timed("image_hash")
+def image_hashes(img_or_path) -> Tuple[int, int]:
+    """
+    64-bit (pHash, dHash) of an image. Both compare the image with itself
+    (DCT terms against their median, neighbouring pixels against each other),
+    so a rescan at a different exposure or resolution lands a few bits away.
+    """
+    gray = pp_gray(to_numpy(img_or_path))
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].flatten()
+    phash = _bits(low > np.median(low[1:]))
+    tiny = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    dhash = _bits(tiny[:, 1:] > tiny[:, :-1])
+    return phash, dhash
+
+# ---- Preprocessing graph ----
+# A variant is a node (op, scale) over shared intermediates:
+#   rgb@1 -> rgb@s (upscale)        rgb@1 -> sharp@1
+#   rgb@1 -> gray@1 -> gray@s -> bin@s / ada@s
+# Gray is upscaled instead of RGB (a third of the pixels), so every binarised
+# variant at a scale shares one gray@s, and all of them share one gray@1.
+Node = Tuple[str, float]
+
+def node_inputs(node: Node) -> List[Node]:
+    op, scale = node
+    if op == "rgb":
+        return [] if scale == 1.0 else [("rgb", 1.0)]
+    if op == "gray":
+        return [("rgb", 1.0)] if scale == 1.0 else [("gray", 1.0)]
+    if op in ("bin", "ada"):
+        return [("gray", scale)]
+    if op == "sharp":
+        return [("rgb", scale)]
+    raise ValueError(f"Unknown preprocessing op: {op}")
+
+_NODE_OPS: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "gray": pp_gray, "bin": pp_binary, "ada": pp_adaptive, "sharp": pp_unsharp,
+}
+
+class PreprocessGraph:
+    """
+    Memoized preprocessing for one page. plan() takes the order variants will
+    be requested in; release(i) then drops every intermediate no variant after
+    the i-th still needs, so only the live part of the graph stays in memory.
+    """
+
+    def __init__(self, base: np.ndarray, order: Optional[List[str]] = None):
+        self._memo: Dict[Node, np.ndarray] = {("rgb", 1.0): base}
+        self._last_use: Dict[Node, int] = {}
+        if order:
+            self.plan(order)
+
+    def plan(self, order: List[str]) -> None:
+        for i, tag in enumerate(order):
+            stack = [VARIANT_NODES[tag]]
+            while stack:
+                node = stack.pop()
+                self._last_use[node] = i
+                stack.extend(node_inputs(node))
+
+    def get(self, node: Node) -> np.ndarray:
+        img = self._memo.get(node)
+        if img is None:
+            op, scale = node
+            src = self.get(node_inputs(node)[0])
+            img = pp_upscale(src, scale) if op in ("rgb", "gray") else _NODE_OPS[op](src)
+            self._memo[node] = img
+        return img
+
+    def variant(self, tag: str) -> np.ndarray:
+        return self.get(VARIANT_NODES[tag])
+
+    def release(self, step: int) -> None:
+        for node in [n for n in self._memo if n != ("rgb", 1.0)]:
+            if self._last_use.get(node, -1) <= step:
+                del self._memo[node]
+
+def build_variant(base: np.ndarray, tag: str) -> np.ndarray:
+    """One variant on its own (no sharing); for callers outside the OCR loop."""
+    return PreprocessGraph(base).variant(tag)
+
 # ---- Paddle result normalizer (supports old & new formats) ----
 def normalize_line(line: Any) -> Tuple[np.ndarray, str, float]:
     if isinstance(line, dict):
@@ -83,100 +391,730 @@ def normalize_line(line: Any) -> Tuple[np.ndarray, str, float]:
     except Exception:
         return None, "", 0.0
 
+def iter_result_lines(result: List[Any]) -> Iterator[Tuple[np.ndarray, str, float]]:
+    """
+    normalize_line() over every line of an OCR result. PaddleOCR 3.x returns one
+    dict-like page result with parallel rec_polys / rec_texts / rec_scores
+    instead of a list of lines; those are unpacked here.
+    """
+    for res in result or []:
+        if hasattr(res, "get") and res.get("rec_texts") is not None:
+            polys = res.get("rec_polys")
+            if polys is None:
+                polys = res.get("dt_polys", [])
+            for pts, txt, conf in zip(polys, res["rec_texts"], res.get("rec_scores", [])):
+                yield normalize_line({"points": pts, "transcription": txt, "score": conf})
+        else:
+            for line in res:
+                yield normalize_line(line)
+
+def _rect(box: Optional[np.ndarray], i: int) -> Tuple[float, float, float, float]:
+    if box is None or not len(box):
+        return 0.0, float(i), 0.0, float(i)  # no geometry: keep result order
+    pts = np.asarray(box, dtype=np.float32).reshape(-1, 2)
+    x0, y0 = pts.min(axis=0)
+    x1, y1 = pts.max(axis=0)
+    return float(x0), float(y0), float(x1), float(y1)
+
+def structure_result(result: List[Any], conf_cut: float = 0.4, page: int = 0,
+                     scale: float = 1.0) -> List[OcrLine]:
+    """
+    Lines at or above conf_cut as OcrLines, in reading order. Boxes from an
+    image upscaled by `scale` are mapped back to the unscaled page.
+    """
+    kept = [(box, t, c) for box, t, c in iter_result_lines(result) if t and c >= conf_cut]
+    rects = [_rect(box, i) for i, (box, _, _) in enumerate(kept)]
+    if scale != 1.0:
+        rects = [tuple(v / scale for v in r) for r in rects]
+    return order_lines([OcrLine(r, t, c, page=page) for r, (_, t, c) in zip(rects, kept)])
+
 def draw_boxes(result: List[Any], np_img: np.ndarray, fname_prefix: str) -> str:
-    img = np_img.copy()
-    any_box = False
-    for res in result:
-        for line in res:
-            box, txt, conf = normalize_line(line)
-            if box is None:
-                continue
+    boxes = [box for box, _, _ in iter_result_lines(result) if box is not None]
+
+    def render() -> bytes:
+        img = as_rgb(np_img).copy()
+        for box in boxes:
             try:
                 cv2.polylines(img, [box], True, (0, 255, 0), 2)
-                any_box = True
             except Exception:
                 pass
-    out = os.path.join(DEBUG_DIR, f"{fname_prefix}_{uuid.uuid4().hex}.jpg")
-    cv2.imwrite(out, cv2.cvtColor(img, cv2.COLOR_RGB2BGR))
+        ok, buf = cv2.imencode(".jpg", cv2.cvtColor(img, cv2.COLOR_RGB2BGR))
+        return buf.tobytes() if ok else b""
+
+    return debug_writer.submit(f"{fname_prefix}_{uuid.uuid4().hex}.jpg", render) or ""  # "" when dropped
+
+# ---- Shared detection: detect once, recognize many ----
+def detect_boxes(np_img: np.ndarray) -> List[np.ndarray]:
+    res = get_text_detector().predict(np_img)
+    polys = res[0]["dt_polys"] if res else []
+    return [np.array(p, dtype=np.float32) for p in polys]
+
+def crop_box(np_img: np.ndarray, box: np.ndarray) -> Optional[np.ndarray]:
+    # perspective crop of a quad, same as PaddleOCR's rotate-crop step
+    pts = box.astype(np.float32)
+    w = int(max(np.linalg.norm(pts[0] - pts[1]), np.linalg.norm(pts[2] - pts[3])))
+    h = int(max(np.linalg.norm(pts[0] - pts[3]), np.linalg.norm(pts[1] - pts[2])))
+    if w < 2 or h < 2:
+        return None
+    dst = np.float32([[0, 0], [w, 0], [w, h], [0, h]])
+    m = cv2.getPerspectiveTransform(pts, dst)
+    crop = cv2.warpPerspective(np_img, m, (w, h), borderMode=cv2.BORDER_REPLICATE,
+                               flags=cv2.INTER_CUBIC)
+    if h / w >= 1.5:
+        crop = np.rot90(crop)
+    return crop
+
+# Recognizer batching: crops are sorted by aspect ratio (so little padding is
+# wasted) and sent REC_BATCH_SIZE at a time. A batch is also closed once its
+# padded width (at REC_IMG_HEIGHT) would exceed REC_MAX_PADDED_WIDTH; crops wider
+# than that on their own go through alone.
+REC_BATCH_SIZE = int(os.environ.get("FRA_OCR_REC_BATCH", "32"))
+REC_MAX_PADDED_WIDTH = int(os.environ.get("FRA_OCR_REC_MAX_WIDTH", "1600"))
+REC_IMG_HEIGHT = 48
+# PDF pages OCR'd together (and so sharing recognizer batches)
+OCR_PAGE_WINDOW = int(os.environ.get("FRA_OCR_PAGE_WINDOW", "4"))
+# Scanned PDF pages spread over this many processes (1 = in this process).
+# Each page process gets cores / PAGE_WORKERS Paddle threads; processes that are
+# themselves pool workers force this back to 1, so pools never nest.
+PAGE_WORKERS = int(os.environ.get("FRA_OCR_PAGE_WORKERS", "1"))
+
+def plan_rec_batches(crops: List[np.ndarray], batch_size: int = REC_BATCH_SIZE,
+                     max_width: int = REC_MAX_PADDED_WIDTH) -> List[List[int]]:
+    widths = [REC_IMG_HEIGHT * c.shape[1] / max(c.shape[0], 1) for c in crops]
+    batches, cur = [], []
+    for i in sorted(range(len(crops)), key=widths.__getitem__):
+        if cur and (len(cur) >= batch_size or widths[i] > max_width):
+            batches.append(cur)
+            cur = []
+        cur.append(i)
+    if cur:
+        batches.append(cur)
+    return batches
+
+def recognize_crops(crops: List[np.ndarray]) -> List[Tuple[str, float]]:
+    out: List[Tuple[str, float]] = [("", 0.0)] * len(crops)
+    rec = get_text_recognizer() if crops else None
+    for idx in plan_rec_batches(crops):
+        res = rec.predict(input=[crops[i] for i in idx], batch_size=len(idx))
+        for i, r in zip(idx, res):
+            out[i] = (r["rec_text"] or "", float(r["rec_score"] or 0.0))
     return out
 
 # ---- Core OCR (single pass) ----
-def ocr_once(np_img: np.ndarray, conf_cut: float = 0.4, tag: str = "pass") -> Tuple[str, float, int, str]:
-    result = ocr.ocr(np_img)
-    debug_path = draw_boxes(result, np_img, f"ocr_debug_{tag}")
-
-    texts = []
-    confs = []
-    for res in result:
-        for line in res:
-            _, t, c = normalize_line(line)
-            if t and c >= conf_cut:
-                texts.append(t)
-                confs.append(c)
-
-    text = " ".join(texts).strip()
-    avg_conf = float(np.mean(confs)) if confs else 0.0
-    return text, avg_conf, len(text), debug_path
+def summarize_result(result: List[Any], conf_cut: float = 0.4) -> Tuple[str, float, int]:
+    text, avg_conf, nchar, _ = summarize_lines(structure_result(result, conf_cut))
+    return text, avg_conf, nchar
+
+def summarize_lines(lines: List[OcrLine]) -> Tuple[str, float, int, List[OcrLine]]:
+    # rows of the page become lines of text, so line-based label patterns still apply
+    text = lines_text(lines).strip()
+    avg_conf = float(np.mean([l.conf for l in lines])) if lines else 0.0
+    return text, avg_conf, len(text), lines
+
+def ocr_variant_results(jobs: List[Tuple[np.ndarray, str, Optional[List[np.ndarray]]]],
+                        debug: bool = False,
+                        line_orientation: Optional[List[bool]] = None) -> List[Tuple[List[Any], str]]:
+    """
+    (result, debug_path) per (image, tag, boxes) job, where result is a list of
+    line lists normalize_line() can read. The crops of every job that comes with
+    boxes are pooled and recognized together in batches, then mapped back to
+    their job; jobs without boxes run the full detection pipeline, with the
+    per-line orientation classifier where line_orientation[j] is set.
+    """
+    # one ocr_once.<tag> span per call; in a round every job has the same tag
+    tags = {tag for _, tag, _ in jobs}
+    with metrics.span("ocr_once." + (tags.pop() if len(tags) == 1 else "mixed")):
+        crops, owners = [], []
+        for j, (img, _, boxes) in enumerate(jobs):
+            for box in boxes or []:
+                crop = crop_box(img, box)
+                if crop is not None:
+                    crops.append(as_rgb(crop))
+                    owners.append((j, box))
+
+        lines: List[List[Any]] = [[] for _ in jobs]
+        for (j, box), (txt, conf) in zip(owners, recognize_crops(crops)):
+            lines[j].append({"points": box, "transcription": txt, "score": conf})
+        del crops
+
+        out = []
+        for j, (img, tag, boxes) in enumerate(jobs):
+            if boxes is None:
+                cls = line_orientation[j] if line_orientation else None
+                result = get_ocr(textline_orientation=cls).ocr(as_rgb(img))
+            else:
+                result = [lines[j]]
+            debug_path = draw_boxes(result, img, f"ocr_debug_{tag}") if debug else ""
+            out.append((result, debug_path))
+        return out
+
+def ocr_variant_batch(jobs: List[Tuple[np.ndarray, str, Optional[List[np.ndarray]]]],
+                      conf_cut: float = 0.4, debug: bool = False) -> List[Tuple[str, float, int, str]]:
+    """ocr_once() over several (image, tag, boxes) jobs; see ocr_variant_results()."""
+    return [(*summarize_result(result, conf_cut), dbg) for result, dbg in ocr_variant_results(jobs, debug)]
+
+def ocr_once(np_img: np.ndarray, conf_cut: float = 0.4, tag: str = "pass",
+             boxes: Optional[List[np.ndarray]] = None, debug: bool = False) -> Tuple[str, float, int, str]:
+    # with boxes given, skip detection and only run the recognizer
+    return ocr_variant_batch([(np_img, tag, boxes)], conf_cut, debug)[0]
+
+# ---- Variant scheduling ----
+# (tag, scale, relative cost, graph op). Cost is roughly the pixel count relative
+# to the original page, which is what dominates detection + recognition time.
+VARIANT_SPECS: List[Tuple[str, float, float, str]] = [
+    ("orig", 1.0, 1.0, "rgb"),
+    ("sharp", 1.0, 1.05, "sharp"),
+    ("bin", 1.0, 1.05, "bin"),
+    ("ada", 1.0, 1.1, "ada"),
+    ("orig_1p5", 1.5, 2.25, "rgb"),
+    ("bin_1p5", 1.5, 2.3, "bin"),
+    ("ada_1p5", 1.5, 2.35, "ada"),
+    ("orig_2x", 2.0, 4.0, "rgb"),
+    ("bin_2x", 2.0, 4.1, "bin"),
+    ("ada_2x", 2.0, 4.2, "ada"),
+]
+VARIANT_NODES: Dict[str, Node] = {tag: (op, scale) for tag, scale, _, op in VARIANT_SPECS}
+VARIANTS_BY_TAG = {spec[0]: spec for spec in VARIANT_SPECS}
+
+# Shared detection: run the text detector once on SHARED_DET_SOURCE and reuse
+# its boxes (rescaled) for every variant, so only the recognizer runs per variant.
+SHARED_DETECTION = os.environ.get("FRA_OCR_SHARED_DET", "0") == "1"
+SHARED_DET_SOURCE = os.environ.get("FRA_OCR_SHARED_DET_SOURCE", "orig")
+
+# Quality bar for early exit: stop as soon as one variant reaches both.
+# Set FRA_OCR_EARLY_EXIT=0 to always run every variant (old behaviour).
+EARLY_EXIT = os.environ.get("FRA_OCR_EARLY_EXIT", "1") != "0"
+EARLY_EXIT_MIN_CONF = float(os.environ.get("FRA_OCR_MIN_CONF", "0.85"))
+EARLY_EXIT_MIN_CHARS = int(os.environ.get("FRA_OCR_MIN_CHARS", "200"))
+
+# ROI upscaling: instead of whole-page 1.5x/2x variants, the low-confidence
+# lines of the best 1x pass are cropped from the original page and only those
+# crops go through the upscaled variants. FRA_OCR_ROI_UPSCALE=0 restores the
+# whole-page variants.
+ROI_UPSCALE = os.environ.get("FRA_OCR_ROI_UPSCALE", "1") != "0"
+ROI_MIN_CONF = float(os.environ.get("FRA_OCR_ROI_MIN_CONF", "0.85"))
+
+# Tiling for very large scans: pages over TILE_MIN_PIXELS are OCR'd as
+# overlapping full-width bands (split into columns only past TILE_MAX_WIDTH), with
+# each variant built per tile, so memory per tile is bounded whatever the page
+# size. The overlap must exceed a text line's height at scan resolution.
+TILING = os.environ.get("FRA_OCR_TILING", "1") != "0"
+TILE_MIN_PIXELS = int(float(os.environ.get("FRA_OCR_TILE_MIN_MP", "16")) * 1_000_000)
+TILE_HEIGHT = int(os.environ.get("FRA_OCR_TILE_HEIGHT", "1536"))
+TILE_MAX_WIDTH = int(os.environ.get("FRA_OCR_TILE_MAX_WIDTH", "4096"))
+TILE_OVERLAP = int(os.environ.get("FRA_OCR_TILE_OVERLAP", "192"))
+
+# Identifies everything that changes OCR output for the same input; part of the
+# result-cache key in app.py. Bump the leading number on behavioural changes.
+OCR_CONFIG_VERSION = "|".join(str(v) for v in (
+    "9", EARLY_EXIT, EARLY_EXIT_MIN_CONF, EARLY_EXIT_MIN_CHARS, SHARED_DETECTION, SHARED_DET_SOURCE,
+    PAGE_ORIENTATION, PAGE_ORIENT_MIN_CONF, PAGE_ANALYSIS_SIDE, DESKEW_MAX_ANGLE, DESKEW_MIN_ANGLE,
+    ROI_UPSCALE, ROI_MIN_CONF,
+    TILING, TILE_MIN_PIXELS, TILE_HEIGHT, TILE_MAX_WIDTH, TILE_OVERLAP, PDF_DPI, PDF_TEXT_MIN_CHARS,
+))
+
+# tag -> [wins, runs]; a "win" is being the variant whose text is returned.
+# Per process; /metrics shows the same counts summed over workers as
+# fra_ocr_variant_runs_total / fra_ocr_variant_selected_total.
+_variant_stats: Dict[str, List[int]] = {spec[0]: [0, 0] for spec in VARIANT_SPECS}
+_variant_stats_lock = threading.Lock()
+
+def record_variant_result(ran: List[str], winner: Optional[str]) -> None:
+    with _variant_stats_lock:
+        for tag in ran:
+            _variant_stats.setdefault(tag, [0, 0])[1] += 1
+        if winner is not None:
+            _variant_stats.setdefault(winner, [0, 0])[0] += 1
+
+def schedule_variants() -> List[Tuple[str, float, float, str]]:
+    """
+    Order variants by expected cost per win: relative cost divided by a
+    Laplace-smoothed win rate. With no history this is plain cheapest-first;
+    variants that keep winning move forward, ones that never win drift back.
+    """
+    with _variant_stats_lock:
+        stats = {tag: tuple(v) for tag, v in _variant_stats.items()}
+
+    def expected_cost(spec):
+        tag, _, cost, _ = spec
+        wins, runs = stats.get(tag, (0, 0))
+        return cost / ((wins + 1) / (runs + 2))
+
+    return sorted(VARIANT_SPECS, key=expected_cost)
+
+def page_schedule() -> List[Tuple[str, float, float, str]]:
+    """The whole-page variants ocr_images() runs; upscaled ones go to roi_upscale() instead."""
+    return [spec for spec in schedule_variants() if not (ROI_UPSCALE and spec[1] > 1.0)]
+
+def replay_schedule(prefer: Optional[str]) -> Optional[List[Tuple[str, float, float, str]]]:
+    """
+    Schedule for an image whose near-duplicate was read best by `prefer`, the
+    base variant of its result (see ocr_images). With ROI upscaling that 1x
+    variant alone, its weak lines then going straight to roi_upscale();
+    otherwise the usual schedule with `prefer` first. None when this is no
+    different from the usual schedule.
+    """
+    usual = page_schedule()
+    spec = VARIANTS_BY_TAG.get(prefer)
+    if spec not in usual:
+        return None
+    replay = [spec] if ROI_UPSCALE else [spec] + [s for s in usual if s is not spec]
+    return None if replay == usual else replay
+
+def meets_quality_bar(avg_conf: float, nchar: int,
+                      min_conf: float = EARLY_EXIT_MIN_CONF,
+                      min_chars: int = EARLY_EXIT_MIN_CHARS) -> bool:
+    return avg_conf >= min_conf and nchar >= min_chars
+
+# ---- Tiled OCR for very large pages ----
+def needs_tiling(img: np.ndarray) -> bool:
+    return TILING and img.shape[0] * img.shape[1] > TILE_MIN_PIXELS
+
+def _tile_spans(n: int, size: int, overlap: int) -> List[Tuple[int, int]]:
+    # the fewest spans of at most `size` that cover n, all the same length and
+    # evenly spaced, so neighbours share exactly `overlap` and no more
+    if n <= size:
+        return [(0, n)]
+    overlap = min(overlap, size - 1)
+    count = math.ceil((n - overlap) / (size - overlap))
+    starts = [i * (n - overlap) // count for i in range(count + 1)]
+    return [(starts[i], starts[i + 1] + overlap) for i in range(count)]
+
+def plan_tiles(h: int, w: int, tile_h: int = TILE_HEIGHT, max_w: int = TILE_MAX_WIDTH,
+               overlap: int = TILE_OVERLAP) -> List[Tuple[int, int, int, int]]:
+    """(x0, y0, x1, y1) tiles covering an h x w page, overlapping by `overlap`."""
+    return [(x0, y0, x1, y1)
+            for y0, y1 in _tile_spans(h, tile_h, overlap)
+            for x0, x1 in _tile_spans(w, max_w, overlap)]
+
+def _bbox(box: np.ndarray) -> np.ndarray:
+    return np.concatenate([box.min(axis=0), box.max(axis=0)])
+
+def dedupe_boxes(boxes: List[np.ndarray], cut: List[bool], min_overlap: float = 0.5) -> List[int]:
+    """
+    Indexes of the boxes to keep after merging tile overlaps. A box touching a
+    tile's inner edge is likely truncated, so whole boxes win, then larger ones;
+    a box is dropped when it covers min_overlap of a kept box or vice versa.
+    """
+    if not boxes:
+        return []
+    rects = np.array([_bbox(b) for b in boxes], dtype=np.float32)
+    areas = np.maximum(rects[:, 2] - rects[:, 0], 1) * np.maximum(rects[:, 3] - rects[:, 1], 1)
+    order = sorted(range(len(boxes)), key=lambda i: (cut[i], -areas[i]))
+    kept: List[int] = []
+    for i in order:
+        if kept:
+            k = rects[kept]
+            iw = np.minimum(k[:, 2], rects[i, 2]) - np.maximum(k[:, 0], rects[i, 0])
+            ih = np.minimum(k[:, 3], rects[i, 3]) - np.maximum(k[:, 1], rects[i, 1])
+            inter = np.clip(iw, 0, None) * np.clip(ih, 0, None)
+            if np.any(inter / np.minimum(areas[kept], areas[i]) >= min_overlap):
+                continue
+        kept.append(i)
+    return kept
+
+def reading_order(lines: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Sort line dicts into rows, top to bottom, each row left to right."""
+    items = [(tuple(_bbox(np.asarray(l["points"], dtype=np.float32))), l) for l in lines]
+    return [l for row in reading_rows(items) for l in row]
+
+def ocr_tiled(base: np.ndarray, tag: str, edge_px: int = 4) -> List[Dict[str, Any]]:
+    """
+    One variant of a large page, tile by tile: each tile's variant is built,
+    detected and cropped, then dropped. Boxes are mapped back to page
+    coordinates and merged, and only the survivors are recognized, in shared
+    batches. Returns normalize_line-style dicts in reading order.
+    """
+    _, scale = VARIANT_NODES[tag]
+    h, w = base.shape[:2]
+    boxes, cut, crops = [], [], []
+    with metrics.span("ocr_tiled." + tag):
+        for x0, y0, x1, y1 in plan_tiles(h, w):
+            img = build_variant(base[y0:y1, x0:x1], tag)
+            th, tw = img.shape[:2]
+            for box in detect_boxes(as_rgb(img)):
+                crop = crop_box(img, box)
+                if crop is None:
+                    continue
+                lo, hi = box.min(axis=0), box.max(axis=0)
+                cut.append(bool((x0 > 0 and lo[0] <= edge_px) or (y0 > 0 and lo[1] <= edge_px)
+                                or (x1 < w and hi[0] >= tw - edge_px) or (y1 < h and hi[1] >= th - edge_px)))
+                boxes.append(box / scale + np.float32([x0, y0]))
+                crops.append(as_rgb(crop))
+            del img
+
+        keep = dedupe_boxes(boxes, cut)
+        texts = recognize_crops([crops[i] for i in keep])
+    del crops
+    lines = [{"points": boxes[i].astype(np.int32), "transcription": txt, "score": conf}
+             for i, (txt, conf) in zip(keep, texts)]
+    return reading_order(lines)
+
+# ---- ROI upscaling ----
+def result_lines(result: List[Any]) -> List[Tuple[np.ndarray, str, float]]:
+    return list(iter_result_lines(result))
+
+def roi_upscale(base: np.ndarray, lines: List[Tuple[np.ndarray, str, float]],
+                min_conf: float = ROI_MIN_CONF) -> List[Dict[str, Any]]:
+    """
+    Re-recognize the lines below min_conf from crops of the original page, run
+    through every upscaled variant (each crop's own small preprocessing graph),
+    keeping the most confident reading per line. Boxes are in base coordinates.
+    """
+    tags = [spec[0] for spec in VARIANT_SPECS if spec[1] > 1.0]
+    best = {i: (txt, conf) for i, (box, txt, conf) in enumerate(lines)
+            if box is not None and conf < min_conf}
+    crops, owners = [], []
+    with metrics.span("ocr_roi"):
+        for i in best:
+            crop = crop_box(base, lines[i][0].astype(np.float32))
+            if crop is None:
+                continue
+            graph = PreprocessGraph(crop, tags)
+            for step, tag in enumerate(tags):
+                crops.append(as_rgb(graph.variant(tag)))
+                owners.append(i)
+                graph.release(step)
+        for i, (txt, conf) in zip(owners, recognize_crops(crops)):
+            if txt and conf > best[i][1]:
+                best[i] = (txt, conf)
+    out = []
+    for i, (box, txt, conf) in enumerate(lines):
+        if box is not None:
+            txt, conf = best.get(i, (txt, conf))
+            out.append({"points": box, "transcription": txt, "score": conf})
+    return out
 
 # ---- Multi-pass OCR with selection ----
-def run_ocr_on_image(img_or_path) -> str:
-    base = to_numpy(img_or_path)
-
-    variants = []
-    # original, sharpened, binary, adaptive; also upscaled 1.5x and 2x for some
-    variants.append(("orig", pp_none(base)))
-    variants.append(("sharp", pp_unsharp(base)))
-    variants.append(("bin", pp_binary(base)))
-    variants.append(("ada", pp_adaptive(base)))
-    variants.append(("orig_1p5", pp_upscale(base, 1.5)))
-    variants.append(("bin_1p5", pp_binary(pp_upscale(base, 1.5))))
-    variants.append(("ada_1p5", pp_adaptive(pp_upscale(base, 1.5))))
-    variants.append(("orig_2x", pp_upscale(base, 2.0)))
-    variants.append(("bin_2x", pp_binary(pp_upscale(base, 2.0))))
-    variants.append(("ada_2x", pp_adaptive(pp_upscale(base, 2.0))))
-
-    results = []
+def shared_boxes(base: np.ndarray, source: str = SHARED_DET_SOURCE) -> Optional[List[np.ndarray]]:
+    """Detect on the source variant and return boxes in base-image coordinates."""
+    tag, scale, _, _ = VARIANTS_BY_TAG.get(source, VARIANTS_BY_TAG["orig"])
+    boxes = detect_boxes(as_rgb(build_variant(base, tag)))
+    if not boxes:
+        return None  # let every variant fall back to full detection
+    return [b / scale for b in boxes]
+
+def ocr_images(imgs: List[Any], early_exit: Optional[bool] = None,
+               min_conf: Optional[float] = None, min_chars: Optional[int] = None,
+               shared_det: Optional[bool] = None, debug: Optional[bool] = None,
+               schedule: Optional[List[Tuple[str, float, float, str]]] = None,
+               ) -> List[Tuple[str, List[OcrLine], Optional[str], Optional[str]]]:
+    """
+    (text, lines, variant, base) per page: the selected pass's text, its
+    OcrLines in reading order (boxes in the upright, deskewed page's pixels,
+    whatever the scale of the variant that read them), its variant tag and
+    the whole-page variant it came from, which differs only for "roi" results.
+    `schedule` replaces the usual page_schedule(), e.g. replay_schedule() for
+    a near-duplicate of an image OCR'd before.
+
+    Multi-pass OCR over several pages at once. Variants run in scheduled order as
+    rounds over the pages still below the quality bar; within a round all
+    recognizer crops (shared-detection mode) go through recognize_crops together.
+    Pages larger than TILE_MIN_PIXELS are OCR'd in tiles by ocr_tiled(). With
+    ROI_UPSCALE, upscaled variants only run on the weak lines of pages that
+    are still pending after the 1x variants (roi_upscale()).
+    """
+    bases = [to_numpy(i) for i in imgs]
+    early_exit = EARLY_EXIT if early_exit is None else early_exit
+    min_conf = EARLY_EXIT_MIN_CONF if min_conf is None else min_conf
+    min_chars = EARLY_EXIT_MIN_CHARS if min_chars is None else min_chars
+    shared_det = SHARED_DETECTION if shared_det is None else shared_det
+    debug = DEBUG_OCR if debug is None else debug
+    # pages are made upright once; unsure ones keep per-line orientation, which
+    # only the full pipeline has, so they also skip shared detection
+    unsure = [False] * len(bases)
+    if PAGE_ORIENTATION:
+        normalized = [normalize_page(b) for b in bases]
+        bases = [b for b, _ in normalized]
+        unsure = [not ok for _, ok in normalized]
+        del normalized
+    # large pages go tile by tile (ocr_tiled) instead of through the page graph
+    tiled = [needs_tiling(b) for b in bases]
+    page_boxes = [shared_boxes(b) if shared_det and not t and not u else None
+                  for b, t, u in zip(bases, tiled, unsure)]
+
+    results: List[list] = [[] for _ in bases]
+    winners: List[Optional[tuple]] = [None] * len(bases)
     dump_lines = []
+    pending = list(range(len(bases)))
+
+    # variants are built lazily, in scheduled order, from each page's memoized
+    # preprocessing graph, so an early exit also skips the preprocessing of
+    # everything after it; intermediates are freed once no later variant needs them
+    schedule = page_schedule() if schedule is None else schedule
+    order = [spec[0] for spec in schedule]
+    best_lines: List[Optional[tuple]] = [None] * len(bases)  # (nchar, conf, lines, tag) of best 1x pass
+    graphs: List[Optional[PreprocessGraph]] = [
+        None if t else PreprocessGraph(b, order) for b, t in zip(bases, tiled)]
+    for step, (tag, scale, _, _) in enumerate(schedule):
+        if not pending:
+            break
+        jobs, job_pages = [], []
+        for p in pending:
+            if tiled[p]:
+                continue
+            boxes = [b * scale for b in page_boxes[p]] if page_boxes[p] is not None else None
+            jobs.append((graphs[p].variant(tag), tag, boxes))
+            job_pages.append(p)
+        line_cls = [True if unsure[p] else None for p in job_pages]
+        raw = dict(zip(job_pages, ocr_variant_results(jobs, debug, line_cls))) if jobs else {}
+        del jobs
+        for p in job_pages:
+            graphs[p].release(step)
+        for p in pending:
+            if tiled[p]:
+                result = [ocr_tiled(bases[p], tag)]
+                raw[p] = (result, draw_boxes(result, bases[p], f"ocr_debug_{tag}") if debug else "")
 
-    for tag, img in variants:
-        text, avg_conf, nchar, dbg = ocr_once(img, conf_cut=0.4, tag=tag)
-        results.append((nchar, avg_conf, text))
-        dump_lines.append(f"[{tag}] chars={nchar} avg_conf={avg_conf:.3f} dbg={os.path.basename(dbg)}\n{text[:400]}\n")
+        still_pending = []
+        for p in pending:
+            result, dbg = raw.pop(p)
+            # tiles come back in page pixels already; variants are in their own scale
+            lines = structure_result(result, conf_cut=0.4, scale=1.0 if tiled[p] else scale)
+            text, avg_conf, nchar, lines = summarize_lines(lines)
+            if ROI_UPSCALE and scale == 1.0 and (best_lines[p] is None or (nchar, avg_conf) > best_lines[p][:2]):
+                best_lines[p] = (nchar, avg_conf, result_lines(result), tag)
+            results[p].append((nchar, avg_conf, text, tag, lines, tag))
+            if debug:
+                dump_lines.append(f"[p{p + 1} {tag}] chars={nchar} avg_conf={avg_conf:.3f} dbg={os.path.basename(dbg) or '-'}\n{text[:400]}\n")
+            if early_exit and meets_quality_bar(avg_conf, nchar, min_conf, min_chars):
+                winners[p] = results[p][-1]
+                graphs[p] = best_lines[p] = None
+            else:
+                still_pending.append(p)
+        pending = still_pending
+
+    # pages still below the bar: upscale and re-read only their weak lines
+    for p in pending:
+        if best_lines[p] is None:
+            continue
+        result = [roi_upscale(bases[p], best_lines[p][2])]
+        text, avg_conf, nchar, lines = summarize_lines(structure_result(result, conf_cut=0.4))
+        results[p].append((nchar, avg_conf, text, "roi", lines, best_lines[p][3]))
+        if debug:
+            dump_lines.append(f"[p{p + 1} roi] chars={nchar} avg_conf={avg_conf:.3f}\n{text[:400]}\n")
+    best_lines = graphs = None
 
     # Save a dump for debugging/demo
-    dump_path = os.path.join(DEBUG_DIR, "last_ocr_dump.txt")
-    with open(dump_path, "w", encoding="utf-8") as f:
-        f.write("\n\n".join(dump_lines))
-    print(f"🔹 OCR dump saved: {dump_path}")
+    if debug:
+        dump = "\n\n".join(dump_lines).encode("utf-8")
+        dump_path = debug_writer.submit("last_ocr_dump.txt", lambda: dump)
+        if dump_path:
+            print(f"🔹 OCR dump queued: {dump_path} ({len(dump_lines)} passes, {len(bases)} page(s))")
+
+    pages = []
+    for p, res in enumerate(results):
+        winner = winners[p]
+        # no variant met the bar: pick best by chars, then by avg conf
+        if winner is None and res:
+            winner = max(res, key=lambda x: (x[0], x[1]))
+        record_variant_result([r[3] for r in res], winner[3] if winner else None)
+        for r in res:
+            metrics.count("ocr_variant_runs", variant=r[3])
+        if winner:
+            metrics.count("ocr_variant_selected", variant=winner[3])
+        pages.append((winner[2].strip(), winner[4], winner[3], winner[5]) if winner else ("", [], None, None))
+    return pages
+
+def run_ocr_on_images(imgs: List[Any], early_exit: Optional[bool] = None,
+                      min_conf: Optional[float] = None, min_chars: Optional[int] = None,
+                      shared_det: Optional[bool] = None, debug: Optional[bool] = None) -> List[str]:
+    return [text for text, _, _, _ in ocr_images(imgs, early_exit, min_conf, min_chars, shared_det, debug)]
 
-    # pick best by chars, then by avg conf
-    results.sort(key=lambda x: (x[0], x[1]))
-    best = results[-1] if results else (0, 0.0, "")
-    return best[2].strip()
+def run_ocr_on_image(img_or_path, early_exit: Optional[bool] = None,
+                     min_conf: Optional[float] = None, min_chars: Optional[int] = None,
+                     shared_det: Optional[bool] = None, debug: Optional[bool] = None) -> str:
+    return run_ocr_on_images([img_or_path], early_exit, min_conf, min_chars, shared_det, debug)[0]
 
 # ---- Public entry ----
-def extract_text(file_path: str) -> str:
-    ext = os.path.splitext(file_path)[1].lower()
-    text = ""
+# (page_index, page_count, text, lines); lines is None where there is no geometry (DOCX)
+Page = Tuple[int, int, str, Optional[List[OcrLine]]]
+
+def text_layer_lines(page) -> List[OcrLine]:
+    """OcrLines from a pdfplumber page's text layer (boxes in PDF points)."""
+    return order_lines([
+        OcrLine((float(l["x0"]), float(l["top"]), float(l["x1"]), float(l["bottom"])), l["text"], 1.0)
+        for l in page.extract_text_lines(return_chars=False) if l["text"].strip()
+    ])
+
+def _ocr_page_window(window: List[Tuple[int, str, Image.Image]], total: int,
+                     debug: Optional[bool]) -> Iterator[Page]:
+    pages = ocr_images([img for _, _, img in window], debug=debug)
+    for (idx, layer_text, _), (text, lines, _, _) in zip(window, pages):
+        # a near-empty text layer still beats an empty OCR result
+        yield idx, total, text or layer_text, lines
+    window.clear()
+
+def ocr_pdf_page_lines(pdf_path: str, page_number: int, dpi: int = PDF_DPI,
+                       debug: Optional[bool] = None, layer_text: str = "") -> Tuple[str, List[OcrLine]]:
+    """
+    Rasterise and OCR one PDF page (page_number is 1-based): its text, or
+    layer_text when OCR reads nothing, and its OcrLines. The unit of work for
+    the page pool.
+    """
+    text, lines, _, _ = ocr_images([rasterize_pdf_page(pdf_path, page_number, dpi)], debug=debug)[0]
+    return text or layer_text, lines
+
+def _ocr_pdf_page_traced(*args) -> Tuple[Tuple[str, List[OcrLine]], metrics.Trace]:
+    # page-pool entry: hands the page's timings back to the document's trace
+    with metrics.collect() as trace:
+        return ocr_pdf_page_lines(*args), trace
+
+def _layer_page(page) -> Tuple[str, Optional[List[OcrLine]]]:
+    text = (page.extract_text() or "").strip()
+    lines = text_layer_lines(page) if len(text) >= PDF_TEXT_MIN_CHARS else None
+    page.close()
+    return text, lines
+
+def _iter_pdf_pages_parallel(pdf: Source, debug: Optional[bool], dpi: int) -> Iterator[Page]:
+    # workers rasterise their own page, so no images cross process boundaries;
+    # in-memory PDFs are spilled once to a temp file the workers can open
+    from ocr.worker_pool import discard_page_pool, get_page_pool
+    pool = get_page_pool(PAGE_WORKERS)
+    max_ahead = PAGE_WORKERS * 2
+    futures: Dict[Future, int] = {}
+    finished: Dict[int, Tuple[str, Optional[List[OcrLine]]]] = {}
+    next_idx = 0
+    total = 0
+
+    def drain(block: bool) -> Iterator[Page]:
+        # collect finished pages, then emit the contiguous run from next_idx
+        nonlocal next_idx
+        if futures:
+            done, _ = wait(list(futures), timeout=None if block else 0, return_when=FIRST_COMPLETED)
+            for f in done:
+                page, trace = f.result()
+                metrics.merge(trace)
+                finished[futures.pop(f)] = page
+        while next_idx in finished:
+            yield (next_idx, total, *finished.pop(next_idx))
+            next_idx += 1
+
+    with spilled_pdf(pdf) as pdf_path:
+        try:
+            with pdfplumber.open(pdf_path) as doc:
+                total = len(doc.pages)
+                for idx, page in enumerate(doc.pages):
+                    text, lines = _layer_page(page)
+                    if lines is not None:
+                        finished[idx] = (text, lines)
+                    else:
+                        futures[pool.submit(_ocr_pdf_page_traced, pdf_path, idx + 1, dpi, debug, text)] = idx
+                    while len(futures) >= max_ahead:
+                        yield from drain(block=True)
+                    yield from drain(block=False)
+            while futures or next_idx in finished:
+                yield from drain(block=True)
+        except BrokenProcessPool:
+            discard_page_pool(pool)  # a page worker died; the next document gets a fresh pool
+            raise
+        finally:
+            for f in futures:
+                f.cancel()
+
+def iter_pdf_pages(pdf: Source, debug: Optional[bool] = None, dpi: int = PDF_DPI) -> Iterator[Page]:
+    """
+    Per-page hybrid PDF reader: pages with a text layer use it, the others are
+    rasterised one at a time and OCR'd in windows of OCR_PAGE_WINDOW, or across
+    PAGE_WORKERS processes. Pages come out in order either way, and only a
+    bounded number of page images is alive at any time.
+    """
+    if PAGE_WORKERS > 1:
+        yield from _iter_pdf_pages_parallel(pdf, debug, dpi)
+        return
+    window: List[Tuple[int, str, Image.Image]] = []
+    # the text layer is read from memory; pages are only rasterised from disk,
+    # so bytes are spilled once per document rather than once per scanned page
+    pdf_path = pdf if isinstance(pdf, str) else None
+    with ExitStack() as stack, pdfplumber.open(pdf if pdf_path else io.BytesIO(pdf)) as doc:
+        total = len(doc.pages)
+        for idx, page in enumerate(doc.pages):
+            text, lines = _layer_page(page)
+            if lines is not None:
+                yield from _ocr_page_window(window, total, debug)
+                yield idx, total, text, lines
+                continue
+            if pdf_path is None:
+                pdf_path = stack.enter_context(spilled_pdf(pdf))
+            window.append((idx, text, rasterize_pdf_page(pdf_path, idx + 1, dpi)))
+            if len(window) >= OCR_PAGE_WINDOW:
+                yield from _ocr_page_window(window, total, debug)
+        yield from _ocr_page_window(window, total, debug)
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff")
+# formats the batch CLI and /extract/batch pick up
+DOC_EXTS = IMAGE_EXTS + (".pdf", ".docx")
+
+def source_format(source: Source, filename: Optional[str] = None) -> str:
+    """Lower-case extension of a path, or of in-memory bytes by filename / magic."""
+    if isinstance(source, str):
+        return os.path.splitext(source)[1].lower()
+    ext = os.path.splitext(filename or "")[1].lower()
+    if ext:
+        return ext
+    head = bytes(source[:4])
+    if head.startswith(b"%PDF"):
+        return ".pdf"
+    if head.startswith(b"PK"):
+        return ".docx"
+    return ".png"  # let the image decoder sort out the actual type
+
+def iter_pages(source: Union[Source, io.IOBase], debug: Optional[bool] = None,
+               filename: Optional[str] = None) -> Iterator[Page]:
+    """
+    Yield (page_index, page_count, text, lines) as pages finish. source is a
+    path, bytes or a readable buffer (filename then only hints the format). An
+    image and a DOCX each come back as a single page; DOCX has no lines.
+    """
+    if hasattr(source, "read"):
+        source = source.read()
+    ext = source_format(source, filename)
 
     if ext == ".pdf":
-        text = extract_text_from_pdf(file_path)
-        if not text:
-            for img in pdf_to_images(file_path):
-                chunk = run_ocr_on_image(img)
-                if chunk:
-                    text += chunk + "\n"
-    elif ext in (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff"):
-        text = run_ocr_on_image(file_path)
+        yield from iter_pdf_pages(source, debug)
+    elif ext in IMAGE_EXTS:
+        text, lines, _, _ = ocr_images([source], debug=debug)[0]
+        yield 0, 1, text, lines
     elif ext in (".docx", ".doc"):
         try:
-            doc = docx.Document(file_path)
+            doc = docx.Document(source if isinstance(source, str) else io.BytesIO(source))
             paras = [p.text for p in doc.paragraphs if p.text.strip()]
             text = "\n".join(paras)
         except Exception as e:
             raise ValueError(f"Failed to read DOCX: {e}")
+        yield 0, 1, text, None
     else:
         raise ValueError(f"Unsupported file format: {ext}")
 
-    return text.strip()
+def iter_page_texts(source: Union[Source, io.IOBase], debug: Optional[bool] = None,
+                    filename: Optional[str] = None) -> Iterator[Tuple[int, int, str]]:
+    """iter_pages() without the lines: (page_index, page_count, text)."""
+    for idx, total, text, _ in iter_pages(source, debug, filename):
+        yield idx, total, text
+
+# Pages are joined with a form feed on its own line: line-based field patterns
+# are unaffected, and the form classifier can still tell the pages apart.
+PAGE_SEPARATOR = "\n\f\n"
+
+
+def join_pages(pages: Iterable[str]) -> str:
+    return PAGE_SEPARATOR.join(t for t in pages if t).strip()
+
+
+def join_page_lines(pages: Iterable[Page]) -> Tuple[str, List[OcrLine]]:
+    """
+    join_pages() over iter_pages() output, plus every page's lines with `page`
+    renumbered to match the text (empty pages are dropped from both).
+    """
+    texts: List[str] = []
+    lines: List[OcrLine] = []
+    for _, _, text, page_lines in pages:
+        if text:
+            lines += [l._replace(page=len(texts)) for l in page_lines or []]
+            texts.append(text)
+    return join_pages(texts), lines
+
 
+def extract_text(source: Union[Source, io.IOBase], debug: Optional[bool] = None,
+                 filename: Optional[str] = None) -> str:
+    return join_pages(t for _, _, t in iter_page_texts(source, debug, filename))
@@ -0,0 +1,229 @@
+# ocr/worker_pool.py
+"""
+Process pool that keeps OCR off the API event loop.
+
+Each worker process builds its own PaddleOCR models (warmed up in the
+initializer) and caps its intra-op threads at cores / workers, so the pool as a
+whole does not oversubscribe the machine. Submissions are bounded: once
+`workers + queue_size` documents are in flight, run() raises PoolSaturated
+instead of letting the backlog grow. A worker that dies (OOM, a crash inside
+Paddle) breaks the whole executor; the pool then reports not-ready, builds a
+new one and pings it again.
+"""
+import asyncio
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+OCR_WORKERS = int(os.environ.get("FRA_OCR_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+OCR_QUEUE_SIZE = int(os.environ.get("FRA_OCR_QUEUE", "8"))
+OCR_TIMEOUT = float(os.environ.get("FRA_OCR_TIMEOUT", "300"))
+
+_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+class PoolSaturated(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"OCR queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+def threads_per_worker(workers: int) -> int:
+    return max(1, (os.cpu_count() or 1) // max(workers, 1))
+
+
+def _cap_thread_env(threads: int) -> None:
+    """
+    OpenMP / BLAS pools are sized from these variables when numpy, cv2 or
+    paddle are first imported. Set in the parent before a pool spawns
+    workers, so they also hold when the child's __main__ re-import (spawn)
+    loads numpy before the initializer runs.
+    """
+    for var in _THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+
+
+def _init_worker(threads: int, warm: bool) -> None:
+    if threads > 0:
+        _cap_thread_env(threads)  # before the imports below, in case nothing loaded them yet
+    import cv2
+    from ocr import ocr_engine
+    if threads > 0:
+        cv2.setNumThreads(threads)  # OpenCV's pool is not sized from the env
+        ocr_engine.PAGE_WORKERS = 1  # this process is already one of N; don't nest pools
+        ocr_engine.OCR_CPU_THREADS = threads  # Paddle's cpu_threads (see _model_kwargs)
+    if warm:
+        ocr_engine.warm_up()
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+_page_pool: Optional[ProcessPoolExecutor] = None
+_page_pool_lock = threading.Lock()
+
+
+def get_page_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Shared process pool for page-level OCR within one document. Created once
+    and reused, so each page worker loads its models only once.
+    """
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            _cap_thread_env(threads_per_worker(workers))
+            _page_pool = ProcessPoolExecutor(
+                workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker, initargs=(threads_per_worker(workers), False),
+            )
+    return _page_pool
+
+
+def discard_page_pool(broken: Executor) -> None:
+    """Drop a broken page pool; the next get_page_pool() builds a fresh one."""
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is not broken:
+            return
+        _page_pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+class OCRWorkerPool:
+    def __init__(self, workers: int = OCR_WORKERS, queue_size: int = OCR_QUEUE_SIZE,
+                 timeout: float = OCR_TIMEOUT):
+        self.workers = workers
+        self.timeout = timeout
+        # workers == 0 runs OCR on one thread of this process (development)
+        self.capacity = max(workers, 1) + queue_size
+        self.ready = False
+        self.error: Optional[str] = None
+        self._executor: Optional[Executor] = None
+        self._inflight = 0
+        self._lock = threading.Lock()
+        self._avg_seconds = 10.0
+        self._warm = True
+        self.restarts = 0
+
+    def start(self, warm: bool = True) -> None:
+        with self._lock:
+            if self._executor is not None:
+                return
+            self._warm = warm
+            if self.workers > 0:
+                threads = threads_per_worker(self.workers)
+                _cap_thread_env(threads)
+                executor = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker, initargs=(threads, warm),
+                )
+            else:
+                executor = ThreadPoolExecutor(
+                    1, thread_name_prefix="ocr", initializer=_init_worker, initargs=(0, warm),
+                )
+            self._executor = executor
+        pings = [executor.submit(_ping) for _ in range(max(self.workers, 1))]
+        threading.Thread(target=self._await_ready, args=(executor, pings), daemon=True).start()
+
+    def _await_ready(self, executor: Executor, pings) -> None:
+        try:
+            for f in pings:
+                f.result()
+        except Exception as e:
+            # no automatic restart here: a worker that dies while starting would loop
+            self.error = f"{e.__class__.__name__}: {e}"
+            print(f"⚠️ OCR worker start-up failed: {self.error}")
+            return
+        if self._executor is executor:
+            self.ready = True
+            self.error = None
+
+    def _restart(self, broken: Executor) -> None:
+        """Replace an executor broken by a dead worker (once, however many callers saw it)."""
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self.ready = False
+            self.error = "An OCR worker died; restarting the pool."
+            self._executor = None
+            self.restarts += 1
+        print(f"⚠️ {self.error}")
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.start(warm=self._warm)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def retry_after(self) -> int:
+        queued = max(self._inflight - max(self.workers, 1), 1)
+        return min(300, max(1, math.ceil(self._avg_seconds * queued / max(self.workers, 1))))
+
+    def _release(self, started: float) -> None:
+        with self._lock:
+            self._inflight -= 1
+            self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * (time.monotonic() - started)
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> Tuple[Future, Executor]:
+        if self._executor is None:
+            self.start(warm=False)
+        with self._lock:
+            if self._inflight >= self.capacity:
+                raise PoolSaturated(self.retry_after())
+            self._inflight += 1
+        started = time.monotonic()
+        executor = self._executor
+        try:
+            fut = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._release(started)
+            self._restart(executor)
+            raise
+        except Exception:
+            self._release(started)
+            raise
+        fut.add_done_callback(lambda _: self._release(started))
+        return fut, executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None,
+                  on_settled: Optional[Callable[[], None]] = None) -> Any:
+        """
+        Run fn(*args) on a worker. Raises PoolSaturated when the queue is full
+        and asyncio.TimeoutError after `timeout` (default: the pool's timeout).
+        A timed-out task keeps its slot until the worker actually finishes it.
+        BrokenProcessPool means a worker died; the pool is rebuilt for later calls.
+        on_settled() is called once nothing runs for this call any more: before
+        raising when fn never reached a worker, otherwise (from a pool thread)
+        when the worker is done with it, even after a timeout.
+        """
+        try:
+            fut, executor = self._submit(fn, *args)
+        except BaseException:
+            if on_settled:
+                on_settled()
+            raise
+        if on_settled:
+            fut.add_done_callback(lambda _: on_settled())
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(fut), timeout or self.timeout)
+        except BrokenProcessPool:
+            self._restart(executor)
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "in_flight": self._inflight,
+                "capacity": self.capacity,
+                "avg_seconds": round(self._avg_seconds, 3),
+                "ready": self.ready,
+                "restarts": self.restarts,
+            }
@@ -1,40 +1,163 @@
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
+"""
+Synthetic FRA documents for testing and benchmarking.
 
-def create_fra_pdf(filename):
-    c = canvas.Canvas(filename, pagesize=A4)
+Renders every supported form (Form A/B/C, Annexure-II/III/IV) as a text-layer
+PDF with reportlab, then rasterises it at several DPIs and degrades the scans
+with noise, blur and skew, so OCR sees something closer to field scans.
+
+    python pdf_sample_gen.py                      # sample_docs/sample_fra.pdf, as before
+    python pdf_sample_gen.py --corpus bench_docs  # full corpus + manifest.json
+"""
+import argparse
+import io
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+FORM_A_LINES = [
+    "FORM – A",
+    "CLAIM FORM FOR RIGHTS TO FOREST LAND",
+    "[See Rule 11(1)(a)]",
+    "",
+    "1. Name of the claimant(s): Ram Singh",
+    "2. Name of the spouse: Sita Devi",
+    "3. Name of father/mother: Mohan Singh",
+    "4. Address: Village Road, Bhilgaon",
+    "5. Village: Bhilgaon",
+    "6. Gram Panchayat: Bhilgaon GP",
+    "7. Tehsil/Taluka: Dharni",
+    "8. District: Amravati",
+    "9. State: Maharashtra",
+    "",
+    "9(a). Scheduled Tribe: Yes",
+    "9(b). Other Traditional Forest Dweller: No",
+    "Tribe name: Gond",
+    "",
+    "10. Area of land claimed: 3.5 hectares",
+    "Survey No: 45/2",
+    "",
+    "Claim status: Approved",
+    "Patta No: PATTA/2025/091",
+    "Date of DLC decision: 25/08/2025"
+]
+
+FORM_B_LINES = [
+    "FORM – B",
+    "CLAIM FORM FOR COMMUNITY RIGHTS",
+    "[See Rule 11(1)(a) and (4)]",
+    "",
+    "1. Name of the claimant(s): Gram Sabha Kolkhas",
+    "2. Village/Gram Sabha: Kolkhas",
+    "3. Gram Panchayat: Semadoh",
+    "4. Tehsil/Taluka: Dharni",
+    "5. District: Amravati",
+    "",
+    "6. Nature of community rights enjoyed: Grazing, collection of minor forest produce",
+    "7. Extent of land: 120 hectares",
+    "",
+    "Claim status: Pending",
+]
+
+FORM_C_LINES = [
+    "FORM – C",
+    "CLAIM FORM FOR RIGHTS TO COMMUNITY FOREST RESOURCE",
+    "[See Section 3(1)(i) of the Act and Rule 11(1) and (4)]",
+    "",
+    "1. Name of the claimant(s): Gram Sabha Raipur",
+    "2. Village/Gram Sabha: Raipur",
+    "3. Gram Panchayat: Raipur GP",
+    "4. Tehsil/Taluka: Chikhaldara",
+    "5. District: Amravati",
+    "",
+    "6. Nature of community rights over the forest resource: Protection and regeneration",
+    "7. Extent of land: 250 hectares",
+    "",
+    "Claim status: Approved",
+    "Date of DLC decision: 12/03/2025",
+]
+
+ANNEXURE_II_LINES = [
+    "ANNEXURE-II",
+    "TITLE FOR FOREST LAND UNDER OCCUPATION",
+    "",
+    "1. Name(s) of Holder(s) (including spouse):",
+    "1. Ram Singh  2. Sita Devi",
+    "2. Name of father/mother: Mohan Singh",
+    "3. Name of Dependents: Anil Singh, Sunita Singh",
+    "4. Address: Village Road, Bhilgaon",
+    "5. Village: Bhilgaon",
+    "6. Gram Panchayat: Bhilgaon GP",
+    "7. Tehsil/Taluka: Dharni",
+    "8. District: Amravati",
+    "9. Whether Scheduled Tribe or Other Traditional Forest Dweller: Scheduled Tribe",
+    "10. Area: 2-5-0 Bighas",
+    "11. Khasra No: 112/3",
+    "12. Description of boundaries by prominent landmarks:",
+    "North: Nala, South: Road, East: Forest, West: Field of Mohan",
+    "",
+    "Patta No: PATTA/2025/114",
+    "Date of DLC decision: 02/09/2025",
+]
+
+ANNEXURE_III_LINES = [
+    "ANNEXURE-III",
+    "TITLE FOR COMMUNITY FOREST RIGHTS",
+    "",
+    "1. Name of the claimant(s): Gram Sabha Kolkhas",
+    "2. Village/Gram Sabha: Kolkhas",
+    "3. Gram Panchayat: Semadoh",
+    "4. Nature of community rights recognised: Grazing and fishing in the village tank",
+    "5. Description of boundaries by customary landmarks:",
+    "Hill ridge to the north, river to the south",
+    "",
+    "Date of DLC decision: 18/07/2025",
+]
+
+ANNEXURE_IV_LINES = [
+    "ANNEXURE-IV",
+    "TITLE TO COMMUNITY FOREST RESOURCES",
+    "",
+    "1. Name of the claimant(s): Gram Sabha Raipur",
+    "2. Village/Gram Sabha: Raipur",
+    "3. Gram Panchayat: Raipur GP",
+    "4. Nature of community rights to protect and conserve: Community forest resource",
+    "5. Description of boundaries by customary landmarks:",
+    "Stream to the east, old boundary stones to the west",
+    "",
+    "Date of DLC decision: 30/06/2025",
+]
+
+# form -> (lines, fields extract_entities should find in them)
+FORMS: Dict[str, Tuple[List[str], Dict[str, str]]] = {
+    "Form A": (FORM_A_LINES, {"claimant_name": "Ram Singh", "village": "Bhilgaon", "district": "Amravati"}),
+    "Form B": (FORM_B_LINES, {"claimant_name": "Gram Sabha Kolkhas", "village": "Kolkhas", "district": "Amravati"}),
+    "Form C": (FORM_C_LINES, {"claimant_name": "Gram Sabha Raipur", "village": "Raipur", "district": "Amravati"}),
+    "Annexure-II": (ANNEXURE_II_LINES, {"village": "Bhilgaon", "district": "Amravati"}),
+    "Annexure-III": (ANNEXURE_III_LINES, {"claimant_name": "Gram Sabha Kolkhas", "village": "Kolkhas"}),
+    "Annexure-IV": (ANNEXURE_IV_LINES, {"claimant_name": "Gram Sabha Raipur", "village": "Raipur"}),
+}
+
+# Degradation presets for rasterised variants: (noise sigma, blur kernel, skew degrees)
+DEGRADATIONS: Dict[str, Tuple[float, int, float]] = {
+    "clean": (0.0, 0, 0.0),
+    "light": (6.0, 3, 0.8),
+    "heavy": (14.0, 5, 2.5),
+}
+DEFAULT_DPIS = (100, 150, 200, 300)
+
+
+def render_form_pdf(lines: List[str], filename: Optional[str] = None) -> bytes:
+    """Draw the lines on an A4 page; returns the PDF bytes (also written to filename)."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=A4)
     width, height = A4
 
     y = height - 50
     line_height = 20
 
-    lines = [
-        "FORM – A",
-        "CLAIM FORM FOR RIGHTS TO FOREST LAND",
-        "[See Rule 11(1)(a)]",
-        "",
-        "1. Name of the claimant(s): Ram Singh",
-        "2. Name of the spouse: Sita Devi",
-        "3. Name of father/mother: Mohan Singh",
-        "4. Address: Village Road, Bhilgaon",
-        "5. Village: Bhilgaon",
-        "6. Gram Panchayat: Bhilgaon GP",
-        "7. Tehsil/Taluka: Dharni",
-        "8. District: Amravati",
-        "9. State: Maharashtra",
-        "",
-        "9(a). Scheduled Tribe: Yes",
-        "9(b). Other Traditional Forest Dweller: No",
-        "Tribe name: Gond",
-        "",
-        "10. Area of land claimed: 3.5 hectares",
-        "Survey No: 45/2",
-        "",
-        "Claim status: Approved",
-        "Patta No: PATTA/2025/091",
-        "Date of DLC decision: 25/08/2025"
-    ]
-
     for line in lines:
         c.drawString(50, y, line)
         y -= line_height
@@ -42,7 +165,92 @@ def create_fra_pdf(filename):
     c.showPage()
     c.save()
 
+    data = buf.getvalue()
+    if filename:
+        with open(filename, "wb") as f:
+            f.write(data)
+    return data
+
+
+def create_fra_pdf(filename):
+    render_form_pdf(FORM_A_LINES, filename)
+
+
+# ---- Rasterised variants ----
+
+def degrade(img, noise: float = 0.0, blur: int = 0, skew: float = 0.0, seed: int = 0):
+    """Gaussian noise, box-ish blur and rotation on an RGB ndarray, like a poor scan."""
+    import cv2
+    import numpy as np
+
+    out = img
+    if skew:
+        h, w = out.shape[:2]
+        m = cv2.getRotationMatrix2D((w / 2, h / 2), skew, 1.0)
+        out = cv2.warpAffine(out, m, (w, h), flags=cv2.INTER_LINEAR,
+                             borderMode=cv2.BORDER_CONSTANT, borderValue=(255, 255, 255))
+    if blur:
+        out = cv2.GaussianBlur(out, (blur, blur), 0)
+    if noise:
+        rng = np.random.default_rng(seed)
+        out = np.clip(out.astype(np.float32) + rng.normal(0, noise, out.shape), 0, 255).astype(np.uint8)
+    return out
+
+
+def rasterize(pdf_bytes: bytes, dpi: int):
+    from ocr.ocr_engine import rasterize_pdf_page, to_numpy
+    return to_numpy(rasterize_pdf_page(pdf_bytes, 1, dpi))
+
+
+def generate_corpus(out_dir: str, forms: Optional[List[str]] = None,
+                    dpis=DEFAULT_DPIS, levels: Optional[List[str]] = None) -> List[Dict]:
+    """
+    Write each form as a PDF plus PNG scans for every dpi x degradation level,
+    and a manifest.json describing them (form, dpi, level, expected fields).
+    """
+    import cv2
+
+    os.makedirs(out_dir, exist_ok=True)
+    entries: List[Dict] = []
+    for form in forms or list(FORMS):
+        lines, expected = FORMS[form]
+        slug = form.lower().replace(" ", "_").replace("-", "_")
+        pdf_name = f"{slug}.pdf"
+        pdf_bytes = render_form_pdf(lines, os.path.join(out_dir, pdf_name))
+        entries.append({"file": pdf_name, "form": form, "kind": "pdf", "dpi": None,
+                        "level": None, "expected": expected})
+
+        for dpi in dpis:
+            page = rasterize(pdf_bytes, dpi)
+            for i, level in enumerate(levels or list(DEGRADATIONS)):
+                noise, blur, skew = DEGRADATIONS[level]
+                img = degrade(page, noise, blur, skew, seed=dpi * 10 + i)
+                name = f"{slug}_{dpi}dpi_{level}.png"
+                cv2.imwrite(os.path.join(out_dir, name), cv2.cvtColor(img, cv2.COLOR_RGB2BGR))
+                entries.append({"file": name, "form": form, "kind": "scan", "dpi": dpi,
+                                "level": level, "expected": expected})
+
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(entries, f, indent=2, ensure_ascii=False)
+    return entries
+
 
 if __name__ == "__main__":
-    create_fra_pdf("sample_docs/sample_fra.pdf")
-    print("✅ sample_fra.pdf created successfully!")
\ No newline at end of file
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--corpus", help="write the full synthetic corpus to this directory")
+    ap.add_argument("--forms", help="comma-separated subset of: " + ", ".join(FORMS))
+    ap.add_argument("--dpis", default=",".join(str(d) for d in DEFAULT_DPIS))
+    ap.add_argument("--levels", default=",".join(DEGRADATIONS))
+    args = ap.parse_args()
+
+    if args.corpus:
+        entries = generate_corpus(
+            args.corpus,
+            forms=args.forms.split(",") if args.forms else None,
+            dpis=[int(d) for d in args.dpis.split(",")],
+            levels=args.levels.split(","),
+        )
+        print(f"✅ {len(entries)} documents written to {args.corpus}")
+    else:
+        create_fra_pdf("sample_docs/sample_fra.pdf")
+        print("✅ sample_fra.pdf created successfully!")
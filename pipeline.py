@@ -0,0 +1,149 @@
+# pipeline.py
+from typing import Any, Dict, List, Optional
+
+from ocr.lines import OcrLine
+from ocr.ocr_engine import Source, iter_pages, join_page_lines, ocr_images, replay_schedule
+from extractors.entities import extract_entities, extract_records
+from extractors.ner_fallback import NER_FIELDS, missing_fields, ner_values
+from schemas.fra_schema import build_schema
+from utils.area_converter import parse_bigha_string
+from utils import metrics
+from utils.job_store import JobStore
+
+
+def _convert_area(entities: Dict[str, Any]) -> Dict[str, Any]:
+    # for Annexure-II area conversion, try to convert if raw bigha present
+    try:
+        if entities.get("area_claimed_raw") and not entities.get("area_claimed_ha"):
+            ha = parse_bigha_string(entities.get("area_claimed_raw"))
+            if ha:
+                entities["area_claimed_ha"] = ha
+    except Exception:
+        pass
+    return entities
+
+
+def process_text(raw_text: str, lines: Optional[List[OcrLine]] = None) -> Dict[str, Any]:
+    """
+    Entities + schema for already-extracted text. "entities"/"schema" describe
+    the document as a whole, as before; "records" holds one schema per form
+    found when the document is a bundle of several forms. With the OCR lines
+    (see join_page_lines), field values are looked up by layout first.
+    """
+    if not raw_text:
+        return {"raw_text": "", "entities": None, "schema": None, "records": []}
+
+    with metrics.span("extract_entities"):
+        entities = _convert_area(extract_entities(raw_text, lines))
+    with metrics.span("build_schema"):
+        schema = build_schema(entities)
+    with metrics.span("extract_records"):
+        records = [build_schema(_convert_area(e)) for e in extract_records(raw_text, lines)]
+
+    return {"raw_text": raw_text, "entities": entities, "schema": schema, "records": records}
+
+
+# schema section of each field, for patching NER values into built schemas
+_SECTION_OF = {k: section for section, fields in build_schema({}).items() for k in fields}
+
+
+def ner_missing(doc: Dict[str, Any]) -> List[str]:
+    """NER fields a result's schema lacks (none when there is no text to search)."""
+    if not doc.get("raw_text") or not doc.get("schema"):
+        return []
+    return missing_fields({f: doc["schema"][_SECTION_OF[f]].get(f) for f in NER_FIELDS})
+
+
+def fill_from_ner(docs: List[Dict[str, Any]]) -> int:
+    """
+    NER fallback over a batch of results ("raw_text", "schema", "records" and
+    optionally "entities", as from process_text or batch.process_file),
+    patched in place. Only documents whose schema lacks a NER field are sent,
+    all in one batch. Filled fields are listed in each doc's "ner_fields";
+    returns how many were filled.
+    """
+    todo = []
+    for doc in docs:
+        missing = ner_missing(doc)
+        if missing:
+            todo.append((doc, missing))
+    if not todo:
+        return 0
+    filled = 0
+    with metrics.span("ner_fallback"):
+        found = ner_values([(doc["raw_text"], missing) for doc, missing in todo])
+    for (doc, missing), values in zip(todo, found):
+        for field in missing:
+            metrics.count("ner_fallback_fields", field=field, result="filled" if field in values else "missed")
+        if not values:
+            continue
+        records = doc.get("records") or []
+        for field, value in values.items():
+            section = _SECTION_OF[field]
+            doc["schema"][section][field] = value
+            if doc.get("entities") is not None:
+                doc["entities"][field] = value
+            if len(records) == 1:  # a bundle's records come from other pages
+                records[0][section][field] = value
+        doc["ner_fields"] = sorted(values)
+        filled += len(values)
+    return filled
+
+
+def process_document(source: Source, debug: Optional[bool] = None,
+                     filename: Optional[str] = None) -> Dict[str, Any]:
+    """
+    OCR + entity extraction + schema for one file (a path, or its bytes with
+    the original filename as a format hint). Plain data in and out, so it can
+    run inside an OCR worker process. raw_text is empty when nothing was read;
+    "timings" carries the stage spans back to the caller for metrics.merge().
+    """
+    with metrics.collect() as trace:
+        result = process_text(*join_page_lines(iter_pages(source, debug=debug, filename=filename)))
+    result["timings"] = trace
+    return result
+
+
+def process_image(source: Source, debug: Optional[bool] = None,
+                  prefer: Optional[str] = None) -> Dict[str, Any]:
+    """
+    process_document() for a single image. `prefer` is the base variant of a
+    near-duplicate's result (see replay_schedule). "variant" is the variant
+    whose text was used, "base_variant" the whole-page variant behind it and
+    "replayed" whether `prefer` changed which variants ran.
+    """
+    schedule = replay_schedule(prefer) if prefer else None
+    with metrics.collect() as trace:
+        text, lines, variant, base = ocr_images([source], debug=debug, schedule=schedule)[0]
+        result = process_text(text, lines)
+    result["variant"] = variant
+    result["base_variant"] = base
+    result["replayed"] = schedule is not None
+    result["timings"] = trace
+    return result
+
+
+def process_job(db_path: str, job_id: str, file_path: str) -> metrics.Trace:
+    """
+    Worker-side body of an async job: records each page in the job store as it
+    finishes, then stores the final result (or the failure). Returns the job's
+    stage timings.
+    """
+    with metrics.collect() as trace:
+        _process_job(JobStore(db_path), job_id, file_path)
+    return trace
+
+
+def _process_job(store: JobStore, job_id: str, file_path: str) -> None:
+    try:
+        pages = []
+        for page in iter_pages(file_path):
+            pages.append(page)
+            store.add_page(job_id, *page[:3])
+        result = process_text(*join_page_lines(pages))
+        if not result["raw_text"]:
+            store.fail(job_id, "No text detected in file.")
+        else:
+            store.finish(job_id, result)
+    except Exception as e:
+        store.fail(job_id, f"{e.__class__.__name__}: {e}")
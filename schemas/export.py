@@ -0,0 +1,211 @@
+# schemas/export.py
+"""
+Streaming columnar export of extracted records.
+
+Every build_schema() record becomes one flat row with a fixed column layout
+(see COLUMNS), and rows are written as JSONL, CSV, Parquet or an Arrow IPC
+stream. Rows are written in chunks of chunk_rows. Each chunk is encoded as
+it arrives (one Parquet row group or Arrow record batch per chunk), so memory
+stays flat however many documents are exported.
+
+    python -m schemas.export results.jsonl -f parquet -o claims.parquet
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from schemas.fra_schema import build_schema
+
+try:  # Parquet / Arrow output only
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+SECTIONS = ("claimant_details", "location", "claim_information", "dates")
+# source: file path or job id; record: index of the form within that document
+META_COLUMNS = ["source", "record", "document_type"]
+COLUMNS: List[str] = META_COLUMNS + [k for s in SECTIONS for k in build_schema({})[s]]
+INT_COLUMNS = {"record"}
+FLOAT_COLUMNS = {"area_claimed", "area_claimed_ha"}
+
+FORMATS = {
+    "jsonl": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+CHUNK_ROWS = 5000
+
+
+# ---- Rows ----
+
+def _cell(column: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if column in FLOAT_COLUMNS:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    if column in INT_COLUMNS:
+        return int(value)
+    if isinstance(value, (list, tuple)):
+        return "; ".join(str(v) for v in value)
+    return str(value)
+
+
+def flatten_schema(schema: Dict[str, Any], source: Optional[str] = None, record: int = 0) -> Dict[str, Any]:
+    """One row in COLUMNS order; list values (holders) are joined with "; "."""
+    row = {"source": source, "record": record,
+           "document_type": (schema.get("document_metadata") or {}).get("document_type")}
+    for section in SECTIONS:
+        row.update((schema.get(section) or {}).items())
+    return {c: _cell(c, row.get(c)) for c in COLUMNS}
+
+
+def document_rows(source: str, result: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Rows for one document result: one per form record, else its whole-document schema."""
+    schemas = result.get("records") or ([result["schema"]] if result.get("schema") else [])
+    for i, schema in enumerate(schemas):
+        yield flatten_schema(schema, source, i)
+
+
+def iter_results_file(path: str) -> Iterator[Dict[str, Any]]:
+    """Rows for every successful document in a batch.py results file."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue  # torn last line from an interrupted run
+            if rec.get("status") == "ok":
+                yield from document_rows(rec["path"], rec)
+
+
+def _chunks(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    it = iter(rows)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ---- Writers (each yields encoded bytes, one piece per chunk) ----
+
+def iter_jsonl(rows: Iterable[Dict[str, Any]], chunk_rows: int = CHUNK_ROWS) -> Iterator[bytes]:
+    for chunk in _chunks(rows, chunk_rows):
+        yield "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in chunk).encode("utf-8")
+
+
+def iter_csv(rows: Iterable[Dict[str, Any]], chunk_rows: int = CHUNK_ROWS) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=COLUMNS)
+    writer.writeheader()
+    for chunk in _chunks(rows, chunk_rows):
+        writer.writerows(chunk)
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")  # header only: no rows
+
+
+class _Sink(io.RawIOBase):
+    """Write-only buffer that hands over what was written since the last take()."""
+
+    def __init__(self):
+        super().__init__()
+        self._parts: List[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._parts.append(bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def take(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def arrow_schema():
+    def col_type(c):
+        return pa.int32() if c in INT_COLUMNS else pa.float64() if c in FLOAT_COLUMNS else pa.string()
+    return pa.schema([(c, col_type(c)) for c in COLUMNS])
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("Parquet/Arrow export needs pyarrow (pip install pyarrow).")
+
+
+def _record_batch(chunk: List[Dict[str, Any]], schema):
+    return pa.RecordBatch.from_pydict({c: [r[c] for r in chunk] for c in COLUMNS}, schema=schema)
+
+
+def iter_parquet(rows: Iterable[Dict[str, Any]], chunk_rows: int = CHUNK_ROWS) -> Iterator[bytes]:
+    _require_pyarrow()
+    schema, sink = arrow_schema(), _Sink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema, compression="zstd")
+    try:
+        for chunk in _chunks(rows, chunk_rows):
+            writer.write_table(pa.Table.from_batches([_record_batch(chunk, schema)]), row_group_size=chunk_rows)
+            yield sink.take()
+    finally:
+        writer.close()  # footer
+    yield sink.take()
+
+
+def iter_arrow(rows: Iterable[Dict[str, Any]], chunk_rows: int = CHUNK_ROWS) -> Iterator[bytes]:
+    _require_pyarrow()
+    schema, sink = arrow_schema(), _Sink()
+    writer = pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), schema)
+    try:
+        for chunk in _chunks(rows, chunk_rows):
+            writer.write_batch(_record_batch(chunk, schema))
+            yield sink.take()
+    finally:
+        writer.close()  # end-of-stream marker
+    yield sink.take()
+
+
+WRITERS = {"jsonl": iter_jsonl, "csv": iter_csv, "parquet": iter_parquet, "arrow": iter_arrow}
+
+
+def export_rows(rows: Iterable[Dict[str, Any]], fmt: str, chunk_rows: int = CHUNK_ROWS) -> Iterator[bytes]:
+    if fmt not in WRITERS:
+        raise ValueError(f"Unsupported export format: {fmt} (choose from {', '.join(WRITERS)})")
+    if fmt in ("parquet", "arrow"):
+        _require_pyarrow()  # fail before the first chunk, not inside a response
+    return WRITERS[fmt](rows, chunk_rows)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("results", help="results JSONL written by batch.py")
+    ap.add_argument("-f", "--format", choices=list(WRITERS), default="csv")
+    ap.add_argument("-o", "--output", help="output file (stdout otherwise)")
+    ap.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows per chunk / row group")
+    args = ap.parse_args()
+
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for piece in export_rows(iter_results_file(args.results), args.format, args.chunk_rows):
+            out.write(piece)
+    finally:
+        if args.output:
+            out.close()
+            print(f"✅ Export written to {args.output}", file=sys.stderr)
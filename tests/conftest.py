@@ -0,0 +1,7 @@
+# tests/conftest.py
+# Modules import each other from the repo root (extractors.*, ocr.*, utils.*),
+# as when app.py or batch.py is run from there.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,85 @@
+# tests/test_batch_api.py
+import io
+import json
+import zipfile
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")  # fastapi.testclient
+app_module = pytest.importorskip("app")  # also needs the OCR stack
+from fastapi.testclient import TestClient
+
+from pdf_sample_gen import FORMS
+from pipeline import process_text
+from utils.result_cache import ResultCache
+
+FORM_A = "\n".join(FORMS["Form A"][0]).encode("utf-8")
+ANNEX_II = "\n".join(FORMS["Annexure-II"][0]).encode("utf-8")
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    async def run(fn, source, debug, filename):
+        # the uploaded "document" is its own OCR text
+        data = open(source, "rb").read() if isinstance(source, str) else source
+        if data == b"boom":
+            raise ValueError("unreadable scan")
+        result = process_text(data.decode("utf-8"))
+        result["timings"] = None
+        return result
+
+    monkeypatch.setattr(app_module.ocr_pool, "run", run)
+    monkeypatch.setattr(app_module, "result_cache", ResultCache())
+    monkeypatch.setattr(app_module, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(app_module, "NER_FALLBACK", False)
+    return TestClient(app_module.app)  # no `with`: startup would spawn the OCR pool
+
+
+def _post(client, files):
+    resp = client.post("/extract/batch", files=[("files", f) for f in files])
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    return sorted((json.loads(l) for l in resp.text.splitlines()), key=lambda l: l["index"])
+
+
+def test_ndjson_line_per_document(client):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as z:
+        z.writestr("claims/annex.pdf", ANNEX_II)
+        z.writestr("claims/notes.txt", b"not a document")
+        z.writestr("__MACOSX/._annex.pdf", b"")
+    lines = _post(client, [
+        ("form_a.pdf", FORM_A),
+        ("bundle.zip", archive.getvalue()),
+        ("blank.pdf", b""),
+        ("bad.pdf", b"boom"),
+    ])
+    assert [l["index"] for l in lines] == [0, 1, 2, 3, 4]
+    by_name = {l["filename"]: l for l in lines}
+
+    ok = by_name["form_a.pdf"]
+    assert set(ok) == {"index", "filename", "status", "form_type", "json", "records", "cache"}
+    assert (ok["status"], ok["form_type"]) == ("ok", "Form A")
+    assert ok["json"]["claimant_details"]["claimant_name"] == "Ram Singh"
+    assert len(ok["records"]) == 1
+    assert ok["cache"]["status"] == "miss" and len(ok["cache"]["key"]) == 64
+
+    assert by_name["bundle.zip/claims/annex.pdf"]["form_type"] == "Annexure-II"
+    assert by_name["bundle.zip/claims/notes.txt"]["status"] == "error"
+    assert by_name["blank.pdf"]["status"] == "empty"
+    bad = by_name["bad.pdf"]
+    assert set(bad) == {"index", "filename", "status", "error"}
+    assert bad["error"] == "ValueError: unreadable scan"
+
+
+def test_repeat_upload_is_a_cache_hit(client):
+    first = _post(client, [("a.pdf", FORM_A)])[0]
+    again = _post(client, [("copy.pdf", FORM_A)])[0]
+    assert again["cache"] == {"status": "hit", "key": first["cache"]["key"]}
+    assert again["json"] == first["json"]
+
+
+def test_rejects_bad_uploads(client):
+    resp = client.post("/extract/batch", files=[("files", ("x.zip", b"not a zip"))])
+    assert resp.status_code == 400
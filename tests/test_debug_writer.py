@@ -0,0 +1,42 @@
+# tests/test_debug_writer.py
+import queue
+import threading
+
+import pytest
+
+from ocr import debug_writer
+from utils import metrics
+
+
+@pytest.fixture
+def writer(tmp_path, monkeypatch):
+    monkeypatch.setattr(debug_writer, "DEBUG_DIR", str(tmp_path))
+    monkeypatch.setattr(debug_writer, "_queue", queue.Queue(maxsize=1))
+    monkeypatch.setattr(debug_writer, "_thread", None)
+    return tmp_path
+
+
+def test_flush_writes_queued_artifacts(writer):
+    path = debug_writer.submit("dump.txt", lambda: b"text")
+    assert path == str(writer / "dump.txt")
+    debug_writer.flush()
+    assert (writer / "dump.txt").read_bytes() == b"text"
+
+
+def test_full_queue_drops_and_counts(writer):
+    started, release = threading.Event(), threading.Event()
+
+    def slow() -> bytes:
+        started.set()
+        release.wait(5)
+        return b"slow"
+
+    assert debug_writer.submit("slow.txt", slow)
+    started.wait(5)  # the writer is busy with slow.txt
+    assert debug_writer.submit("queued.txt", lambda: b"q")
+    with metrics.collect() as trace:
+        assert debug_writer.submit("dropped.txt", lambda: b"d") is None
+    assert trace["counts"] == [("debug_artifacts_dropped", (), 1)]
+    release.set()
+    debug_writer.flush()
+    assert sorted(p.name for p in writer.iterdir()) == ["queued.txt", "slow.txt"]
@@ -0,0 +1,29 @@
+# tests/test_deskew.py
+import pytest
+
+ocr_engine = pytest.importorskip("ocr.ocr_engine")  # needs numpy, cv2, pdfplumber, ...
+np, cv2 = ocr_engine.np, ocr_engine.cv2
+estimate_skew = ocr_engine.estimate_skew
+
+
+def _ruled_page(angle: float) -> "np.ndarray":
+    page = np.full((600, 800), 255, dtype=np.uint8)
+    for y in range(60, 560, 40):
+        page[y:y + 8, 80:720] = 0
+    m = cv2.getRotationMatrix2D((400, 300), angle, 1.0)
+    return cv2.warpAffine(page, m, (800, 600), flags=cv2.INTER_NEAREST, borderValue=255)
+
+
+@pytest.mark.parametrize("value", [0, 255])
+def test_blank_page_is_not_rotated(value):
+    assert estimate_skew(np.full((300, 400), value, dtype=np.uint8)) == 0.0
+
+
+def test_straight_page_stays_straight():
+    assert estimate_skew(_ruled_page(0.0)) == 0.0
+
+
+def test_skew_is_undone_within_range():
+    assert abs(estimate_skew(_ruled_page(3.0)) + 3.0) <= 0.3
+    # past max_angle the search stops at the edge of the range
+    assert -2.0 <= estimate_skew(_ruled_page(4.0), max_angle=2.0) <= 2.0
@@ -0,0 +1,67 @@
+# tests/test_export.py
+import csv
+import io
+import json
+
+import pytest
+
+from schemas.export import COLUMNS, document_rows, export_rows, flatten_schema
+from schemas.fra_schema import build_schema
+
+ENTITIES = [
+    {"form_type": "Form A", "claimant_name": "राम सिंह", "holders": ["Ram", "Sita"],
+     "village": "Bhilgaon", "area_claimed": "3.5", "area_claimed_ha": 3.5},
+    {"form_type": "Form B", "village": "Kanhan, \"East\"", "area_claimed": "about 2"},
+    {},
+]
+
+
+def _rows():
+    result = {"schema": None, "records": [build_schema(e) for e in ENTITIES]}
+    return list(document_rows("bundle.pdf", result))
+
+
+def _export(fmt: str) -> bytes:
+    # two rows per chunk: the last chunk is a partial one
+    return b"".join(export_rows(_rows(), fmt, chunk_rows=2))
+
+
+def test_flatten_schema():
+    row = flatten_schema(build_schema(ENTITIES[1]), "b.png", 3)
+    assert list(row) == COLUMNS
+    assert (row["source"], row["record"], row["document_type"]) == ("b.png", 3, "Form B")
+    assert row["area_claimed"] is None  # not a number
+    rows = _rows()
+    assert [r["record"] for r in rows] == [0, 1, 2]
+    assert rows[0]["holders"] == "Ram; Sita" and rows[0]["area_claimed"] == 3.5
+
+
+def test_jsonl_round_trip():
+    lines = _export("jsonl").decode("utf-8").splitlines()
+    assert [json.loads(l) for l in lines] == _rows()
+
+
+def test_csv_round_trip():
+    parsed = list(csv.DictReader(io.StringIO(_export("csv").decode("utf-8"))))
+    expected = [{c: "" if v is None else str(v) for c, v in r.items()} for r in _rows()]
+    assert parsed == expected
+    assert b"".join(export_rows([], "csv")).decode("utf-8").strip() == ",".join(COLUMNS)
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_columnar_round_trip(fmt):
+    pa = pytest.importorskip("pyarrow")
+    data = pa.BufferReader(_export(fmt))
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        table = pq.read_table(data)
+        assert pq.ParquetFile(pa.BufferReader(_export(fmt))).num_row_groups == 2
+    else:
+        table = pa.ipc.open_stream(data).read_all()
+    assert table.column_names == COLUMNS
+    assert table.to_pylist() == _rows()
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        export_rows(_rows(), "xlsx")
@@ -0,0 +1,76 @@
+# tests/test_extractors.py
+import pytest
+
+from extractors.entities import detect_form_type, extract_entities, extract_records
+from extractors.field_scanner import scan_fields
+from extractors.ner_fallback import label_window
+from ocr.lines import OcrLine
+from pdf_sample_gen import FORMS
+
+
+def _text(form: str) -> str:
+    return "\n".join(FORMS[form][0])
+
+
+def _lines(form: str, page: int = 0):
+    # one box per line, laid out as render_form_pdf draws them
+    return [OcrLine((50.0, 50.0 + 20 * i, 50.0 + 6 * len(t), 62.0 + 20 * i), t, 1.0, order=i, row=i, page=page)
+            for i, t in enumerate(FORMS[form][0]) if t]
+
+
+@pytest.mark.parametrize("form", list(FORMS))
+def test_scan_fields_finds_expected_values(form):
+    fields = scan_fields(_text(form))
+    for name, value in FORMS[form][1].items():
+        assert fields[name] == value
+
+
+@pytest.mark.parametrize("form", list(FORMS))
+def test_extract_entities_on_each_form(form):
+    assert detect_form_type(_text(form)) == form
+    entities = extract_entities(_text(form))
+    for name, value in FORMS[form][1].items():
+        assert entities[name] == value
+
+
+@pytest.mark.parametrize("form", list(FORMS))
+def test_layout_lines_agree_with_text(form):
+    entities = extract_entities(_text(form), _lines(form))
+    for name, value in FORMS[form][1].items():
+        assert entities[name] == value
+
+
+def test_values_under_their_labels_in_columns():
+    # labels in one row, values in the row under them: flattened by rows,
+    # the text scanner cannot pair them up
+    lines = [
+        OcrLine((50, 50, 120, 62), "5. Village:", 1.0, order=0, row=0),
+        OcrLine((300, 50, 380, 62), "8. District:", 1.0, order=1, row=0),
+        OcrLine((50, 70, 110, 82), "Bhilgaon", 1.0, order=2, row=1),
+        OcrLine((300, 70, 370, 82), "Amravati", 1.0, order=3, row=1),
+    ]
+    text = "FORM – A\n5. Village: 8. District:\nBhilgaon Amravati"
+    assert extract_entities(text)["village"] != "Bhilgaon"
+    entities = extract_entities(text, lines)
+    assert (entities["village"], entities["district"]) == ("Bhilgaon", "Amravati")
+
+
+def test_bundle_splits_into_records():
+    text = "\n\f\n".join([_text("Form A"), _text("Annexure-II")])
+    lines = _lines("Form A", page=0) + _lines("Annexure-II", page=1)
+    records = extract_records(text, lines)
+    assert [r["form_type"] for r in records] == ["Form A", "Annexure-II"]
+    assert records[0]["claimant_name"] == "Ram Singh"
+    assert records[1]["village"] == "Bhilgaon"
+
+
+@pytest.mark.parametrize("text", ["Distance to forest: 2 km near Nagpur",
+                                  "Distribution of land: Amravati", "distinct plots in Wardha"])
+def test_ner_district_label_needs_whole_word(text):
+    assert label_window(text, "district") is None
+
+
+@pytest.mark.parametrize("text", ["District: Amravati", "Dist. Amravati"])
+def test_ner_district_label(text):
+    window, label_len = label_window(text, "district")
+    assert window.startswith(text[:label_len]) and "Amravati" in window[label_len:]
@@ -0,0 +1,75 @@
+# tests/test_job_store.py
+import time
+
+from utils.job_store import DONE, FAILED, QUEUED, RUNNING, JobStore
+
+
+def test_job_lifecycle(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job_id = store.create("claim.pdf", "/uploads/claim.pdf")
+    assert store.get(job_id)["status"] == QUEUED
+
+    job = store.claim_next()
+    assert (job["id"], job["status"]) == (job_id, RUNNING)
+    assert store.claim_next() is None  # nothing else queued
+
+    store.add_page(job_id, 1, 2, "page two")
+    store.add_page(job_id, 0, 2, "page one")
+    job = store.get(job_id, with_pages=True)
+    assert (job["pages_done"], job["pages_total"]) == (2, 2)
+    assert job["pages"] == ["page one", "page two"]
+
+    result = {"form_type": "Form A", "json": {"location": {"village": "Bhilgaon"}}}
+    store.finish(job_id, result)
+    job = store.get(job_id)
+    assert job["status"] == DONE and job["result"] == result
+    assert store.get("missing") is None
+
+
+def test_claim_order_and_statuses(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    first = store.create("a.pdf", "a")
+    second = store.create("b.pdf", "b")
+    assert store.claim_next()["id"] == first
+    assert store.fail(first, "boom")
+    assert not store.fail(second, "boom")  # only running jobs fail
+    assert store.statuses([first, second, "missing"]) == {first: FAILED, second: QUEUED}
+    assert store.get(first)["error"] == "boom"
+
+
+def test_late_finish_keeps_failure(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job_id = store.create("a.pdf", "a")
+    store.claim_next()
+    assert store.fail(job_id, "Job timed out.")
+    # the timed-out worker finishes afterwards
+    assert not store.finish(job_id, {"form_type": "Form A"})
+    job = store.get(job_id)
+    assert (job["status"], job["result"], job["error"]) == (FAILED, None, "Job timed out.")
+
+
+def test_requeue_interrupted_drops_partial_pages(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    store = JobStore(path)
+    job_id = store.create("a.pdf", "a")
+    store.claim_next()
+    store.add_page(job_id, 0, 3, "partial")
+
+    # a restarted process sees the same database
+    restarted = JobStore(path)
+    assert restarted.requeue_interrupted() == 1
+    job = restarted.get(job_id, with_pages=True)
+    assert (job["status"], job["pages_done"], job["pages"]) == (QUEUED, 0, [])
+
+
+def test_purge_expired(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job_id = store.create("a.pdf", "/uploads/a.pdf")
+    store.claim_next()
+    store.finish(job_id, {})
+    queued = store.create("b.pdf", "/uploads/b.pdf")
+    assert store.purge_expired(3600) == []
+    time.sleep(0.01)
+    assert store.purge_expired(0) == ["/uploads/a.pdf"]  # unfinished jobs stay
+    assert store.get(job_id) is None
+    assert store.get(queued)["status"] == QUEUED
@@ -0,0 +1,58 @@
+# tests/test_metrics.py
+import pytest
+
+from utils import metrics
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_trace_collects_and_server_timing():
+    with metrics.collect() as trace:
+        metrics.observe("ocr_once.bin", 0.25)
+        metrics.observe("ocr_once.bin", 0.5)
+        metrics.observe("extract_entities", 0.002)
+        metrics.count("ocr_variant_selected", variant="bin")
+    assert trace["spans"] == [("ocr_once.bin", 0.25), ("ocr_once.bin", 0.5), ("extract_entities", 0.002)]
+    assert trace["counts"] == [("ocr_variant_selected", (("variant", "bin"),), 1)]
+    # one entry per stage, totals in milliseconds
+    assert metrics.server_timing(trace) == "ocr_once.bin;dur=750.0, extract_entities;dur=2.0"
+    assert "fra_stage_seconds_count" not in metrics.render()  # nothing reached the registry
+
+
+def test_merge_nested_trace_into_outer():
+    with metrics.collect() as outer:
+        with metrics.collect() as inner:  # e.g. a worker's trace
+            metrics.observe("upload", 0.1)
+        assert outer["spans"] == []
+        metrics.merge(inner)
+        metrics.merge(None)
+    assert outer["spans"] == [("upload", 0.1)]
+
+
+def test_render_prometheus_text():
+    metrics.observe("ocr_once.bin", 0.003)
+    metrics.observe("ocr_once.bin", 200.0)  # beyond the last bucket
+    metrics.count("ocr_variant_runs", variant="bin")
+    metrics.count("ocr_variant_runs", 2, variant="bin")
+    extra = metrics.metric_lines("fra_near_duplicate_items", "gauge", "Images in the index.",
+                                 [((("path", 'a"b\\c'),), 3)])
+    lines = metrics.render(extra).splitlines()
+
+    labels = 'stage="ocr_once",variant="bin"'
+    assert "# TYPE fra_stage_seconds histogram" in lines
+    assert f'fra_stage_seconds_bucket{{{labels},le="0.001"}} 0' in lines
+    assert f'fra_stage_seconds_bucket{{{labels},le="0.005"}} 1' in lines
+    assert f'fra_stage_seconds_bucket{{{labels},le="120.0"}} 1' in lines  # cumulative
+    assert f'fra_stage_seconds_bucket{{{labels},le="+Inf"}} 2' in lines
+    assert f"fra_stage_seconds_sum{{{labels}}} 200.003000" in lines
+    assert f"fra_stage_seconds_count{{{labels}}} 2" in lines
+    assert "# TYPE fra_ocr_variant_runs_total counter" in lines
+    assert 'fra_ocr_variant_runs_total{variant="bin"} 3' in lines
+    assert lines[-3:] == ["# HELP fra_near_duplicate_items Images in the index.",
+                          "# TYPE fra_near_duplicate_items gauge",
+                          'fra_near_duplicate_items{path="a\\"b\\\\c"} 3']
@@ -0,0 +1,55 @@
+# tests/test_near_duplicates.py
+from utils.near_duplicates import HASH_BITS, NearDuplicateIndex, _band_spans, hamming
+
+PHASH = 0x9F3C_5A71_E2B8_064D
+DHASH = 0x1234_5678_9ABC_DEF0
+
+
+def _flip(value: int, *bits: int) -> int:
+    for b in bits:
+        value ^= 1 << b
+    return value
+
+
+def test_bands_cover_every_bit_once():
+    for bands in (1, 5, 7, 65):
+        spans = _band_spans(bands)
+        covered = [shift + i for shift, mask in spans for i in range(mask.bit_length())]
+        assert sorted(covered) == list(range(HASH_BITS))
+
+
+def test_match_within_distance_across_bands():
+    index = NearDuplicateIndex(max_distance=4)
+    index.add(PHASH, DHASH, "key-a", "bin")
+    # one flipped bit in each of four of the five 13/12-bit bands
+    near = _flip(PHASH, 0, 14, 30, 63)
+    assert hamming(near, PHASH) == 4
+    match = index.lookup(near, _flip(DHASH, 5, 40))
+    assert match is not None
+    assert (match.key, match.variant, match.distance) == ("key-a", "bin", 4)
+
+    assert index.lookup(_flip(PHASH, 0, 14, 30, 50, 63), DHASH) is None  # pHash too far
+    assert index.lookup(PHASH, _flip(DHASH, 1, 2, 3, 4, 5)) is None     # dHash too far
+    assert index.lookup(~PHASH & (2 ** HASH_BITS - 1), DHASH) is None
+
+
+def test_closest_entry_wins():
+    index = NearDuplicateIndex(max_distance=4)
+    index.add(_flip(PHASH, 1, 2, 3), DHASH, "far", "orig")
+    index.add(_flip(PHASH, 1), DHASH, "close", "ada")
+    assert index.lookup(PHASH, DHASH).key == "close"
+    assert index.lookup(_flip(PHASH, 1, 2, 3), DHASH).key == "far"
+
+
+def test_eviction_and_clear():
+    index = NearDuplicateIndex(max_items=2, max_distance=4)
+    hashes = [PHASH, _flip(PHASH, *range(0, 64, 2)), _flip(PHASH, *range(1, 64, 2))]
+    index.add(hashes[0], DHASH, "k0", None)
+    index.add(hashes[1], DHASH, "k1", None)
+    assert index.lookup(hashes[0], DHASH).key == "k0"  # k0 is now the most recent
+    index.add(hashes[2], DHASH, "k2", None)
+    assert len(index) == 2
+    assert index.lookup(hashes[1], DHASH) is None
+    assert index.lookup(hashes[0], DHASH).key == "k0"
+    assert index.clear() == 2
+    assert len(index) == 0 and index.lookup(hashes[0], DHASH) is None
@@ -0,0 +1,67 @@
+# tests/test_preprocess_graph.py
+import pytest
+
+ocr_engine = pytest.importorskip("ocr.ocr_engine")  # needs numpy, cv2, pdfplumber, ...
+np, cv2 = ocr_engine.np, ocr_engine.cv2
+PreprocessGraph, as_rgb = ocr_engine.PreprocessGraph, ocr_engine.as_rgb
+pp_unsharp, pp_upscale = ocr_engine.pp_unsharp, ocr_engine.pp_upscale
+
+
+def _page() -> "np.ndarray":
+    rng = np.random.default_rng(7)
+    page = np.full((160, 240, 3), 235, dtype=np.uint8)
+    cv2.putText(page, "Village: Bhilgaon", (8, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (20, 20, 60), 2)
+    cv2.putText(page, "Khasra 112/3", (8, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (40, 40, 40), 2)
+    noise = rng.integers(-25, 25, page.shape)
+    return np.clip(page.astype(int) + noise, 0, 255).astype(np.uint8)
+
+
+# the per-variant builders from before the graph: each variant from scratch, RGB throughout
+def _old_bin(img):
+    _, th = cv2.threshold(cv2.cvtColor(img, cv2.COLOR_RGB2GRAY), 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return cv2.cvtColor(th, cv2.COLOR_GRAY2RGB)
+
+
+def _old_ada(img):
+    th = cv2.adaptiveThreshold(cv2.cvtColor(img, cv2.COLOR_RGB2GRAY), 255,
+                               cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 9)
+    return cv2.cvtColor(th, cv2.COLOR_GRAY2RGB)
+
+
+OLD_BUILDERS = {
+    "orig": lambda im: im,
+    "sharp": pp_unsharp,
+    "bin": _old_bin,
+    "ada": _old_ada,
+    "orig_1p5": lambda im: pp_upscale(im, 1.5),
+    "bin_1p5": lambda im: _old_bin(pp_upscale(im, 1.5)),
+    "ada_1p5": lambda im: _old_ada(pp_upscale(im, 1.5)),
+    "orig_2x": lambda im: pp_upscale(im, 2.0),
+    "bin_2x": lambda im: _old_bin(pp_upscale(im, 2.0)),
+    "ada_2x": lambda im: _old_ada(pp_upscale(im, 2.0)),
+}
+
+
+def test_variants_match_direct_preprocessing():
+    assert set(OLD_BUILDERS) == set(ocr_engine.VARIANT_NODES)
+    base = _page()
+    graph = PreprocessGraph(base)
+    for tag, build in OLD_BUILDERS.items():
+        np.testing.assert_array_equal(as_rgb(graph.variant(tag)), build(base), err_msg=tag)
+
+
+def test_release_after_last_consumer():
+    base = _page()
+    order = ["bin", "ada", "bin_2x", "orig"]
+    graph = PreprocessGraph(base, order)
+    live = []
+    for step, tag in enumerate(order):
+        graph.variant(tag)
+        graph.release(step)
+        live.append(set(graph._memo))
+    rgb, gray1 = ("rgb", 1.0), ("gray", 1.0)
+    assert live[0] == {rgb, gray1}               # bin@1 done; gray@1 still feeds ada and gray@2
+    assert live[1] == {rgb, gray1}               # ada@1 done
+    assert live[2] == {rgb}                      # gray@1, gray@2 and bin@2 all done
+    assert live[3] == {rgb}                      # the page itself is never released
+    assert graph.get(rgb) is base
@@ -0,0 +1,67 @@
+# tests/test_result_cache.py
+import hashlib
+
+from utils.result_cache import ResultCache, cache_key
+
+
+def _key(data: bytes, *versions: str) -> str:
+    return cache_key(hashlib.sha256(data).hexdigest(), *versions)
+
+
+def test_cache_key_depends_on_content_and_versions():
+    key = _key(b"scan", "ocr-1", "ext-1")
+    assert len(key) == 64
+    assert key == _key(b"scan", "ocr-1", "ext-1")
+    assert key != _key(b"scan2", "ocr-1", "ext-1")
+    assert key != _key(b"scan", "ocr-2", "ext-1")
+
+
+def test_memory_round_trip_and_lru():
+    cache = ResultCache(max_items=2)
+    a, b, c = (_key(x) for x in (b"a", b"b", b"c"))
+    cache.put(a, {"form_type": "Form A"})
+    cache.put(b, {"form_type": "Form B"})
+    assert cache.get(a) == {"form_type": "Form A"}  # a is now the most recent
+    cache.put(c, {"form_type": "Form C"})
+    assert cache.get(b) is None
+    assert cache.get(a) is not None and cache.get(c) is not None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["memory_items"]) == (3, 1, 2)
+
+
+def test_disk_round_trip(tmp_path):
+    key = _key(b"scan")
+    value = {"json": {"claimant_details": {"claimant_name": "राम सिंह"}}, "records": []}
+    ResultCache(disk_dir=str(tmp_path)).put(key, value)
+    # a fresh cache (new process) finds the entry on disk
+    fresh = ResultCache(disk_dir=str(tmp_path))
+    assert fresh.get(key) == value
+    assert fresh.invalidate(key)
+    assert fresh.get(key) is None
+    assert not fresh.invalidate("../not-a-key")
+
+
+def test_disk_budget_evicts_oldest(tmp_path):
+    cache = ResultCache(max_items=1, disk_dir=str(tmp_path), disk_max_bytes=250)
+    keys = [_key(bytes([i])) for i in range(4)]
+    for k in keys:
+        cache.put(k, {"text": "x" * 100})
+    on_disk = {p.stem for p in tmp_path.glob("*.json")}
+    assert keys[-1] in on_disk and keys[0] not in on_disk
+    assert sum(p.stat().st_size for p in tmp_path.glob("*.json")) <= 250
+    assert cache.clear() == len(on_disk | {keys[-1]})
+    assert not list(tmp_path.glob("*.json"))
+
+
+def test_disk_files_removed_by_another_process(tmp_path):
+    cache = ResultCache(max_items=1, disk_dir=str(tmp_path), disk_max_bytes=250)
+    a, b, c = (_key(x) for x in (b"a", b"b", b"c"))
+    cache.put(a, {"text": "x" * 100})
+    cache.put(b, {"text": "x" * 100})
+    # a process sharing the directory evicts both behind this one's back
+    for p in tmp_path.glob("*.json"):
+        p.unlink()
+    assert not cache.invalidate(a)  # only b is still in memory
+    cache.put(c, {"text": "x" * 100})  # trims without tripping over the missing files
+    assert [p.stem for p in tmp_path.glob("*.json")] == [c]
+    assert cache.stats()["disk_bytes"] == (tmp_path / f"{c}.json").stat().st_size
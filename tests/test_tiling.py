@@ -0,0 +1,43 @@
+# tests/test_tiling.py
+import math
+
+import pytest
+
+ocr_engine = pytest.importorskip("ocr.ocr_engine")  # needs numpy, cv2, pdfplumber, ...
+_tile_spans, plan_tiles = ocr_engine._tile_spans, ocr_engine.plan_tiles
+
+
+def _check(spans, n, size, overlap):
+    assert spans[0][0] == 0 and spans[-1][1] == n
+    assert all(0 < b - a <= size for a, b in spans)
+    assert all(a[1] - b[0] == overlap for a, b in zip(spans, spans[1:]))
+
+
+@pytest.mark.parametrize("n", [1, 1535, 1536])
+def test_page_within_one_tile(n):
+    assert _tile_spans(n, 1536, 192) == [(0, n)]
+
+
+@pytest.mark.parametrize("n", [1537, 2880, 2881, 3000, 10_000, 65_535])
+def test_fewest_even_tiles_with_exact_overlap(n):
+    spans = _tile_spans(n, 1536, 192)
+    assert len(spans) == math.ceil((n - 192) / (1536 - 192))
+    _check(spans, n, 1536, 192)
+    lengths = [b - a for a, b in spans]
+    assert max(lengths) - min(lengths) <= 1
+
+
+def test_just_over_one_tile_is_two_halves():
+    # not (0, 1536) + (1, 1537): tiles that are almost the same page region
+    assert _tile_spans(1537, 1536, 192) == [(0, 864), (672, 1537)]
+
+
+def test_overlap_not_below_tile_size():
+    spans = _tile_spans(100, 10, 20)
+    _check(spans, 100, 10, 9)
+
+
+def test_plan_tiles_columns_only_past_max_width():
+    tiles = plan_tiles(5000, 3000, tile_h=1536, max_w=4096, overlap=192)
+    assert {(x0, x1) for x0, _, x1, _ in tiles} == {(0, 3000)}
+    assert len(plan_tiles(5000, 5000, tile_h=1536, max_w=4096, overlap=192)) == 4 * 2
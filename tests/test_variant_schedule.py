@@ -0,0 +1,53 @@
+# tests/test_variant_schedule.py
+import pytest
+
+ocr_engine = pytest.importorskip("ocr.ocr_engine")  # needs numpy, cv2, pdfplumber, ...
+VARIANT_SPECS = ocr_engine.VARIANT_SPECS
+
+
+@pytest.fixture(autouse=True)
+def no_history(monkeypatch):
+    monkeypatch.setattr(ocr_engine, "_variant_stats", {spec[0]: [0, 0] for spec in VARIANT_SPECS})
+
+
+def _tags(schedule):
+    return [spec[0] for spec in schedule]
+
+
+def test_cheapest_first_without_history():
+    assert _tags(ocr_engine.schedule_variants()) == _tags(sorted(VARIANT_SPECS, key=lambda s: s[2]))
+    assert _tags(ocr_engine.schedule_variants())[0] == "orig"
+
+
+def test_winning_variant_moves_forward():
+    for _ in range(3):
+        ocr_engine.record_variant_result(["orig", "sharp", "bin", "ada"], "ada")
+    order = _tags(ocr_engine.schedule_variants())
+    assert order[0] == "ada"
+    # ran three times without a win: now behind the untried upscaled variants
+    assert order.index("orig") > order.index("orig_1p5")
+    ocr_engine.record_variant_result(["orig"], None)  # nothing selected: runs only
+    assert ocr_engine._variant_stats["orig"] == [0, 4]
+
+
+def test_page_schedule_leaves_upscaling_to_roi(monkeypatch):
+    monkeypatch.setattr(ocr_engine, "ROI_UPSCALE", True)
+    assert _tags(ocr_engine.page_schedule()) == ["orig", "sharp", "bin", "ada"]
+    monkeypatch.setattr(ocr_engine, "ROI_UPSCALE", False)
+    assert len(ocr_engine.page_schedule()) == len(VARIANT_SPECS)
+
+
+def test_replay_schedule(monkeypatch):
+    monkeypatch.setattr(ocr_engine, "ROI_UPSCALE", True)
+    assert _tags(ocr_engine.replay_schedule("bin")) == ["bin"]
+    assert ocr_engine.replay_schedule("roi") is None
+    assert ocr_engine.replay_schedule("bin_2x") is None  # not a page variant with ROI upscaling
+    monkeypatch.setattr(ocr_engine, "ROI_UPSCALE", False)
+    assert _tags(ocr_engine.replay_schedule("bin_2x"))[0] == "bin_2x"
+    assert ocr_engine.replay_schedule("orig") is None  # runs first anyway
+
+
+def test_quality_bar():
+    assert ocr_engine.meets_quality_bar(0.9, 250, min_conf=0.85, min_chars=200)
+    assert not ocr_engine.meets_quality_bar(0.8, 250, min_conf=0.85, min_chars=200)
+    assert not ocr_engine.meets_quality_bar(0.9, 199, min_conf=0.85, min_chars=200)
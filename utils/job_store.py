@@ -0,0 +1,166 @@
+# utils/job_store.py
+"""
+SQLite-backed store for asynchronous extraction jobs.
+
+Every call opens its own short-lived connection, so the API process and the
+OCR worker processes can all read and write the same database file (WAL mode).
+"""
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    filename TEXT,
+    file_path TEXT,
+    status TEXT NOT NULL,
+    pages_done INTEGER NOT NULL DEFAULT 0,
+    pages_total INTEGER,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS job_pages (
+    job_id TEXT NOT NULL,
+    page_index INTEGER NOT NULL,
+    text TEXT,
+    PRIMARY KEY (job_id, page_index)
+);
+"""
+
+# queued -> running -> done | failed
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class JobStore:
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # autocommit; claim_next() opens its own transaction
+        con = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        con.row_factory = sqlite3.Row
+        try:
+            yield con
+        finally:
+            con.close()
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def create(self, filename: str, file_path: str) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as con:
+            con.execute(
+                "INSERT INTO jobs (id, filename, file_path, status, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, filename, file_path, QUEUED, now, now),
+            )
+        return job_id
+
+    def get(self, job_id: str, with_pages: bool = False) -> Optional[Dict[str, Any]]:
+        with self._connect() as con:
+            row = con.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = self._row(row)
+            if with_pages:
+                job["pages"] = [
+                    r["text"] for r in con.execute(
+                        "SELECT text FROM job_pages WHERE job_id = ? ORDER BY page_index", (job_id,))
+                ]
+        return job
+
+    def statuses(self, job_ids: List[str]) -> Dict[str, str]:
+        """Status of each known job among job_ids, without loading results."""
+        with self._connect() as con:
+            out: Dict[str, str] = {}
+            for i in range(0, len(job_ids), 500):  # stay under SQLite's variable limit
+                part = job_ids[i:i + 500]
+                out.update((r["id"], r["status"]) for r in con.execute(
+                    f"SELECT id, status FROM jobs WHERE id IN ({','.join('?' * len(part))})", part))
+        return out
+
+    def claim_next(self) -> Optional[Dict[str, Any]]:
+        """Atomically move the oldest queued job to running and return it."""
+        with self._connect() as con:
+            con.execute("BEGIN IMMEDIATE")
+            row = con.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is not None:
+                con.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?",
+                            (RUNNING, time.time(), row["id"]))
+            con.execute("COMMIT")
+        if row is None:
+            return None
+        job = self._row(row)
+        job["status"] = RUNNING
+        return job
+
+    def release(self, job_id: str) -> None:
+        """Put a claimed job back in the queue and drop its partial pages."""
+        with self._connect() as con:
+            con.execute("DELETE FROM job_pages WHERE job_id = ?", (job_id,))
+            con.execute("UPDATE jobs SET status = ?, pages_done = 0, updated_at = ? WHERE id = ?",
+                        (QUEUED, time.time(), job_id))
+
+    def add_page(self, job_id: str, page_index: int, pages_total: int, text: str) -> None:
+        with self._connect() as con:
+            con.execute("INSERT OR REPLACE INTO job_pages (job_id, page_index, text) VALUES (?, ?, ?)",
+                        (job_id, page_index, text))
+            con.execute(
+                "UPDATE jobs SET pages_total = ?, updated_at = ?,"
+                " pages_done = (SELECT COUNT(*) FROM job_pages WHERE job_id = ?) WHERE id = ?",
+                (pages_total, time.time(), job_id, job_id),
+            )
+
+    # finish() and fail() only move a running job: a worker that outlives its
+    # job's timeout cannot turn the FAILED it was given back into DONE
+    def finish(self, job_id: str, result: Dict[str, Any]) -> bool:
+        with self._connect() as con:
+            cur = con.execute(
+                "UPDATE jobs SET status = ?, result = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (DONE, json.dumps(result, ensure_ascii=False), time.time(), job_id, RUNNING))
+        return cur.rowcount > 0
+
+    def fail(self, job_id: str, error: str) -> bool:
+        with self._connect() as con:
+            cur = con.execute("UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ? AND status = ?",
+                              (FAILED, error, time.time(), job_id, RUNNING))
+        return cur.rowcount > 0
+
+    def requeue_interrupted(self) -> int:
+        """After a restart, jobs left running have no worker any more: queue them again."""
+        with self._connect() as con:
+            ids = [r["id"] for r in con.execute("SELECT id FROM jobs WHERE status = ?", (RUNNING,))]
+        for job_id in ids:
+            self.release(job_id)
+        return len(ids)
+
+    def purge_expired(self, ttl_seconds: float) -> List[str]:
+        """Delete finished jobs older than the TTL; returns their file paths."""
+        cutoff = time.time() - ttl_seconds
+        with self._connect() as con:
+            rows = con.execute("SELECT id, file_path FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                               (DONE, FAILED, cutoff)).fetchall()
+            for r in rows:
+                con.execute("DELETE FROM job_pages WHERE job_id = ?", (r["id"],))
+                con.execute("DELETE FROM jobs WHERE id = ?", (r["id"],))
+        return [r["file_path"] for r in rows if r["file_path"]]
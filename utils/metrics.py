@@ -0,0 +1,197 @@
+# utils/metrics.py
+"""
+Per-stage timing spans and Prometheus text exposition.
+
+    with span("extract_entities"): ...
+    @timed("pp_binary")
+    count("ocr_variant_selected", variant="bin")
+
+Inside collect() spans and counts go to that trace, a plain dict that can be
+returned from an OCR worker process and merged into the caller's trace or the
+registry with merge(). Outside any trace they go straight to this process's
+registry, which render() exposes. A stage named "ocr_once.bin" is exported as
+stage="ocr_once", variant="bin".
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# seconds; OCR stages run from milliseconds (pp_*) to minutes (large PDFs)
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+Trace = Dict[str, List]  # {"spans": [(stage, seconds)], "counts": [(name, labels, n)]}
+
+_current: ContextVar[Optional[Trace]] = ContextVar("fra_metrics_trace", default=None)
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "n")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.n = 0
+
+    def observe(self, secs: float) -> None:
+        i = bisect_left(BUCKETS, secs)
+        if i < len(BUCKETS):
+            self.counts[i] += 1
+        self.total += secs
+        self.n += 1
+
+
+_lock = threading.Lock()
+_histograms: Dict[str, _Histogram] = {}
+_counters: Dict[Tuple[str, Labels], float] = {}
+
+
+# ---- Recording ----
+
+def observe(stage: str, secs: float) -> None:
+    trace = _current.get()
+    if trace is not None:
+        trace["spans"].append((stage, secs))
+        return
+    with _lock:
+        hist = _histograms.get(stage)
+        if hist is None:
+            hist = _histograms[stage] = _Histogram()
+        hist.observe(secs)
+
+
+def count(name: str, n: float = 1, **labels: str) -> None:
+    key = tuple(sorted(labels.items()))
+    trace = _current.get()
+    if trace is not None:
+        trace["counts"].append((name, key, n))
+        return
+    with _lock:
+        _counters[(name, key)] = _counters.get((name, key), 0) + n
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - t0)
+
+
+def timed(stage: str) -> Callable:
+    def wrap(fn):
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(stage, time.perf_counter() - t0)
+        return inner
+    return wrap
+
+
+@contextmanager
+def collect() -> Iterator[Trace]:
+    """Record into a fresh trace for the duration of the block."""
+    trace: Trace = {"spans": [], "counts": []}
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def detached() -> Iterator[None]:
+    """
+    Record straight to the registry inside the block, e.g. from a streamed
+    response body, which runs after its request's trace has been merged.
+    """
+    token = _current.set(None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def merge(trace: Optional[Trace]) -> None:
+    """Fold a trace (e.g. returned by a worker) into the current trace or the registry."""
+    if not trace:
+        return
+    for stage, secs in trace["spans"]:
+        observe(stage, secs)
+    for name, labels, n in trace["counts"]:
+        count(name, n, **dict(labels))
+
+
+def server_timing(trace: Trace) -> str:
+    """Server-Timing header value: total milliseconds per stage."""
+    totals: Dict[str, float] = {}
+    for stage, secs in trace["spans"]:
+        totals[stage] = totals.get(stage, 0.0) + secs
+    return ", ".join(f"{stage};dur={secs * 1e3:.1f}" for stage, secs in totals.items())
+
+
+# ---- Exposition ----
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels: Iterable[Tuple[str, Any]]) -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in labels]
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _stage_labels(stage: str) -> List[Tuple[str, str]]:
+    name, _, variant = stage.partition(".")
+    return [("stage", name), ("variant", variant)] if variant else [("stage", name)]
+
+
+def metric_lines(name: str, kind: str, help_text: str,
+                 samples: Iterable[Tuple[Iterable[Tuple[str, Any]], float]]) -> List[str]:
+    """# HELP / # TYPE header plus one line per (labels, value) sample."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines += [f"{name}{_fmt_labels(labels)} {value}" for labels, value in samples]
+    return lines
+
+
+def render(extra: Iterable[str] = ()) -> str:
+    """Prometheus text format for the registry, followed by any extra lines."""
+    with _lock:
+        hists = {k: (list(h.counts), h.total, h.n) for k, h in _histograms.items()}
+        counters = dict(_counters)
+
+    lines = ["# HELP fra_stage_seconds Time spent per pipeline stage.",
+             "# TYPE fra_stage_seconds histogram"]
+    for stage in sorted(hists):
+        counts, total, n = hists[stage]
+        labels = _stage_labels(stage)
+        cumulative = 0
+        for le, c in zip(BUCKETS, counts):
+            cumulative += c
+            lines.append(f"fra_stage_seconds_bucket{_fmt_labels(labels + [('le', le)])} {cumulative}")
+        lines.append(f"fra_stage_seconds_bucket{_fmt_labels(labels + [('le', '+Inf')])} {n}")
+        lines.append(f"fra_stage_seconds_sum{_fmt_labels(labels)} {total:.6f}")
+        lines.append(f"fra_stage_seconds_count{_fmt_labels(labels)} {n}")
+
+    by_name: Dict[str, List[Tuple[Labels, float]]] = {}
+    for (name, labels), value in sorted(counters.items()):
+        by_name.setdefault(name, []).append((labels, value))
+    for name, samples in by_name.items():
+        lines += metric_lines(f"fra_{name}_total", "counter", f"Count of {name.replace('_', ' ')}.", samples)
+
+    lines += list(extra)
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
@@ -0,0 +1,100 @@
+# utils/near_duplicates.py
+"""
+Near-duplicate index over perceptual image hashes.
+
+Each entry holds the 64-bit pHash and dHash of an OCR'd upload, the result
+cache key it was stored under and the preprocessing variant that won. A new
+upload matches when both hashes are within max_distance bits of an entry's.
+
+Lookups use multi-index hashing: the pHash is cut into max_distance + 1
+bands, and by pigeonhole any hash within max_distance bits agrees exactly
+with a match on at least one band. Only entries sharing a band are compared,
+instead of the whole index.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+HASH_BITS = 64
+
+
+class Match(NamedTuple):
+    key: str                # result cache key of the matched upload
+    variant: Optional[str]  # variant that won on it
+    distance: int           # pHash Hamming distance
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _band_spans(bands: int) -> List[Tuple[int, int]]:
+    # (shift, mask) per band, splitting HASH_BITS as evenly as possible
+    spans, start = [], 0
+    for i in range(bands):
+        width = HASH_BITS // bands + (i < HASH_BITS % bands)
+        spans.append((start, (1 << width) - 1))
+        start += width
+    return spans
+
+
+class NearDuplicateIndex:
+    def __init__(self, max_items: int = 4096, max_distance: int = 4):
+        self.max_items = max_items
+        self.max_distance = max_distance
+        self._spans = _band_spans(max_distance + 1)
+        self._entries: "OrderedDict[int, Tuple[int, int, str, Optional[str]]]" = OrderedDict()
+        self._bands: Dict[Tuple[int, int], Set[int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _band_keys(self, phash: int) -> List[Tuple[int, int]]:
+        return [(i, (phash >> shift) & mask) for i, (shift, mask) in enumerate(self._spans)]
+
+    def lookup(self, phash: int, dhash: int) -> Optional[Match]:
+        """Closest entry within max_distance on both hashes, or None."""
+        with self._lock:
+            ids: Set[int] = set()
+            for band in self._band_keys(phash):
+                ids |= self._bands.get(band, set())
+            best = None
+            for i in ids:
+                p, d, key, variant = self._entries[i]
+                dist = hamming(phash, p)
+                if dist <= self.max_distance and hamming(dhash, d) <= self.max_distance:
+                    if best is None or dist < best[0]:
+                        best = (dist, i)
+            if best is None:
+                return None
+            self._entries.move_to_end(best[1])
+            _, _, key, variant = self._entries[best[1]]
+            return Match(key, variant, best[0])
+
+    def add(self, phash: int, dhash: int, key: str, variant: Optional[str]) -> None:
+        with self._lock:
+            i = self._next_id
+            self._next_id += 1
+            self._entries[i] = (phash, dhash, key, variant)
+            for band in self._band_keys(phash):
+                self._bands.setdefault(band, set()).add(i)
+            while len(self._entries) > self.max_items:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, i: int) -> None:
+        phash = self._entries.pop(i)[0]
+        for band in self._band_keys(phash):
+            ids = self._bands.get(band)
+            if ids is not None:
+                ids.discard(i)
+                if not ids:
+                    del self._bands[band]
+
+    def clear(self) -> int:
+        with self._lock:
+            n = len(self._entries)
+            self._entries.clear()
+            self._bands.clear()
+            return n
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,174 @@
+# utils/result_cache.py
+"""
+Content-addressed cache for /extract results.
+
+Entries are keyed by a hash of the uploaded bytes plus the OCR / extractor
+config versions, so changing either simply stops old entries from matching.
+A small in-memory LRU sits in front of an optional directory of JSON files
+that is trimmed (oldest first) once it grows past its byte budget. Several
+processes may share the directory: each one's byte count is only an
+estimate, corrected by the directory scan that every trim starts with.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+_KEY_RE = re.compile(r"[0-9a-f]{64}")
+# a trim goes down to this fraction of the budget, so one directory scan
+# makes room for many puts
+DISK_LOW_WATER = 0.8
+
+
+def cache_key(content_sha256: str, *versions: str) -> str:
+    return hashlib.sha256("|".join((content_sha256,) + versions).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, max_items: int = 256, disk_dir: Optional[str] = None,
+                 disk_max_bytes: int = 512 * 1024 * 1024):
+        self.max_items = max_items
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._mem: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+
+    # ---- disk tier ----
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _disk_files(self):
+        for name in os.listdir(self.disk_dir):
+            if name.endswith(".json"):
+                yield os.path.join(self.disk_dir, name)
+
+    def _disk_entries(self) -> List[Tuple[float, int, str]]:
+        # (mtime, size, path), oldest first; files another process removes
+        # meanwhile are simply skipped
+        entries = []
+        for path in self._disk_files():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+        return entries
+
+    def _disk_get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)  # mtime doubles as the disk tier's LRU clock
+            return value
+        except (OSError, ValueError):
+            return None
+
+    def _disk_put(self, key: str, value: Dict[str, Any]) -> None:
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        try:
+            old = os.path.getsize(path)
+        except OSError:
+            old = 0
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        self._disk_bytes += len(data) - old
+        if self._disk_bytes > self.disk_max_bytes:
+            self._disk_evict()
+
+    def _disk_evict(self) -> None:
+        entries = self._disk_entries()
+        total = sum(size for _, size, _ in entries)
+        target = self.disk_max_bytes * DISK_LOW_WATER
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            total -= size
+        self._disk_bytes = total
+
+    # ---- public API ----
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._mem.get(key)
+            if value is not None:
+                self._mem.move_to_end(key)
+            elif self.disk_dir:
+                value = self._disk_get(key)
+                if value is not None:
+                    self._mem_put(key, value)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def _mem_put(self, key: str, value: Dict[str, Any]) -> None:
+        self._mem[key] = value
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_items:
+            self._mem.popitem(last=False)
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._mem_put(key, value)
+            if self.disk_dir:
+                self._disk_put(key, value)
+
+    def invalidate(self, key: str) -> bool:
+        if not _KEY_RE.fullmatch(key):
+            return False
+        with self._lock:
+            found = self._mem.pop(key, None) is not None
+            if self.disk_dir:
+                try:
+                    size = os.path.getsize(self._path(key))
+                    os.remove(self._path(key))
+                    self._disk_bytes -= size
+                    found = True
+                except OSError:
+                    pass
+            return found
+
+    def clear(self) -> int:
+        with self._lock:
+            keys = set(self._mem)
+            self._mem.clear()
+            if self.disk_dir:
+                for path in list(self._disk_files()):
+                    keys.add(os.path.basename(path)[:-len(".json")])
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                self._disk_bytes = 0
+            return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "memory_items": len(self._mem),
+                "disk_bytes": self._disk_bytes if self.disk_dir else None,
+            }